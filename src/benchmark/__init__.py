@@ -0,0 +1,6 @@
+"""
+Benchmark helpers for Yahoo Finance CSV converter.
+
+This package generates synthetic broker exports and measures the converters
+against them.
+"""
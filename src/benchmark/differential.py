@@ -0,0 +1,257 @@
+"""
+Differential testing of converter modes against the reference converters.
+
+Every case generates randomized broker exports, converts them with the
+per-symbol reference converter of src.benchmark.reference and with the
+production converter in each registered mode, serial included, and checks
+that the Yahoo Finance output (or the raised exception type) is identical.
+Timings are recorded side by side.
+
+Conversions are recorded in the web metrics registry, labelled by converter
+and mode, so a local Prometheus can scrape them with --metrics-port.
+
+Usage:
+    python -m src.benchmark.differential --cases 5 --rows 20000
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from random import Random
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+import pandas as pd
+
+from src.converter.base import BaseConverter
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.schwab import SchwabConverter
+from src.converter.utils import yf_columns
+from src.web.metrics import start_metrics_server, track_conversion
+
+from .reference import ReferenceCathaySubBrokerageConverter, ReferenceSchwabConverter
+from .synthetic import (
+    write_cathay_holdings,
+    write_cathay_statement,
+    write_cathay_symbol_map,
+    write_fx_rates,
+    write_schwab_inputs,
+)
+
+# Production converter and per-symbol reference converter by name.
+converter_pairs: Dict[str, Tuple[Type[BaseConverter], Type[BaseConverter]]] = {
+    SchwabConverter.converter_name: (SchwabConverter, ReferenceSchwabConverter),
+    CathaySubBrokerageConverter.converter_name: (
+        CathaySubBrokerageConverter,
+        ReferenceCathaySubBrokerageConverter,
+    ),
+}
+
+# Modes per converter, as keyword arguments added to the case settings.
+differential_modes: Dict[str, Dict[str, Dict[str, Any]]] = {
+    SchwabConverter.converter_name: {
+        "serial": {},
+        "chunked": {"executor": "chunked"},
+        "parallel": {"executor": "parallel", "workers": 2},
+    },
+    CathaySubBrokerageConverter.converter_name: {
+        "serial": {},
+        "chunked": {"executor": "chunked"},
+        "parallel": {"executor": "parallel", "workers": 2},
+    },
+}
+
+
+class DifferentialResult(NamedTuple):
+    """
+    Comparison of one mode against the reference converter on one case.
+
+    Attributes:
+        converter: Converter name
+        mode: Mode name
+        seed: Seed of the generated case
+        rows: Number of generated input rows
+        reference_seconds: Wall time of the reference converter
+        mode_seconds: Wall time of the mode conversion
+        mismatch: Description of the difference, None when identical
+    """
+
+    converter: str
+    mode: str
+    seed: int
+    rows: int
+    reference_seconds: float
+    mode_seconds: float
+    mismatch: Optional[str]
+
+
+def _timed(
+    convert: Callable[[], pd.DataFrame],
+    label: str,
+) -> Tuple[Optional[pd.DataFrame], Optional[BaseException], float]:
+    start = time.perf_counter()
+    try:
+        with track_conversion(label) as observation:
+            result, error = convert(), None
+            observation.result = result
+    except Exception as e:
+        result, error = None, e
+    return result, error, time.perf_counter() - start
+
+
+def compare_outputs(
+    reference: Optional[pd.DataFrame],
+    reference_error: Optional[BaseException],
+    candidate: Optional[pd.DataFrame],
+    candidate_error: Optional[BaseException],
+) -> Optional[str]:
+    """
+    Describe how a candidate conversion differs from the reference.
+
+    Outputs are compared on yf_columns by value; dtypes may differ since a
+    categorical and an object column write the same CSV.
+
+    Returns:
+        None when identical, otherwise a short description of the difference
+    """
+    if reference_error is not None or candidate_error is not None:
+        if type(reference_error) is type(candidate_error):
+            return None
+        return f"reference raised {reference_error!r}, mode raised {candidate_error!r}"
+
+    try:
+        pd.testing.assert_frame_equal(
+            reference[yf_columns].reset_index(drop=True),
+            candidate[yf_columns].reset_index(drop=True),
+            check_dtype=False,
+            check_categorical=False,
+        )
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def _schwab_case(directory: Path, rng: Random, rows: int) -> Dict[str, Any]:
+    history_path, positions_path = write_schwab_inputs(
+        directory, rows, n_symbols=rng.randint(5, 200), seed=rng.randrange(2**32)
+    )
+    return {
+        "positions_data_path": str(positions_path),
+        "history_data_path": str(history_path),
+        "fix_exceed_range": rng.random() < 0.9,
+        "include_closed_positions": rng.random() < 0.5,
+    }
+
+
+def _cathay_case(directory: Path, rng: Random, rows: int) -> Dict[str, Any]:
+    statement_path = write_cathay_statement(
+        directory, rows, n_symbols=rng.randint(5, 200), seed=rng.randrange(2**32)
+    )
+    settings: Dict[str, Any] = {"statement_of_account_file_path": str(statement_path)}
+    if rng.random() < 0.8:
+        settings["holdings_file_path"] = str(
+            write_cathay_holdings(directory, statement_path, rng.randrange(2**32))
+        )
+    if rng.random() < 0.5:
+        settings["symbol_map_path"] = str(
+            write_cathay_symbol_map(directory, statement_path, rng.randrange(2**32))
+        )
+    # Holdings costs can't be converted, so only cases without holdings do.
+    if "holdings_file_path" not in settings and rng.random() < 0.5:
+        settings["currency"] = "TWD"
+        settings["fx_rates_path"] = str(
+            write_fx_rates(directory, seed=rng.randrange(2**32))
+        )
+    return settings
+
+
+case_builders = {
+    SchwabConverter.converter_name: _schwab_case,
+    CathaySubBrokerageConverter.converter_name: _cathay_case,
+}
+
+
+def run_differential(cases: int, rows: int, seed: int = 0) -> List[DifferentialResult]:
+    """
+    Run every registered mode against the reference converter on generated cases.
+
+    Args:
+        cases: Number of generated cases per converter
+        rows: Maximum number of input rows per case
+        seed: Seed for case generation
+
+    Returns:
+        One DifferentialResult per (converter, case, mode)
+    """
+    results = []
+    for converter_name, modes in differential_modes.items():
+        if not modes:
+            continue
+        for case in range(cases):
+            case_seed = seed * 1000 + case
+            rng = Random(case_seed)
+            converter_class, reference_class = converter_pairs[converter_name]
+            with tempfile.TemporaryDirectory() as directory:
+                n_rows = rng.randint(max(rows // 2, 1), rows)
+                settings = case_builders[converter_name](Path(directory), rng, n_rows)
+                reference, reference_error, reference_seconds = _timed(
+                    lambda: reference_class(**settings).convert(),
+                    f"{converter_name}/reference",
+                )
+                for mode_name, mode in modes.items():
+                    candidate, candidate_error, mode_seconds = _timed(
+                        lambda: converter_class(**settings, **mode).convert(),
+                        f"{converter_name}/{mode_name}",
+                    )
+                    results.append(
+                        DifferentialResult(
+                            converter_name,
+                            mode_name,
+                            case_seed,
+                            n_rows,
+                            reference_seconds,
+                            mode_seconds,
+                            compare_outputs(
+                                reference, reference_error, candidate, candidate_error
+                            ),
+                        )
+                    )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve conversion metrics at http://127.0.0.1:PORT/metrics while running",
+    )
+    args = parser.parse_args()
+
+    if args.metrics_port is not None:
+        start_metrics_server(args.metrics_port)
+    logging.disable(logging.INFO)
+    results = run_differential(args.cases, args.rows, args.seed)
+
+    print(
+        f"{'converter':<20}{'mode':<12}{'seed':>8}{'rows':>9}"
+        f"{'reference s':>13}{'mode s':>10}{'speedup':>9}  result"
+    )
+    for r in results:
+        print(
+            f"{r.converter:<20}{r.mode:<12}{r.seed:>8}{r.rows:>9}"
+            f"{r.reference_seconds:>13.3f}{r.mode_seconds:>10.3f}"
+            f"{r.reference_seconds / r.mode_seconds:>8.2f}x  "
+            f"{r.mismatch or 'identical'}"
+        )
+
+    return 1 if any(r.mismatch for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
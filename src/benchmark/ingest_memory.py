@@ -0,0 +1,88 @@
+"""
+Measure peak memory of converter ingest on synthetic broker exports.
+
+Usage:
+    python -m src.benchmark.ingest_memory --rows 1000000
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from typing import Callable
+
+import pandas as pd
+
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.schwab import SchwabConverter
+
+from .synthetic import write_cathay_statement, write_schwab_inputs
+
+
+def measure_peak(fn: Callable[[], object]) -> int:
+    """
+    Return the peak traced allocation in bytes while running fn.
+
+    The result of fn is kept alive until the measurement ends so the loaded
+    frames are included in the peak.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        history_path, positions_path = write_schwab_inputs(
+            directory, args.rows, args.symbols
+        )
+        statement_path = write_cathay_statement(directory, args.rows, args.symbols)
+
+        def schwab_full_read() -> object:
+            return pd.read_csv(positions_path), pd.read_csv(history_path)
+
+        def schwab_ingest() -> object:
+            return SchwabConverter(
+                positions_data_path=str(positions_path),
+                history_data_path=str(history_path),
+                fix_exceed_range=True,
+            )
+
+        def cathay_full_read() -> object:
+            return pd.read_csv(statement_path)
+
+        def cathay_ingest() -> object:
+            return CathaySubBrokerageConverter(
+                statement_of_account_file_path=str(statement_path)
+            )
+
+        cases = [
+            ("schwab", schwab_full_read, schwab_ingest),
+            ("cathay", cathay_full_read, cathay_ingest),
+        ]
+        print(f"rows={args.rows} symbols={args.symbols}")
+        for name, full_read, ingest in cases:
+            before = measure_peak(full_read)
+            after = measure_peak(ingest)
+            print(
+                f"{name}: full read {before / 2**20:.1f} MiB, "
+                f"projected ingest {after / 2**20:.1f} MiB "
+                f"({after / before:.0%})"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
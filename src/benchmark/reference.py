@@ -0,0 +1,198 @@
+"""
+Per-symbol reference converters for differential testing.
+
+The production converters reconcile the whole history at once with
+reconcile_grouped, whatever the executor. The converters here keep the
+original, independent path instead: every symbol's rows are selected with a
+mask over the full history and completed on their own, with the quantity
+checks written out inline as in the first Schwab converter. Loading,
+normalizing, dummy row layout and emitting are inherited, so a difference
+points at the grouped reconciliation.
+
+They are quadratic in the number of symbols and only meant as an oracle.
+"""
+
+import logging
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from src.converter.base import NormalizedData, ReconciledData
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.failures import SymbolFailure, symbol_errors
+from src.converter.reconcile import Reconciliation, quantity_matches
+from src.converter.schwab import SchwabConverter
+
+# Builds the dummy rows of one symbol in the converter's normalized layout.
+DummyRows = Callable[[List[str], List[Reconciliation]], pd.DataFrame]
+
+
+def complete_symbol_history(
+    symbol: str,
+    df: pd.DataFrame,
+    quantity_column: str,
+    price_column: str,
+    target_quantity: Optional[float],
+    target_total_value: Optional[float],
+    fix_exceed_range: bool,
+    dummy_rows: DummyRows,
+) -> pd.DataFrame:
+    """
+    Complete one symbol's signed history so it nets to the held quantity.
+
+    Args:
+        symbol: Stock symbol being reconciled
+        df: Visible history rows of the symbol, with signed quantities
+        quantity_column: Name of the signed quantity column
+        price_column: Name of the price column
+        target_quantity: Held quantity, or None for a closed position
+        target_total_value: Cost basis of the held quantity, None when closed
+        fix_exceed_range: Whether mismatches may be fixed with dummy rows
+        dummy_rows: Builds the dummy row of the symbol
+
+    Returns:
+        Completed history rows of the symbol
+
+    Raises:
+        NotImplementedError: If fix_exceed_range is False and data is incomplete
+    """
+    quantity_sum = df[quantity_column].sum()
+    value_sum = (df[quantity_column] * df[price_column]).sum()
+
+    if target_quantity is None:
+        if quantity_matches(quantity_sum, 0.0):
+            return df
+        if not fix_exceed_range:
+            raise NotImplementedError(
+                "Closed position quantity mismatch fixing is not implemented "
+                "for fix_exceed_range=False"
+            )
+        add_quantity = abs(quantity_sum)
+        dummy = Reconciliation(
+            True,
+            "Sell" if quantity_sum > 0 else "Buy",
+            add_quantity,
+            abs(value_sum) / add_quantity,
+        )
+        return pd.concat([df, dummy_rows([symbol], [dummy])], ignore_index=True)
+
+    if quantity_matches(quantity_sum, target_quantity):
+        return df
+    if not fix_exceed_range:
+        raise NotImplementedError(
+            "Quantity mismatch fixing is not implemented for fix_exceed_range=False"
+        )
+
+    add_quantity = abs(target_quantity - quantity_sum)
+    add_action = "Buy" if target_total_value > value_sum else "Sell"
+    add_price = abs(target_total_value - value_sum) / add_quantity
+    if add_action == "Sell" and target_quantity > quantity_sum:
+        # The history can't be completed; replace it with one buy.
+        dummy = Reconciliation(
+            False, "Buy", target_quantity, target_total_value / target_quantity
+        )
+        return dummy_rows([symbol], [dummy])
+
+    dummy = Reconciliation(True, add_action, add_quantity, add_price)
+    return pd.concat([df, dummy_rows([symbol], [dummy])], ignore_index=True)
+
+
+class ReferenceSchwabConverter(SchwabConverter):
+    """
+    Schwab converter reconciling one symbol at a time.
+    """
+
+    def reconcile(self, normalized: NormalizedData) -> ReconciledData:
+        self.history_data_df = normalized.transactions
+        self.positions_data_df = normalized.positions
+
+        symbols = self._symbols_to_process()
+        self._dummy_quotes = self._lookup_dummy_quotes(symbols)
+        history = self.history_data_df
+        positions = self.positions_data_df
+
+        completed = []
+        failures: List[SymbolFailure] = []
+        for symbol in symbols:
+            position = positions[positions["Symbol"] == symbol]
+            target_quantity: Optional[float] = None
+            target_total_value: Optional[float] = None
+            if position.empty:
+                logging.info(f"Symbol: {symbol} is not in current positions.")
+            else:
+                target_quantity = float(position["Qty (Quantity)"].values[0])
+                target_total_value = float(position["Cost Basis"].values[0])
+            try:
+                completed.append(
+                    complete_symbol_history(
+                        symbol,
+                        history[history["Symbol"] == symbol],
+                        "Quantity",
+                        "Price",
+                        target_quantity,
+                        target_total_value,
+                        self.fix_exceed_range,
+                        self._dummy_rows,
+                    )
+                )
+            except symbol_errors as e:
+                if not self.fail_soft:
+                    raise
+                failures.append(SymbolFailure.from_exception(symbol, "reconcile", e))
+        if not completed:
+            return ReconciledData(history.iloc[:0], tuple(failures))
+        return ReconciledData(pd.concat(completed, ignore_index=True), tuple(failures))
+
+
+class ReferenceCathaySubBrokerageConverter(CathaySubBrokerageConverter):
+    """
+    Cathay converter reconciling one ticker at a time against the holdings.
+    """
+
+    def reconcile(self, normalized: NormalizedData) -> ReconciledData:
+        holdings = normalized.positions
+        if holdings is None:
+            return super().reconcile(normalized)
+
+        df = normalized.transactions
+        codes = df["商品代碼"].dropna().astype(str).str.strip()
+        held = holdings.index.to_list()
+        symbols = self._selected_symbols(
+            held
+            + [
+                code
+                for code in codes.drop_duplicates()
+                if code != "" and code not in held
+            ]
+        )
+        df = df.assign(商品代碼=df["商品代碼"].astype(str).str.strip())
+
+        completed = []
+        failures: List[SymbolFailure] = []
+        for symbol in symbols:
+            holding = holdings[holdings.index == symbol]
+            target_quantity: Optional[float] = None
+            target_total_value: Optional[float] = None
+            if not holding.empty:
+                target_quantity = float(holding["quantity"].iloc[0])
+                target_total_value = float(holding["total_value"].iloc[0])
+            try:
+                completed.append(
+                    complete_symbol_history(
+                        symbol,
+                        df[df["商品代碼"] == symbol],
+                        "股數",
+                        "價格",
+                        target_quantity,
+                        target_total_value,
+                        True,
+                        self._dummy_rows,
+                    )
+                )
+            except symbol_errors as e:
+                if not self.fail_soft:
+                    raise
+                failures.append(SymbolFailure.from_exception(symbol, "reconcile", e))
+        if not completed:
+            return ReconciledData(df.iloc[:0], tuple(failures))
+        return ReconciledData(pd.concat(completed, ignore_index=True), tuple(failures))
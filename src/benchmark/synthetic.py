@@ -0,0 +1,388 @@
+"""
+Synthetic broker exports used by the benchmarks.
+
+The generated files mimic the layout of the real Schwab and Cathay exports,
+including the columns the converters do not use, so ingest cost is realistic.
+"""
+
+import csv
+from datetime import date, timedelta
+from pathlib import Path
+from random import Random
+from typing import Dict, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# Full Schwab transaction export header, including columns ignored by the converter.
+SCHWAB_HISTORY_HEADER = [
+    "Date",
+    "Action",
+    "Symbol",
+    "Description",
+    "Quantity",
+    "Price",
+    "Fees & Comm",
+    "Amount",
+]
+
+# Subset of the Schwab positions export header.
+SCHWAB_POSITIONS_HEADER = [
+    "Symbol",
+    "Description",
+    "Qty (Quantity)",
+    "Price",
+    "Price Chng %",
+    "Mkt Val (Market Value)",
+    "Cost Basis",
+    "Security Type",
+]
+
+# Full Cathay statement of account header.
+CATHAY_HEADER = [
+    "交易日期",
+    "商品代碼",
+    "商品名稱",
+    "交易市場",
+    "交易種類",
+    "交易幣別",
+    "交割幣別",
+    "股數",
+    "價格",
+    "匯率",
+    "成交金額",
+    "手續費",
+    "其他費用",
+    "應收/付(-)金額",
+]
+
+# Columns of a Cathay holdings file.
+CATHAY_HOLDINGS_HEADER = ["交易市場", "商品代碼", "庫存股數", "持有成本"]
+
+START_DATE = date(2021, 1, 4)
+
+
+def _symbol_names(n_symbols: int) -> list:
+    """
+    Build deterministic upper-case ticker names.
+    """
+    names = []
+    for i in range(n_symbols):
+        name = ""
+        value = i
+        while True:
+            name = chr(ord("A") + value % 26) + name
+            value = value // 26 - 1
+            if value < 0:
+                break
+        names.append("S" + name)
+    return names
+
+
+def write_schwab_inputs(
+    directory: PathLike,
+    n_rows: int,
+    n_symbols: int = 100,
+    seed: int = 0,
+) -> Tuple[Path, Path]:
+    """
+    Write a synthetic Schwab history and positions file pair.
+
+    About one transaction in ten is a cash row without quantity, as in real
+    exports. Positions deliberately disagree with the visible history for a
+    share of the symbols, and some held symbols are left out of positions,
+    so every reconciliation path is exercised.
+
+    Args:
+        directory: Directory to write the files into
+        n_rows: Number of history rows to generate
+        n_symbols: Number of distinct symbols
+        seed: Seed for the random generator
+
+    Returns:
+        Tuple of (history path, positions path)
+    """
+    rng = Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    history_path = directory / "Individual_XXX000_Transactions.csv"
+    positions_path = directory / "Individual-Positions-2026-04-15-000000.csv"
+
+    symbols = _symbol_names(n_symbols)
+    holdings = {symbol: 0.0 for symbol in symbols}
+    costs = {symbol: 0.0 for symbol in symbols}
+    rows = []
+    for i in range(n_rows):
+        trade_date = START_DATE + timedelta(days=i * 1500 // max(n_rows, 1))
+        date_text = trade_date.strftime("%m/%d/%Y")
+        if rng.random() < 0.1:
+            rows.append(
+                [date_text, "MoneyLink Transfer", "", "Tfr BANK", "", "", "", "$100.00"]
+            )
+            continue
+
+        symbol = rng.choice(symbols)
+        quantity = float(rng.randint(1, 20))
+        price = round(rng.uniform(5, 500), 4)
+        fee = round(rng.choice([0.0, 0.0, 0.01, 0.02]), 2)
+        if holdings[symbol] >= quantity and rng.random() < 0.4:
+            action = "Sell"
+            holdings[symbol] -= quantity
+            costs[symbol] -= quantity * price
+            amount = quantity * price - fee
+        else:
+            action = "Buy"
+            holdings[symbol] += quantity
+            costs[symbol] += quantity * price
+            amount = -(quantity * price + fee)
+        rows.append(
+            [
+                date_text,
+                action,
+                symbol,
+                f"{symbol} COMMON STOCK",
+                f"{quantity:g}",
+                f"${price:,.4f}",
+                f"${fee:.2f}" if fee else "",
+                f"${amount:,.2f}",
+            ]
+        )
+
+    # Schwab lists the newest transactions first.
+    rows.reverse()
+    with open(history_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(SCHWAB_HISTORY_HEADER)
+        writer.writerows(rows)
+
+    with open(positions_path, "w", newline="", encoding="utf-8") as f:
+        f.write(
+            '"Positions for account Individual ...000 as of 07:22 AM ET, '
+            '2026/04/15"\n\n'
+        )
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(SCHWAB_POSITIONS_HEADER)
+        for symbol in symbols:
+            quantity = holdings[symbol]
+            cost_basis = max(costs[symbol], 1.0)
+            draw = rng.random()
+            if draw < 0.15:
+                # Simulate history that starts after the position was opened.
+                quantity += rng.randint(1, 10)
+                cost_basis += rng.uniform(10, 1000)
+            elif draw < 0.2:
+                # Missing buys at a cost far below the visible trades.
+                quantity += rng.randint(1, 10)
+                cost_basis *= 0.5
+            elif draw < 0.25:
+                # Sold after the export, so the symbol is closed in positions.
+                continue
+            if quantity <= 0:
+                continue
+            price = round(rng.uniform(5, 500), 4)
+            writer.writerow(
+                [
+                    symbol,
+                    f"{symbol} COMMON STOCK",
+                    f"{quantity:g}",
+                    f"{price}",
+                    "0.5%",
+                    f"${quantity * price:,.2f}",
+                    f"${cost_basis:,.2f}",
+                    "Equity",
+                ]
+            )
+        writer.writerow(["Cash & Cash Investments", "--", "", "", "", "$1.00", "", ""])
+        writer.writerow(["Account Total", "--", "", "", "", "$1.00", "", ""])
+
+    return history_path, positions_path
+
+
+def write_cathay_statement(
+    directory: PathLike,
+    n_rows: int,
+    n_symbols: int = 100,
+    seed: int = 0,
+) -> Path:
+    """
+    Write a synthetic Cathay sub-brokerage statement of account.
+
+    Args:
+        directory: Directory to write the file into
+        n_rows: Number of statement rows to generate
+        n_symbols: Number of distinct product codes
+        seed: Seed for the random generator
+
+    Returns:
+        Path of the statement file
+    """
+    rng = Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    statement_path = directory / "statement_of_account.csv"
+
+    symbols = _symbol_names(n_symbols)
+    holdings = {symbol: 0 for symbol in symbols}
+    with open(statement_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CATHAY_HEADER)
+        for i in range(n_rows):
+            trade_date = START_DATE + timedelta(days=i * 1500 // max(n_rows, 1))
+            symbol = rng.choice(symbols)
+            quantity = rng.randint(1, 20)
+            price = round(rng.uniform(5, 500), 2)
+            fee = round(rng.uniform(0, 5), 2)
+            other_fee = round(rng.choice([0.0, 0.01, 0.02]), 2)
+            if holdings[symbol] >= quantity and rng.random() < 0.4:
+                action = "賣出"
+                holdings[symbol] -= quantity
+                settlement = quantity * price - fee - other_fee
+            elif rng.random() < 0.05:
+                action = "股息"
+                quantity = 0
+                settlement = price
+            else:
+                action = "買進"
+                holdings[symbol] += quantity
+                settlement = -(quantity * price + fee + other_fee)
+            writer.writerow(
+                [
+                    trade_date.strftime("%Y/%m/%d"),
+                    symbol,
+                    f"{symbol} Inc.",
+                    "US",
+                    action,
+                    "USD",
+                    "USD",
+                    quantity,
+                    price,
+                    1,
+                    round(quantity * price, 2),
+                    fee,
+                    other_fee,
+                    round(settlement, 2),
+                ]
+            )
+
+    return statement_path
+
+
+def _cathay_net_holdings(statement_path: Path) -> Dict[str, Tuple[float, float]]:
+    """
+    Net the shares and cost of each product code of a synthetic statement.
+    """
+    holdings: Dict[str, Tuple[float, float]] = {}
+    with open(statement_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            quantity, cost = holdings.get(row["商品代碼"], (0.0, 0.0))
+            shares = float(row["股數"])
+            sign = {"買進": 1, "賣出": -1}.get(row["交易種類"], 0)
+            holdings[row["商品代碼"]] = (
+                quantity + sign * shares,
+                cost + sign * shares * float(row["價格"]),
+            )
+    return holdings
+
+
+def write_cathay_holdings(
+    directory: PathLike, statement_path: PathLike, seed: int = 0
+) -> Path:
+    """
+    Write a holdings file for a synthetic Cathay statement.
+
+    Most codes are held at the quantity the statement nets to. Some hold
+    extra shares bought before the statement, some are missing from the
+    holdings, some are held at zero shares after being sold out, and a few
+    held codes never appear in the statement.
+
+    Args:
+        directory: Directory to write the file into
+        statement_path: Statement written by write_cathay_statement
+        seed: Seed for the random generator
+
+    Returns:
+        Path of the holdings file
+    """
+    rng = Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    holdings_path = directory / "holdings.csv"
+
+    holdings = _cathay_net_holdings(Path(statement_path))
+    with open(holdings_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CATHAY_HOLDINGS_HEADER)
+        for symbol, (quantity, cost) in holdings.items():
+            draw = rng.random()
+            if draw < 0.15:
+                quantity += rng.randint(1, 10)
+                cost += rng.uniform(10, 1000)
+            elif draw < 0.25:
+                continue
+            elif draw < 0.3:
+                quantity, cost = 0, 0.0
+            writer.writerow(["US", symbol, f"{quantity:g}", round(max(cost, 0.0), 2)])
+        for i in range(rng.randint(0, 3)):
+            quantity = rng.randint(1, 50)
+            writer.writerow(
+                ["US", f"NEW{i}", quantity, round(quantity * rng.uniform(5, 500), 2)]
+            )
+
+    return holdings_path
+
+
+def write_cathay_symbol_map(
+    directory: PathLike, statement_path: PathLike, seed: int = 0
+) -> Path:
+    """
+    Write a symbol mapping file for about half the codes of a statement.
+
+    Args:
+        directory: Directory to write the file into
+        statement_path: Statement written by write_cathay_statement
+        seed: Seed for the random generator
+
+    Returns:
+        Path of the mapping file
+    """
+    rng = Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    symbol_map_path = directory / "symbol_map.csv"
+
+    with open(symbol_map_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["交易市場", "商品代碼", "Symbol"])
+        for symbol in _cathay_net_holdings(Path(statement_path)):
+            if rng.random() < 0.5:
+                writer.writerow(["US", symbol, f"{symbol}.US"])
+
+    return symbol_map_path
+
+
+def write_fx_rates(directory: PathLike, currency: str = "USD", seed: int = 0) -> Path:
+    """
+    Write a weekly rate table of currency over the synthetic date range.
+
+    Args:
+        directory: Directory to write the file into
+        currency: Currency the rates convert from
+        seed: Seed for the random generator
+
+    Returns:
+        Path of the rate table
+    """
+    rng = Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rates_path = directory / "fx_rates.csv"
+
+    rate = 30.0
+    with open(rates_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Currency", "Rate"])
+        for week in range(1500 // 7 + 1):
+            rate *= 1 + rng.uniform(-0.01, 0.01)
+            trade_date = START_DATE + timedelta(days=week * 7)
+            writer.writerow([trade_date.isoformat(), currency, round(rate, 4)])
+
+    return rates_path
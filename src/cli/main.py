@@ -6,20 +6,52 @@ import argparse
 import logging
 import sys
 from pathlib import Path
+from typing import List, Optional
 
 import pandas as pd
 
+from src.cli import query, watch
 from src.converter import converter_mapping
 from src.converter.base import BaseConverter
+from src.converter.delta import compute_delta, read_yahoo_csv
+from src.converter.failures import read_failed_symbols, write_error_report
+from src.converter.portfolio_store import PortfolioStore
+from src.converter.profiling import MemoryProfiler
+from src.converter.readers import compression_suffixes, export_name
+from src.converter.progress import ProgressEvent, format_progress
 
+# Subcommands selected by the first argument; anything else is a conversion.
+subcommands = {
+    "watch": watch.main,
+    "query": query.main,
+}
 
-def main() -> int:
+
+def print_progress(event: ProgressEvent) -> None:
+    """
+    Print a progress event as a status line rewritten in place on stderr.
+
+    Args:
+        event: The progress event to print
+    """
+    end = "\n" if event.stage == "emit" else ""
+    print(f"\r{format_progress(event)}\033[K", end=end, file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """
     Main entry point for the command line interface.
 
+    Args:
+        argv: Command line arguments, defaults to sys.argv[1:]
+
     Returns:
         Exit code (0 for success, non-zero for failure)
     """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in subcommands:
+        return subcommands[argv[0]](argv[1:])
+
     # Set up argument parser
     parser = argparse.ArgumentParser(
         description="Convert broker CSV data to Yahoo Finance format"
@@ -35,12 +67,71 @@ def main() -> int:
         "--output",
         type=str,
         required=True,
-        help="Output file path for the converted CSV",
+        help="Output file path for the converted CSV; a .gz, .bz2, .xz or .zst "
+        "suffix compresses it",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show a progress line with stage, rows and rows/s",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Print the peak traced memory and RSS of every stage",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="SQLite or Parquet portfolio store to save the converted "
+        "transactions in, for the query subcommand",
+    )
+    parser.add_argument(
+        "--account",
+        type=str,
+        default=None,
+        help="Account name in the portfolio store (default: output file name)",
+    )
+    parser.add_argument(
+        "--previous-output",
+        type=str,
+        default=None,
+        help="Previously exported Yahoo Finance CSV; only rows not in it are "
+        "written, and rows missing from the new conversion go to "
+        "<output>_removed.csv",
+    )
+    parser.add_argument(
+        "--fail-soft",
+        action="store_true",
+        help="Leave out symbols that can't be reconciled instead of stopping, "
+        "and list them in a JSON error report",
+    )
+    parser.add_argument(
+        "--error-report",
+        type=str,
+        default=None,
+        help="Path of the --fail-soft error report (default: <output>_errors.json)",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        type=str,
+        default=None,
+        help="Error report of an earlier run; only its failed symbols are converted",
     )
 
     # Parse initial arguments to get the converter type
-    args_, _ = parser.parse_known_args()
+    args_, _ = parser.parse_known_args(argv)
     output_path = args_.output
+    show_progress = args_.progress
+    previous_output = args_.previous_output
+    store_path = args_.store
+    account = args_.account or Path(export_name(output_path)).stem
+    memory_profiler = MemoryProfiler() if args_.profile_memory else None
+    output_name = Path(export_name(output_path))
+    error_report = args_.error_report or str(
+        output_name.with_name(f"{output_name.stem}_errors.json")
+    )
 
     try:
         # Get converter class
@@ -49,26 +140,75 @@ def main() -> int:
 
         # Add converter-specific arguments
         converter_class.add_arguments(parser)
-        args = parser.parse_args()
+        args = parser.parse_args(argv)
 
         # Remove common args from the dictionary
         args_dict = vars(args)
         args_dict.pop("converter_type", None)
         args_dict.pop("output", None)
+        args_dict.pop("progress", None)
+        args_dict.pop("previous_output", None)
+        args_dict.pop("profile_memory", None)
+        args_dict.pop("store", None)
+        args_dict.pop("account", None)
+        fail_soft = args_dict.pop("fail_soft", False)
+        args_dict.pop("error_report", None)
+        retry_failed = args_dict.pop("retry_failed", None)
 
         # Initialize converter
-        converter: BaseConverter = converter_class(**args_dict)
+        converter: BaseConverter = converter_class(
+            progress_callback=print_progress if show_progress else None,
+            memory_profiler=memory_profiler,
+            fail_soft=fail_soft,
+            only_symbols=read_failed_symbols(retry_failed) if retry_failed else None,
+            **args_dict,
+        )
 
         # Convert data
         df: pd.DataFrame = converter.convert()
+        if memory_profiler is not None:
+            print(memory_profiler.format_report(), file=sys.stderr)
 
         # Ensure output directory exists
         output_path_obj = Path(output_path)
         output_path_obj.parent.mkdir(parents=True, exist_ok=True)
+        compression = compression_suffixes.get(output_path_obj.suffix.lower())
+
+        # List the symbols left out, for a rerun with --retry-failed
+        if fail_soft:
+            write_error_report(
+                error_report,
+                converter.converter_name,
+                converter.input_paths(),
+                converter.failures,
+            )
+            logging.info(
+                f"{len(converter.failures)} symbols failed, listed in {error_report}"
+            )
+
+        # Save the full conversion for point-in-time holdings queries
+        if store_path:
+            count = PortfolioStore(store_path).save(account, df)
+            logging.info(f"Stored {count} transactions of {account} in {store_path}")
+
+        # Keep only the rows that were not exported before
+        if previous_output:
+            delta = compute_delta(df, read_yahoo_csv(previous_output))
+            # The removed rows are compressed like the output.
+            compression_suffix = output_path_obj.suffix if compression else ""
+            removed_path = output_name.with_name(
+                f"{output_name.stem}_removed.csv{compression_suffix}"
+            )
+            logging.info(
+                f"{len(delta.added)} new or changed rows, {len(delta.removed)} "
+                f"rows no longer present (listed in {removed_path})"
+            )
+            delta.removed.to_csv(removed_path, index=False, compression=compression)
+            df = delta.added
 
         # Save the result
         logging.info(f"Saving to {output_path}")
-        df.to_csv(output_path, index=False)
+        df.to_csv(output_path, index=False, compression=compression)
         logging.info(f"Successfully converted data to {output_path}")
 
         return 0
@@ -81,6 +221,9 @@ def main() -> int:
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
         return 3
+    finally:
+        if memory_profiler is not None:
+            memory_profiler.stop()
 
 
 if __name__ == "__main__":
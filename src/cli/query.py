@@ -0,0 +1,79 @@
+"""
+Query subcommand: holdings of a stored account on a date.
+
+Usage:
+    python main.py query --store portfolio.sqlite --account Individual --date 2024-06-30
+"""
+
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+import pandas as pd
+
+from src.converter.portfolio_store import PortfolioStore
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the query subcommand.
+
+    Prints the holdings as CSV with the columns Symbol and Quantity.
+
+    Args:
+        argv: Arguments after the subcommand name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    parser = argparse.ArgumentParser(
+        prog="query", description="Show the holdings of a stored account on a date"
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        required=True,
+        help="Portfolio store written with --store during conversion",
+    )
+    parser.add_argument(
+        "--account",
+        type=str,
+        default=None,
+        help="Stored account name; may be omitted when the store has one account",
+    )
+    parser.add_argument(
+        "--date",
+        type=str,
+        required=True,
+        help="Date of the holdings, e.g. 2024-06-30; trades on the date count",
+    )
+    parser.add_argument(
+        "--include-closed",
+        action="store_true",
+        help="Also list symbols held at zero quantity",
+    )
+    args = parser.parse_args(argv)
+
+    store = PortfolioStore(args.store)
+    try:
+        account = args.account
+        if account is None:
+            accounts = store.accounts()
+            if len(accounts) != 1:
+                logging.error(f"Choose an --account of {accounts}")
+                return 2
+            account = accounts[0]
+        date = int(pd.Timestamp(args.date).strftime("%Y%m%d"))
+        holdings = store.positions(account).holdings_on(date, args.include_closed)
+    except FileNotFoundError as e:
+        logging.error(f"File not found: {e}")
+        return 1
+    except (KeyError, ValueError) as e:
+        logging.error(f"Value error: {e}")
+        return 2
+
+    pd.DataFrame(holdings, columns=["Symbol", "Quantity"]).to_csv(
+        sys.stdout, index=False
+    )
+    return 0
@@ -0,0 +1,220 @@
+"""
+Watch a folder and convert broker exports as they arrive.
+
+The folder is polled for CSV files. Files still being written are left alone
+until their modification time is older than the debounce delay; settled files
+are paired into conversion jobs and a job only runs when one of its inputs is
+new or changed. Parsed inputs stay cached in the process, so when only one
+file of a Schwab pair changes the other is not parsed again.
+
+Usage:
+    python -m src.cli.main watch --directory exports/ --fix-exceed-range
+"""
+
+import argparse
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.converter import converter_mapping
+from src.converter.cache import InputCache
+from src.converter.pairing import ConversionJob, pair_exports
+from src.converter.readers import is_export
+from src.converter.schwab import SchwabConverter
+
+Signature = Tuple[int, int]
+
+
+def _signature(path: str) -> Signature:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FolderWatcher:
+    """
+    Polls a folder and re-runs the conversions whose inputs changed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        debounce: float = 2.0,
+        converter_options: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            directory: Folder receiving the broker exports
+            debounce: Seconds a file must stay unmodified before it is read
+            converter_options: Extra keyword arguments per converter name
+        """
+        self.directory = directory
+        self.debounce = debounce
+        self.converter_options = converter_options or {}
+        self.input_cache = InputCache()
+        # Input signatures of each output at its last conversion attempt.
+        self._converted: Dict[str, Tuple[Signature, ...]] = {}
+
+    def _settled_files(self) -> List[str]:
+        """
+        List exports in the folder that are no longer being written.
+        """
+        now = time.time()
+        paths = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not is_export(entry.name):
+                    continue
+                stat = entry.stat()
+                if stat.st_size > 0 and now - stat.st_mtime >= self.debounce:
+                    paths.append(entry.path)
+        return paths
+
+    def _is_current(
+        self, job: ConversionJob, signatures: Tuple[Signature, ...]
+    ) -> bool:
+        """
+        Check whether the job's output already reflects its inputs.
+        """
+        if job.output_path in self._converted:
+            return self._converted[job.output_path] == signatures
+        # Outputs written before this process started count when newer.
+        if os.path.exists(job.output_path):
+            output_mtime = os.stat(job.output_path).st_mtime_ns
+            return all(output_mtime >= mtime for _, mtime in signatures)
+        return False
+
+    def _convert(self, job: ConversionJob) -> None:
+        """
+        Run one conversion job and write its output next to the inputs.
+        """
+        converter_class = converter_mapping[job.converter_name]
+        converter = converter_class(
+            **job.arguments,
+            **self.converter_options.get(job.converter_name, {}),
+            input_cache=self.input_cache,
+        )
+        df = converter.convert()
+
+        # Write under a temporary name so readers never see a partial output.
+        directory, name = os.path.split(job.output_path)
+        temporary_path = os.path.join(directory, f".{name}.tmp")
+        df.to_csv(temporary_path, index=False)
+        os.replace(temporary_path, job.output_path)
+
+    def poll(self) -> List[str]:
+        """
+        Convert every job whose inputs are new or changed since the last poll.
+
+        A failed job is not retried until one of its inputs changes again.
+
+        Returns:
+            Output paths written during this poll
+        """
+        jobs, _ = pair_exports(self._settled_files())
+        written = []
+        for job in jobs:
+            try:
+                signatures = tuple(_signature(p) for p in job.input_paths)
+            except FileNotFoundError:
+                continue
+            if self._is_current(job, signatures):
+                continue
+
+            self._converted[job.output_path] = signatures
+            logging.info(f"Converting {job.converter_name} exports for {job.account}")
+            try:
+                self._convert(job)
+            except Exception as e:
+                logging.error(f"Failed to convert {job.input_paths}: {e}")
+                continue
+            logging.info(f"Wrote {job.output_path}")
+            written.append(job.output_path)
+        return written
+
+    def run(self, interval: float = 2.0, max_polls: Optional[int] = None) -> None:
+        """
+        Poll the folder until interrupted.
+
+        Args:
+            interval: Seconds between polls
+            max_polls: Stop after this many polls, None to run until interrupted
+        """
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            self.poll()
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(interval)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the watch subcommand.
+
+    Args:
+        argv: Arguments after the subcommand name
+
+    Returns:
+        Exit code (0 for success, non-zero for failure)
+    """
+    parser = argparse.ArgumentParser(
+        prog="watch", description="Watch a folder and convert broker exports"
+    )
+    parser.add_argument(
+        "--directory",
+        type=str,
+        required=True,
+        help="Folder receiving the broker exports; outputs are written there",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Seconds between polls of the folder",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=2.0,
+        help="Seconds a file must stay unmodified before it is converted",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Poll the folder once and exit",
+    )
+    parser.add_argument(
+        "--fix-exceed-range",
+        action="store_true",
+        help="Fix Schwab history that disagrees with positions",
+    )
+    parser.add_argument(
+        "--include-closed-positions",
+        action="store_true",
+        help="Include Schwab symbols that appear in history but not in positions",
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        logging.error(f"Not a directory: {args.directory}")
+        return 1
+
+    watcher = FolderWatcher(
+        args.directory,
+        debounce=args.debounce,
+        converter_options={
+            SchwabConverter.converter_name: {
+                "fix_exceed_range": args.fix_exceed_range,
+                "include_closed_positions": args.include_closed_positions,
+            },
+        },
+    )
+    logging.info(f"Watching {args.directory}")
+    try:
+        watcher.run(args.interval, max_polls=1 if args.once else None)
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,83 @@
+"""
+Table-driven normalization of broker transaction actions.
+
+Each broker describes its action vocabulary as a table of ActionRule entries.
+The table is applied to the categories of the action column rather than to
+every row, so normalization costs one lookup per distinct action.
+"""
+
+import logging
+from typing import Dict, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+class ActionRule(NamedTuple):
+    """
+    How a broker action maps to a Yahoo Finance transaction.
+
+    Attributes:
+        sign: 1 adds shares, -1 removes shares, 0 keeps the reported sign
+        action: Yahoo Finance action, or "" to derive BUY/SELL from the sign
+        comment: Comment written on the exported row
+        include: Whether rows with this action are exported at all
+    """
+
+    sign: int
+    action: str
+    comment: str
+    include: bool = True
+
+
+def apply_action_table(
+    df: pd.DataFrame,
+    table: Dict[str, ActionRule],
+    action_column: str = "Action",
+    quantity_column: str = "Quantity",
+) -> pd.DataFrame:
+    """
+    Normalize broker actions into signed quantities and Yahoo actions.
+
+    Rows whose action is excluded by the table are dropped. Actions missing
+    from the table are dropped as well and reported once in the log.
+
+    Args:
+        df: Transactions with an action column and a numeric quantity column
+        table: Mapping of broker action to ActionRule
+        action_column: Column holding the broker action
+        quantity_column: Column holding the reported quantity
+
+    Returns:
+        Copy of the included rows where quantity_column is signed, "Action"
+        holds the Yahoo action and "Comment" holds the table comment
+    """
+    actions = df[action_column].astype("category").cat.remove_unused_categories()
+    categories = actions.cat.categories
+    rules = [table.get(category) for category in categories]
+
+    unknown = [category for category, rule in zip(categories, rules) if rule is None]
+    if unknown:
+        logging.warning(f"Skipping transactions with unmapped actions: {unknown}")
+
+    # Code -1 (missing action) indexes the trailing excluded sentinel.
+    rules.append(None)
+    codes = actions.cat.codes.to_numpy()
+    include = np.array([rule is not None and rule.include for rule in rules])[codes]
+    signs = np.array([rule.sign if rule else 0 for rule in rules])[codes]
+    output_actions = np.array([rule.action if rule else "" for rule in rules])[codes]
+    comments = np.array([rule.comment if rule else "" for rule in rules])[codes]
+
+    quantities = df[quantity_column].to_numpy(dtype=float)
+    signed_quantities = np.where(signs == 0, quantities, signs * np.abs(quantities))
+    output_actions = np.where(
+        output_actions == "",
+        np.where(signed_quantities < 0, "SELL", "BUY"),
+        output_actions,
+    )
+
+    result = df.loc[include].copy()
+    result[quantity_column] = signed_quantities[include]
+    result["Action"] = pd.Categorical(output_actions[include])
+    result["Comment"] = comments[include]
+    return result
@@ -1,12 +1,87 @@
 """
 Base converter class that all specific broker converters should inherit from.
+
+A conversion runs as a pipeline of stages, load → normalize → reconcile →
+emit, each taking the previous stage's typed result. Converters implement the
+stages; BaseConverter runs them, reports progress, times them and caches
+their outputs when a StageCache is given.
 """
 
 import argparse
-from typing import Optional
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
 
 import pandas as pd
 
+from .cache import InputCache, StageCache
+from .executors import create_executor, executor_names
+from .failures import SymbolFailure
+from .profiling import MemoryProfiler
+from .progress import ProgressCallback, ProgressReporter, stage_fractions
+from .readers import read_table
+
+# Pipeline stages in order.
+pipeline_stages = list(stage_fractions)
+
+# Attributes of every converter that stage outputs depend on, by stage.
+pipeline_stage_options: Dict[str, List[str]] = {
+    "load": ["max_rows"],
+    "reconcile": ["fail_soft", "only_symbols"],
+}
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+class LoadedData(NamedTuple):
+    """
+    Result of the load stage: input tables as read from the broker exports.
+
+    Attributes:
+        transactions: Transaction rows, restricted to the columns used
+        positions: Current holdings, None when the broker has no positions input
+    """
+
+    transactions: pd.DataFrame
+    positions: Optional[pd.DataFrame] = None
+
+
+class NormalizedData(NamedTuple):
+    """
+    Result of the normalize stage.
+
+    Attributes:
+        transactions: Transactions with signed quantities, a Yahoo Finance
+            "Action" and a "Comment", still in broker columns otherwise
+        positions: Cleaned current holdings, None when not available
+        unmapped_symbols: (market, product code) pairs without a symbol
+            mapping, kept as is
+    """
+
+    transactions: pd.DataFrame
+    positions: Optional[pd.DataFrame] = None
+    unmapped_symbols: Tuple[Tuple[str, str], ...] = ()
+
+
+class ReconciledData(NamedTuple):
+    """
+    Result of the reconcile stage.
+
+    Attributes:
+        transactions: Transactions completed with dummy rows where the visible
+            history does not match the holdings
+        failures: Symbols left out by a fail-soft conversion
+    """
+
+    transactions: pd.DataFrame
+    failures: Tuple[SymbolFailure, ...] = ()
+
 
 class BaseConverter:
     """
@@ -18,29 +93,256 @@ class BaseConverter:
 
     converter_name = "base"
 
+    # Attributes each stage's output depends on, besides the input files.
+    stage_options: Dict[str, List[str]] = {}
+
     def __init__(
         self,
+        progress_callback: Optional[ProgressCallback] = None,
+        input_cache: Optional[InputCache] = None,
+        stage_cache: Optional[StageCache] = None,
+        executor: Optional[str] = None,
+        workers: int = 1,
+        memory_profiler: Optional[MemoryProfiler] = None,
+        fail_soft: bool = False,
+        only_symbols: Optional[List[str]] = None,
+        max_rows: Optional[int] = None,
+        cancel_check: Optional[Callable[[], None]] = None,
         **kwargs,
     ):
         """
         Initialize the base converter.
 
         Args:
+            progress_callback: Function receiving ProgressEvents during conversion
+            input_cache: Cache of parsed inputs shared with other conversions
+            stage_cache: Cache of stage outputs shared with other conversions
+            executor: Executor of partitioned stages, one of executor_names;
+                None picks serial
+            workers: Number of processes of the parallel executor; more than
+                one requires executor "parallel"
+            memory_profiler: Profiler measuring the memory of every stage run
+            fail_soft: Whether a symbol failing with one of symbol_errors is
+                left out and recorded in failures instead of stopping the run
+            only_symbols: Symbols to convert, all when None, e.g. the failed
+                symbols of an earlier error report
+            max_rows: Transaction rows read from the start of the export, all
+                when None; a quick preview converts only the first rows
+            cancel_check: Called before every pipeline stage; an exception it
+                raises stops the conversion, e.g. a web deadline's check
             **kwargs: Additional keyword arguments for specific converters
         """
+        self.progress = ProgressReporter(self.converter_name, progress_callback)
+        self.input_cache = input_cache
+        self.stage_cache = stage_cache
+        self.workers = workers
+        self.executor = create_executor(executor, workers)
+        self.memory_profiler = memory_profiler
+        self.fail_soft = fail_soft
+        self.only_symbols = tuple(only_symbols) if only_symbols is not None else None
+        self.failures: List[SymbolFailure] = []
+        self.unmapped_symbols: List[Tuple[str, str]] = []
+        self.max_rows = max_rows
+        self.cancel_check = cancel_check
+        self.stage_seconds: Dict[str, float] = {}
+        self._input_signature: Optional[Tuple] = None
 
-    def convert(self) -> pd.DataFrame:
+    def read_csv(self, path: str, key: str, **kwargs: Any) -> pd.DataFrame:
         """
-        Convert broker-specific data to Yahoo Finance format.
+        Read an input CSV file or workbook, through the input cache when one is set.
+
+        Args:
+            path: Path to the CSV file or workbook
+            key: Name of the read, unique per set of read options
+            **kwargs: Keyword arguments passed to readers.read_table
 
         Returns:
-            DataFrame in Yahoo Finance format
+            The parsed table
+        """
+        if self.input_cache is None:
+            return read_table(path, **kwargs)
+        return self.input_cache.read_csv(path, key, **kwargs)
+
+    def input_paths(self) -> List[str]:
+        """
+        Files the conversion reads; stage outputs are only cached when known.
+        """
+        return []
+
+    def _stage_key(self, stage: str) -> Optional[Hashable]:
+        """
+        Cache key of a stage output, None when it can't be cached.
+        """
+        if self._input_signature is None:
+            paths = self.input_paths()
+            if not paths:
+                return None
+            stats = [(os.path.abspath(path), os.stat(path)) for path in paths]
+            self._input_signature = tuple(
+                (path, stat.st_size, stat.st_mtime_ns) for path, stat in stats
+            )
+
+        options = []
+        for name in pipeline_stages[: pipeline_stages.index(stage) + 1]:
+            options.extend(
+                (option, repr(getattr(self, option)))
+                for option in pipeline_stage_options.get(name, [])
+                + self.stage_options.get(name, [])
+            )
+        converter_class = type(self)
+        return (
+            converter_class.__module__,
+            converter_class.__qualname__,
+            stage,
+            self._input_signature,
+            tuple(options),
+        )
+
+    def _run_stage(self, stage: str, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run one pipeline stage through the stage cache and time it.
+
+        Stage functions must not modify their arguments, since cached outputs
+        are shared between conversions.
+
+        Args:
+            stage: Stage name, one of pipeline_stages
+            function: Stage implementation
+            *args: Results of earlier stages passed to the stage
+
+        Returns:
+            The stage output; DataFrame outputs are copies the caller may modify
+        """
+        if self.cancel_check is not None:
+            self.cancel_check()
+        key = self._stage_key(stage) if self.stage_cache is not None else None
+        if key is not None:
+            output = self.stage_cache.get(key)
+            if output is not None:
+                logging.debug(f"{self.converter_name}: reusing cached {stage} stage")
+                self.progress.update(stage)
+                return output.copy() if isinstance(output, pd.DataFrame) else output
+
+        start = time.perf_counter()
+        if self.memory_profiler is not None:
+            with self.memory_profiler.stage(stage):
+                output = function(*args)
+        else:
+            output = function(*args)
+        self.stage_seconds[stage] = time.perf_counter() - start
+        logging.debug(
+            f"{self.converter_name}: {stage} stage took {self.stage_seconds[stage]:.3f}s"
+        )
+
+        if key is not None:
+            self.stage_cache.put(key, output)
+            if isinstance(output, pd.DataFrame):
+                return output.copy()
+        return output
+
+    def _read_key(self, key: str) -> str:
+        """
+        Input cache key of a transaction read, distinct for partial reads.
+        """
+        return key if self.max_rows is None else f"{key}-first-{self.max_rows}"
+
+    def _selected_symbols(self, symbols: List[str]) -> List[str]:
+        """
+        Restrict symbols to only_symbols when it is set, keeping their order.
+        """
+        if self.only_symbols is None:
+            return symbols
+        selected = set(self.only_symbols)
+        return [symbol for symbol in symbols if symbol in selected]
+
+    def load(self) -> LoadedData:
+        """
+        Read the broker exports.
 
         Raises:
             NotImplementedError: This method must be implemented by subclasses
         """
         raise NotImplementedError("Subclasses must implement this method")
 
+    def normalize(self, loaded: LoadedData) -> NormalizedData:
+        """
+        Clean values and map broker actions to Yahoo Finance actions.
+
+        Raises:
+            NotImplementedError: This method must be implemented by subclasses
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def reconcile(self, normalized: NormalizedData) -> ReconciledData:
+        """
+        Complete the transactions so they agree with the holdings.
+
+        The default keeps the transactions as they are, for brokers without
+        a holdings input.
+        """
+        return ReconciledData(normalized.transactions)
+
+    def emit(self, reconciled: ReconciledData) -> pd.DataFrame:
+        """
+        Build the Yahoo Finance table.
+
+        Raises:
+            NotImplementedError: This method must be implemented by subclasses
+        """
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def convert(self) -> pd.DataFrame:
+        """
+        Convert broker-specific data to Yahoo Finance format.
+
+        Subclasses run the load stage when constructed and store its result
+        in self.loaded; convert runs the remaining stages. Symbols left out
+        by a fail-soft conversion are listed in self.failures afterwards, and
+        product codes without a symbol mapping in self.unmapped_symbols.
+
+        Returns:
+            DataFrame in Yahoo Finance format
+        """
+        normalized = self._run_stage("normalize", self.normalize, self.loaded)
+        self.unmapped_symbols = list(normalized.unmapped_symbols)
+        if self.unmapped_symbols:
+            logging.warning(
+                f"No symbol mapping for {len(self.unmapped_symbols)} product "
+                f"codes, kept as is: {self.unmapped_symbols[:20]}"
+            )
+        reconciled = self._run_stage("reconcile", self.reconcile, normalized)
+        self.failures = list(reconciled.failures)
+        if self.failures:
+            logging.warning(
+                f"{len(self.failures)} symbols failed and were left out: "
+                f"{[failure.symbol for failure in self.failures[:20]]}"
+            )
+        return self._run_stage("emit", self.emit, reconciled)
+
+    @staticmethod
+    def add_pipeline_arguments(parser: argparse.ArgumentParser) -> None:
+        """
+        Add the arguments shared by all converters to the parser.
+
+        Args:
+            parser: The argument parser to add arguments to
+        """
+        parser.add_argument(
+            "--executor",
+            type=str,
+            choices=executor_names,
+            default=None,
+            help="How partitioned stages run: serial (default), chunked in "
+            "process, or parallel across processes (experimental, does not "
+            "scale with cores; prefer chunked for large histories)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=_positive_int,
+            default=1,
+            help="Number of processes of --executor parallel",
+        )
+
     @staticmethod
     def add_arguments(parser: argparse.ArgumentParser) -> None:
         """
@@ -0,0 +1,123 @@
+"""
+Caches shared by conversions in one process.
+
+Long-running callers such as the watch mode convert the same exports again
+whenever one of a pair changes. Keeping the parsed tables keyed by path, size
+and modification time lets an unchanged file skip parsing on the next run,
+and keeping stage outputs lets a repeated conversion skip whole stages.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from .readers import read_table
+
+CacheKey = Tuple[str, str, int, int]
+
+
+class InputCache:
+    """
+    Least recently used cache of parsed input files, safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of parsed tables kept in memory
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._tables: "OrderedDict[CacheKey, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read_csv(self, path: str, key: str, **kwargs: Any) -> pd.DataFrame:
+        """
+        Read a CSV file or workbook, reusing the parsed table while it is unchanged.
+
+        The caller-supplied key names the way the file is read, so the same
+        file read with different options is cached separately.
+
+        Args:
+            path: Path to the CSV file or workbook
+            key: Name of the read, unique per set of read options
+            **kwargs: Keyword arguments passed to readers.read_table
+
+        Returns:
+            A copy of the parsed table that the caller may modify
+        """
+        stat = os.stat(path)
+        cache_key = (key, os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            df = self._tables.get(cache_key)
+            if df is not None:
+                self.hits += 1
+                self._tables.move_to_end(cache_key)
+            else:
+                self.misses += 1
+        if df is not None:
+            return df.copy()
+
+        # Parse outside the lock so other files can be served meanwhile.
+        df = read_table(path, **kwargs)
+        with self._lock:
+            # Older versions of the same file can never be hit again.
+            for stale in [k for k in self._tables if k[:2] == cache_key[:2]]:
+                del self._tables[stale]
+            self._tables[cache_key] = df
+            while len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+        return df.copy()
+
+
+class StageCache:
+    """
+    Least recently used cache of converter pipeline stage outputs.
+
+    Keys identify the converter class, the stage, the input files and the
+    options the stage depends on, so a converter built again on unchanged
+    inputs skips every stage whose options did not change.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of stage outputs kept in memory
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._outputs: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached output for key, or None.
+        """
+        with self._lock:
+            output = self._outputs.get(key)
+            if output is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._outputs.move_to_end(key)
+            return output
+
+    def put(self, key: Hashable, output: Any) -> None:
+        """
+        Store a stage output, evicting the least recently used ones.
+        """
+        with self._lock:
+            self._outputs[key] = output
+            self._outputs.move_to_end(key)
+            while len(self._outputs) > self.max_entries:
+                self._outputs.popitem(last=False)
@@ -4,11 +4,18 @@ Schwab broker data converter implementation.
 
 import argparse
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 
-from .base import BaseConverter
+from .actions import ActionRule, apply_action_table
+from .base import BaseConverter, LoadedData, NormalizedData, ReconciledData
+from .config import DEFAULT_DUMMY_DATE
+from .failures import SymbolFailure
+from .fx import load_rate_table, statement_rate_factors, table_rate_factors
+from .readers import read_table, sniff_encoding
+from .reconcile import Reconciliation, reconcile_grouped, symbols_to_reconcile
+from .symbols import SymbolMap, load_symbol_map
 from .utils import yf_columns
 
 # 2025-01 record columns definition for Schwab CSV format
@@ -29,6 +36,46 @@ cathay_columns = [
     "應收/付(-)金額",
 ]
 
+# Subset of the statement columns used by the conversion logic.
+cathay_required_columns = [
+    "交易日期",
+    "商品代碼",
+    "交易市場",
+    "交易種類",
+    "股數",
+    "價格",
+    "手續費",
+    "其他費用",
+]
+
+# Currency columns, read only when amounts are converted to another currency.
+cathay_fx_columns = ["交易幣別", "交割幣別", "匯率"]
+
+# Columns of the optional holdings file: market, product code, shares held and
+# total cost.
+cathay_holdings_columns = ["交易市場", "商品代碼", "庫存股數", "持有成本"]
+
+# Low-cardinality text columns stored as categoricals on ingest.
+cathay_categorical_columns = [
+    "商品代碼",
+    "交易市場",
+    "交易種類",
+    "交易幣別",
+    "交割幣別",
+]
+
+# Text form of dates in Cathay statements, given to date cells of workbooks.
+cathay_date_format = "%Y/%m/%d"
+
+# Cathay transaction types and how they map to Yahoo Finance transactions.
+cathay_action_table: Dict[str, ActionRule] = {
+    "買進": ActionRule(1, "BUY", ""),
+    "賣出": ActionRule(-1, "SELL", "correct to sell"),
+}
+
+# Transaction types of dummy rows added by reconciliation.
+cathay_dummy_types = {"Buy": "買進", "Sell": "賣出"}
+
 # Mapping from Schwab columns to Yahoo Finance columns
 column_mapping = {
     "交易日期": "Trade Date",
@@ -40,71 +87,320 @@ column_mapping = {
 
 class CathaySubBrokerageConverter(BaseConverter):
     converter_name = "CathaySubBrokerage"
+    action_table = cathay_action_table
+    stage_options = {
+        "load": ["currency"],
+        "normalize": ["symbol_map_path", "fx_rates_path"],
+    }
 
     @staticmethod
     def add_arguments(parser: argparse.ArgumentParser) -> None:
         """
-        Add Schwab specific arguments to CLI parser.
+        Add Cathay sub-brokerage specific arguments to CLI parser.
 
         Args:
             parser: The argument parser to add arguments to
         """
-        BaseConverter.add_arguments(parser)
+        parser.add_argument(
+            "--statement-of-account",
+            dest="statement_of_account_file_path",
+            type=str,
+            required=True,
+            help="Path to statement of account CSV file",
+        )
+        parser.add_argument(
+            "--symbol-map",
+            dest="symbol_map_path",
+            type=str,
+            default=None,
+            help="CSV file mapping (交易市場, 商品代碼) to Yahoo Finance tickers",
+        )
+        parser.add_argument(
+            "--currency",
+            type=str,
+            default=None,
+            help="Convert prices and commissions to this currency, e.g. TWD",
+        )
+        parser.add_argument(
+            "--fx-rates",
+            dest="fx_rates_path",
+            type=str,
+            default=None,
+            help="CSV file of (Date, Currency, Rate) rates into --currency; "
+            "the statement's 匯率 is used when omitted",
+        )
+        parser.add_argument(
+            "--holdings",
+            dest="holdings_file_path",
+            type=str,
+            default=None,
+            help="CSV file of current holdings (交易市場, 商品代碼, 庫存股數, 持有成本) "
+            "to reconcile the statement against; not combinable with --currency",
+        )
+        BaseConverter.add_pipeline_arguments(parser)
 
     def __init__(
         self,
         statement_of_account_file_path: str,
+        symbol_map_path: Optional[str] = None,
+        currency: Optional[str] = None,
+        fx_rates_path: Optional[str] = None,
+        holdings_file_path: Optional[str] = None,
         **kwargs,
     ):
 
         super().__init__(**kwargs)
 
         self.statement_of_account_file_path = statement_of_account_file_path
+        self.symbol_map_path = symbol_map_path
+        self.symbol_map: Optional[SymbolMap] = (
+            load_symbol_map(symbol_map_path) if symbol_map_path else None
+        )
+        if fx_rates_path and not currency:
+            raise ValueError("--fx-rates requires --currency")
+        # 持有成本 carries no currency of its own, so it can't be converted
+        # along with the statement prices it is reconciled against.
+        if holdings_file_path and currency:
+            raise ValueError("--holdings can't be combined with --currency")
+        self.currency = currency
+        self.fx_rates_path = fx_rates_path
+        self.fx_rates: Optional[pd.DataFrame] = (
+            load_rate_table(fx_rates_path) if fx_rates_path else None
+        )
 
-        self.df = pd.read_csv(statement_of_account_file_path)
+        self.holdings_file_path = holdings_file_path
 
         self.pre_check()
 
+        self.loaded: LoadedData = self._run_stage("load", self.load)
+        self.df = self.loaded.transactions
+
     def pre_check(self) -> None:
-        if not all(col in self.df.columns for col in cathay_columns):
+        header = read_table(
+            self.statement_of_account_file_path,
+            nrows=0,
+            encoding=sniff_encoding(self.statement_of_account_file_path),
+        ).columns
+        if not all(col in header for col in cathay_columns):
             raise ValueError(
                 f"Columns in {self.statement_of_account_file_path} do not match columns. Please update the schema."
             )
+        if self.holdings_file_path:
+            header = read_table(
+                self.holdings_file_path,
+                nrows=0,
+                encoding=sniff_encoding(self.holdings_file_path),
+            ).columns
+            missing = [col for col in cathay_holdings_columns if col not in header]
+            if missing:
+                raise ValueError(
+                    f"Columns {missing} are missing from {self.holdings_file_path}"
+                )
+
+    def input_paths(self) -> List[str]:
+        paths = [self.statement_of_account_file_path]
+        if self.symbol_map_path:
+            paths.append(self.symbol_map_path)
+        if self.fx_rates_path:
+            paths.append(self.fx_rates_path)
+        if self.holdings_file_path:
+            paths.append(self.holdings_file_path)
+        return paths
+
+    def load(self) -> LoadedData:
+        columns = cathay_required_columns
+        if self.currency:
+            columns = columns + cathay_fx_columns
+        df = self.read_csv(
+            self.statement_of_account_file_path,
+            self._read_key(
+                "cathay-statement-fx" if self.currency else "cathay-statement"
+            ),
+            usecols=columns,
+            encoding=sniff_encoding(self.statement_of_account_file_path),
+            sheet_date_format=cathay_date_format,
+            nrows=self.max_rows,
+            dtype={
+                column: "category"
+                for column in cathay_categorical_columns
+                if column in columns
+            },
+        )
+        holdings = None
+        if self.holdings_file_path:
+            holdings = self.read_csv(
+                self.holdings_file_path,
+                "cathay-holdings",
+                usecols=cathay_holdings_columns,
+                encoding=sniff_encoding(self.holdings_file_path),
+                dtype={"交易市場": str, "商品代碼": str},
+            )
+        self.progress.update("load", rows=len(df))
+        return LoadedData(df, holdings)
+
+    def normalize(self, loaded: LoadedData) -> NormalizedData:
+        df = loaded.transactions.copy()
 
-    def convert(self) -> pd.DataFrame:
+        if self.currency:
+            self._convert_currency(df)
 
         # add column "total_Commission" = "手續費" + "其他費用"
-        self.df["total_commission"] = self.df["手續費"] + self.df["其他費用"]
+        df["total_commission"] = df["手續費"] + df["其他費用"]
 
-        # remove rows where "交易種類" is not "買進" or "賣出"
-        self.df = self.df[self.df["交易種類"].isin(["買進", "賣出"])]
+        # keep only the transaction types in action_table and set Action/Comment
+        df = apply_action_table(
+            df,
+            self.action_table,
+            action_column="交易種類",
+            quantity_column="股數",
+        )
+
+        # resolve exchange-qualified tickers from the symbol mapping
+        unmapped: List[Tuple[str, str]] = []
+        if self.symbol_map is not None:
+            df["商品代碼"], unmapped = self.symbol_map.resolve(
+                df["交易市場"], df["商品代碼"]
+            )
+        holdings = None
+        if loaded.positions is not None:
+            holdings = self._normalize_holdings(loaded.positions)
+        self.progress.update("normalize", rows=len(df))
+        return NormalizedData(df, holdings, tuple(unmapped))
+
+    def _normalize_holdings(self, holdings: pd.DataFrame) -> pd.DataFrame:
+        """
+        Total the holdings per ticker, resolving codes like the statement.
+
+        Returns:
+            Holdings indexed by ticker with "quantity" and "total_value" columns
+        """
+        holdings = holdings.dropna(subset=["商品代碼"])
+        codes = holdings["商品代碼"].str.strip()
+        if self.symbol_map is not None:
+            codes, _ = self.symbol_map.resolve(holdings["交易市場"], codes)
+        totals = pd.DataFrame(
+            {
+                "quantity": holdings["庫存股數"].to_numpy(dtype=float),
+                "total_value": holdings["持有成本"].to_numpy(dtype=float),
+            }
+        ).groupby(codes.astype(str).to_numpy(), sort=False)
+        return totals.sum()
+
+    def reconcile(self, normalized: NormalizedData) -> ReconciledData:
+        """
+        Complete each symbol's transactions so they agree with the holdings.
+
+        Without a holdings file the transactions are kept as they are.
+        Otherwise held symbols come first, followed by the symbols that only
+        appear in the statement, which are reconciled to zero quantity. In
+        fail-soft mode a symbol that can't be reconciled is left out and
+        recorded instead.
+
+        Args:
+            normalized: Output of the normalize stage
+
+        Returns:
+            Transactions completed with dummy rows where needed
+        """
+        df = normalized.transactions
+        holdings = normalized.positions
+        if holdings is None:
+            if self.only_symbols is not None:
+                df = df[df["商品代碼"].astype(str).isin(self.only_symbols)]
+            return ReconciledData(df)
+
+        symbols = self._selected_symbols(
+            symbols_to_reconcile(
+                holdings.index.to_list(), df["商品代碼"], include_closed_positions=True
+            )
+        )
+        self.progress.update("reconcile", symbols=0, total_symbols=len(symbols))
+        df = df.assign(商品代碼=df["商品代碼"].astype(str).str.strip())
+        failures: List[SymbolFailure] = []
+        completed = reconcile_grouped(
+            df,
+            symbols,
+            holdings,
+            self._dummy_rows,
+            self.executor,
+            fix_exceed_range=True,
+            columns=("商品代碼", "股數", "價格"),
+            on_progress=lambda done, rows: self.progress.update(
+                "reconcile", rows=rows, symbols=done
+            ),
+            on_failure=failures.append if self.fail_soft else None,
+        )
+        return ReconciledData(completed, tuple(failures))
+
+    def _dummy_rows(
+        self, symbols: List[str], reconciliations: List[Reconciliation]
+    ) -> pd.DataFrame:
+        """
+        Build the dummy transactions of several symbols at once.
+
+        Args:
+            symbols: Tickers needing a dummy transaction
+            reconciliations: Reconciliation of each ticker, with a dummy action
+
+        Returns:
+            One row per ticker in the normalized statement layout
+        """
+        types = [cathay_dummy_types[r.dummy_action] for r in reconciliations]
+        rules = [self.action_table[t] for t in types]
+        return pd.DataFrame(
+            {
+                "交易日期": pd.to_datetime(DEFAULT_DUMMY_DATE).strftime(
+                    cathay_date_format
+                ),
+                "商品代碼": symbols,
+                "交易種類": types,
+                "股數": [
+                    rule.sign * abs(r.dummy_quantity)
+                    for rule, r in zip(rules, reconciliations)
+                ],
+                "價格": [r.dummy_price for r in reconciliations],
+                "手續費": 0.0,
+                "其他費用": 0.0,
+                "total_commission": 0.0,
+                "Action": [rule.action for rule in rules],
+                "Comment": [rule.comment for rule in rules],
+            }
+        )
+
+    def _convert_currency(self, df: pd.DataFrame) -> None:
+        """
+        Express prices and fees in self.currency, in place.
+
+        Prices are in the trade currency (交易幣別) and fees in the settlement
+        currency (交割幣別). Rates come from the rate table as of each trade
+        date when one is given, else from the statement's 匯率.
+        """
+        if self.fx_rates is not None:
+            price_factors, fee_factors = table_rate_factors(
+                df["交易日期"],
+                [df["交易幣別"], df["交割幣別"]],
+                self.fx_rates,
+                self.currency,
+            )
+        else:
+            price_factors, fee_factors = statement_rate_factors(
+                df["交易幣別"], df["交割幣別"], df["匯率"], self.currency
+            )
+        df["價格"] = df["價格"] * price_factors
+        df["手續費"] = df["手續費"] * fee_factors
+        df["其他費用"] = df["其他費用"] * fee_factors
+
+    def emit(self, reconciled: ReconciledData) -> pd.DataFrame:
+        df = reconciled.transactions.copy()
 
         # Keep quantity and price positive; transaction direction is explicit.
-        comment_list = []
-        quantity_list = []
-        transaction_type_list = []
-
-        for _, row in self.df.iterrows():
-            if row["交易種類"] == "賣出":
-                quantity_list.append(abs(float(row["股數"])))
-                transaction_type_list.append("SELL")
-                comment_list.append("correct to sell")
-            else:
-                quantity_list.append(abs(float(row["股數"])))
-                transaction_type_list.append("BUY")
-                comment_list.append("")
-
-        self.df["Quantity"] = quantity_list
-        self.df["Action"] = transaction_type_list
-        self.df["Comment"] = comment_list
+        df["Quantity"] = abs(df["股數"])
 
         # reformat daate from yyyy/mm/dd to yyyymmdd
-        self.df["Trade Date"] = pd.to_datetime(self.df["交易日期"]).dt.strftime(
-            "%Y%m%d"
-        )
+        df["Trade Date"] = pd.to_datetime(df["交易日期"]).dt.strftime("%Y%m%d")
 
         # rename columns
-        self.df = self.df.rename(
+        df = df.rename(
             columns={
                 "商品代碼": "Symbol",
                 "價格": "Purchase Price",
@@ -112,9 +408,10 @@ class CathaySubBrokerageConverter(BaseConverter):
             }
         )
 
-        self.df["Purchase Price"] = abs(self.df["Purchase Price"])
+        df["Purchase Price"] = abs(df["Purchase Price"])
 
-        self.df = self.df[yf_columns]
+        df = df[yf_columns]
+        self.progress.update("emit", rows=len(df))
         logging.info(f"Convert {self.statement_of_account_file_path} done.")
 
-        return self.df
+        return df
@@ -0,0 +1,114 @@
+"""
+Differences between a conversion and a previously exported Yahoo Finance file.
+
+Yahoo Finance imports add every row of a file, so re-importing a full history
+duplicates the transactions imported before. The delta keeps only the rows
+that are not in the previous export. Rows are compared by a hash of their
+values together with their occurrence number, so a trade that legitimately
+appears twice is matched once per occurrence.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .readers import read_table
+from .utils import yf_columns
+
+# Columns compared as numbers, so "14" and "14.0" are the same quantity.
+numeric_columns = ["Quantity", "Purchase Price", "Commission"]
+
+# Decimals numbers are compared at, absorbing the last-digit differences of a
+# float written to CSV and parsed back; adding 0.0 folds -0.0 into 0.0.
+NUMERIC_DECIMALS = 9
+
+
+class Delta(NamedTuple):
+    """
+    Rows that differ between two Yahoo Finance tables.
+
+    Attributes:
+        added: Rows of the current table missing from the previous one,
+            including the new version of changed rows
+        removed: Rows of the previous table missing from the current one,
+            including the old version of changed rows
+    """
+
+    added: pd.DataFrame
+    removed: pd.DataFrame
+
+
+def _text_values(values: pd.Series) -> pd.Categorical:
+    """
+    Stripped text of values with missing as "", stripping each distinct value once.
+    """
+    codes, uniques = pd.factorize(values)
+    # Code -1 (missing) picks the trailing "".
+    names = pd.Index(np.append(uniques.astype(str), "")).str.strip()
+    name_codes, distinct_names = pd.factorize(names)
+    return pd.Categorical.from_codes(name_codes[codes], distinct_names)
+
+
+def _row_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    """
+    Key every row by (hash of its yf_columns values, occurrence number).
+    """
+    values = {}
+    for column in yf_columns:
+        if column in numeric_columns:
+            numbers = pd.to_numeric(df[column], errors="coerce").to_numpy(
+                dtype=np.float64
+            )
+            values[column] = np.round(numbers, NUMERIC_DECIMALS) + 0.0
+        else:
+            values[column] = _text_values(df[column])
+    hashes = pd.util.hash_pandas_object(pd.DataFrame(values), index=False)
+    occurrences = hashes.groupby(hashes.to_numpy()).cumcount()
+    return pd.MultiIndex.from_arrays([hashes.to_numpy(), occurrences.to_numpy()])
+
+
+def read_yahoo_csv(path: str) -> pd.DataFrame:
+    """
+    Read a previously exported Yahoo Finance file.
+
+    Numbers are parsed exactly as written and text is kept as written.
+
+    Args:
+        path: Path to the exported CSV file
+
+    Returns:
+        The export
+
+    Raises:
+        ValueError: If a column of yf_columns is missing
+    """
+    header = read_table(path, nrows=0).columns
+    missing = [column for column in yf_columns if column not in header]
+    if missing:
+        raise ValueError(f"Columns {missing} are missing from {path}")
+    return read_table(
+        path,
+        dtype={column: str for column in header if column not in numeric_columns},
+        keep_default_na=False,
+        na_values={column: [""] for column in numeric_columns},
+        float_precision="round_trip",
+    )
+
+
+def compute_delta(current: pd.DataFrame, previous: pd.DataFrame) -> Delta:
+    """
+    Compare a conversion with a previous export.
+
+    Args:
+        current: Yahoo Finance table of the new conversion
+        previous: Yahoo Finance table exported before, see read_yahoo_csv
+
+    Returns:
+        The added and removed rows, each in its table's order
+    """
+    current_keys = _row_keys(current)
+    previous_keys = _row_keys(previous)
+    added = current[~current_keys.isin(previous_keys)]
+    removed = previous[~previous_keys.isin(current_keys)]
+    return Delta(added, removed[yf_columns])
@@ -0,0 +1,292 @@
+"""
+Executors that run the partitions of a pipeline stage.
+
+A stage splits its work into partitions, such as one symbol's history rows,
+and hands the executor a batch function together with the numeric columns
+the partitions index into. The executor decides how batches are formed and
+where they run:
+
+- serial: one partition per call, in process
+- chunked: batches of partitions with a bounded row count, in process
+- parallel: batches across a process pool; the columns are copied once into
+  shared memory and workers receive only the partitions, so no DataFrame is
+  pickled on the way in
+
+Only the batch function runs in the workers. For reconciliation that is the
+per-symbol sums, while grouping the history and assembling the output rows
+stay in the parent process, so parallel does not scale with the number of
+cores. It is experimental and never picked by default; chunked is the fast
+choice for large histories. Worker pools are kept for the life of the process,
+so only the first parallel stage pays for starting them.
+"""
+
+import atexit
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, TypeVar
+
+import numpy as np
+
+Partition = TypeVar("Partition")
+Result = TypeVar("Result")
+
+# Function computing the results of a batch of partitions from the columns.
+BatchFunction = Callable[[Dict[str, np.ndarray], List[Partition]], List[Result]]
+
+
+def _batches(
+    partitions: Sequence[Partition],
+    weights: Optional[Sequence[int]],
+    max_weight: float,
+) -> List[List[Partition]]:
+    """
+    Cut partitions into contiguous batches of at most max_weight each.
+
+    A single partition heavier than max_weight forms its own batch.
+    """
+    if weights is None:
+        weights = [1] * len(partitions)
+    batches: List[List[Partition]] = [[]]
+    batch_weight = 0
+    for partition, weight in zip(partitions, weights):
+        if batches[-1] and batch_weight + weight > max_weight:
+            batches.append([])
+            batch_weight = 0
+        batches[-1].append(partition)
+        batch_weight += weight
+    return batches if batches[0] else []
+
+
+class Executor:
+    """
+    Runs a batch function over the partitions of a stage.
+    """
+
+    name = "serial"
+
+    def _run_batches(
+        self,
+        function: BatchFunction,
+        columns: Dict[str, np.ndarray],
+        batches: List[List[Partition]],
+        on_progress: Optional[Callable[[int], None]],
+    ) -> List[Result]:
+        results: List[Result] = []
+        for batch in batches:
+            results.extend(function(columns, batch))
+            if on_progress is not None:
+                on_progress(len(results))
+        return results
+
+    def map_partitions(
+        self,
+        function: BatchFunction,
+        columns: Dict[str, np.ndarray],
+        partitions: Sequence[Partition],
+        weights: Optional[Sequence[int]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> List[Result]:
+        """
+        Compute the results of every partition.
+
+        Args:
+            function: Batch function; must be picklable for the parallel executor
+            columns: Numeric columns the partitions index into
+            partitions: Units of work, in output order
+            weights: Relative cost of each partition, used to balance batches
+            on_progress: Called with the number of partitions done after each batch
+
+        Returns:
+            One result per partition, in partition order
+        """
+        batches = [[partition] for partition in partitions]
+        return self._run_batches(function, columns, batches, on_progress)
+
+
+class ChunkedExecutor(Executor):
+    """
+    Runs partitions in process, in batches of bounded weight.
+    """
+
+    name = "chunked"
+
+    def __init__(self, chunk_weight: int = 100_000):
+        """
+        Initialize the executor.
+
+        Args:
+            chunk_weight: Maximum total weight, typically rows, of one batch
+        """
+        self.chunk_weight = chunk_weight
+
+    def map_partitions(
+        self,
+        function: BatchFunction,
+        columns: Dict[str, np.ndarray],
+        partitions: Sequence[Partition],
+        weights: Optional[Sequence[int]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> List[Result]:
+        batches = _batches(partitions, weights, self.chunk_weight)
+        return self._run_batches(function, columns, batches, on_progress)
+
+
+class _SharedColumn(NamedTuple):
+    """
+    Location of one column in shared memory.
+    """
+
+    name: str
+    block_name: str
+    dtype: str
+    length: int
+
+
+def _run_shared_batch(
+    function: BatchFunction,
+    shared_columns: List[_SharedColumn],
+    batch: List[Partition],
+) -> List[Result]:
+    """
+    Attach to the shared columns and run one batch in a worker process.
+    """
+    # Pool workers share the parent's resource tracker; the parent unlinks blocks.
+    blocks = [shared_memory.SharedMemory(name=c.block_name) for c in shared_columns]
+    try:
+        columns = {
+            column.name: np.ndarray((column.length,), column.dtype, block.buf)
+            for column, block in zip(shared_columns, blocks)
+        }
+        results = function(columns, batch)
+        del columns
+    finally:
+        for block in blocks:
+            block.close()
+    return results
+
+
+# Worker pools by worker count, started on first use and shut down at exit.
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool with the given number of workers, shared by all executors.
+    """
+    if workers not in _pools:
+        # Spawned workers avoid forking a parent that may already run threads.
+        _pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pools[workers]
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    while _pools:
+        _pools.popitem()[1].shutdown(cancel_futures=True)
+
+
+class ParallelExecutor(Executor):
+    """
+    Runs batches of partitions across a process pool.
+    """
+
+    name = "parallel"
+
+    def __init__(self, workers: int = 2):
+        """
+        Initialize the executor.
+
+        Args:
+            workers: Number of worker processes
+        """
+        self.workers = workers
+
+    def map_partitions(
+        self,
+        function: BatchFunction,
+        columns: Dict[str, np.ndarray],
+        partitions: Sequence[Partition],
+        weights: Optional[Sequence[int]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> List[Result]:
+        # A few batches per worker so a slow batch does not stall the pool.
+        n_batches = min(len(partitions), self.workers * 4) or 1
+        total_weight = sum(weights) if weights is not None else len(partitions)
+        batches = _batches(
+            partitions, weights, math.ceil(max(total_weight, 1) / n_batches)
+        )
+
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            shared_columns = []
+            for name, values in columns.items():
+                values = np.ascontiguousarray(values)
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(values.nbytes, 1)
+                )
+                blocks.append(block)
+                np.ndarray(values.shape, values.dtype, block.buf)[:] = values
+                shared_columns.append(
+                    _SharedColumn(name, block.name, values.dtype.str, len(values))
+                )
+
+            pool = _pool(self.workers)
+            try:
+                batch_results = pool.map(
+                    _run_shared_batch,
+                    [function] * len(batches),
+                    [shared_columns] * len(batches),
+                    batches,
+                )
+                results: List[Result] = []
+                for batch_result in batch_results:
+                    results.extend(batch_result)
+                    if on_progress is not None:
+                        on_progress(len(results))
+                return results
+            except BrokenProcessPool:
+                # A dead worker breaks the pool for good; start a new one next time.
+                _pools.pop(self.workers, None)
+                raise
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+executor_names = [Executor.name, ChunkedExecutor.name, ParallelExecutor.name]
+
+
+def create_executor(name: Optional[str] = None, workers: int = 1) -> Executor:
+    """
+    Build an executor by name.
+
+    Args:
+        name: One of executor_names; None picks serial
+        workers: Number of worker processes of the parallel executor
+
+    Returns:
+        The executor
+
+    Raises:
+        ValueError: If the name is unknown, workers is less than 1, or workers
+            is more than 1 for an executor other than parallel
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if name is None:
+        name = Executor.name
+    if workers > 1 and name != ParallelExecutor.name:
+        raise ValueError("--workers requires --executor parallel")
+    if name == Executor.name:
+        return Executor()
+    if name == ChunkedExecutor.name:
+        return ChunkedExecutor()
+    if name == ParallelExecutor.name:
+        return ParallelExecutor(workers)
+    raise ValueError(f"Unknown executor {name}; expected one of {executor_names}")
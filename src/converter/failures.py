@@ -0,0 +1,92 @@
+"""
+Per-symbol error isolation of fail-soft conversions.
+
+A symbol whose history can't be reconciled, such as a quantity mismatch with
+fix_exceed_range off or a held position of zero shares, normally stops the
+whole conversion. In fail-soft mode the error is recorded as a SymbolFailure
+instead, the symbol's rows are left out and every other symbol is converted.
+The failures are written to a JSON error report, and a later run given the
+report converts only the failed symbols.
+"""
+
+import json
+from typing import List, NamedTuple, Sequence
+
+# Errors isolated to their symbol in fail-soft mode; others stop the conversion.
+symbol_errors = (NotImplementedError, ArithmeticError)
+
+# Version of the error report layout.
+REPORT_VERSION = 1
+
+
+class SymbolFailure(NamedTuple):
+    """
+    Error that left one symbol out of a fail-soft conversion.
+
+    Attributes:
+        symbol: Symbol whose rows were left out
+        stage: Pipeline stage the error was raised in
+        error: Exception class name
+        message: Exception message
+    """
+
+    symbol: str
+    stage: str
+    error: str
+    message: str
+
+    @classmethod
+    def from_exception(
+        cls, symbol: str, stage: str, exception: BaseException
+    ) -> "SymbolFailure":
+        return cls(symbol, stage, type(exception).__name__, str(exception))
+
+
+def write_error_report(
+    path: str,
+    converter_name: str,
+    input_paths: Sequence[str],
+    failures: Sequence[SymbolFailure],
+) -> None:
+    """
+    Write the failures of a conversion as a JSON error report.
+
+    Args:
+        path: Path of the report
+        converter_name: Name of the converter that ran
+        input_paths: Files the conversion read
+        failures: Failures of the conversion, possibly none
+    """
+    report = {
+        "version": REPORT_VERSION,
+        "converter": converter_name,
+        "inputs": list(input_paths),
+        "failed_symbols": [failure.symbol for failure in failures],
+        "failures": [failure._asdict() for failure in failures],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def read_failed_symbols(path: str) -> List[str]:
+    """
+    Read the failed symbols of an error report.
+
+    Args:
+        path: Path of a report written by write_error_report
+
+    Returns:
+        The failed symbols, in report order
+
+    Raises:
+        ValueError: If the file is not an error report
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            report = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not an error report: {e}") from e
+    if not isinstance(report, dict) or report.get("version") != REPORT_VERSION:
+        raise ValueError(f"{path} is not a version {REPORT_VERSION} error report")
+    return [str(symbol) for symbol in report["failed_symbols"]]
@@ -0,0 +1,154 @@
+"""
+Currency normalization of statement amounts.
+
+Statements can mix currencies: prices are quoted in the trade currency while
+fees are charged in the settlement currency. The functions here compute, for
+every row at once, the factor that turns an amount into the output currency,
+either from the statement's own exchange rate column or from a local rate
+table joined as of each trade date.
+
+A rate table is a CSV file with the columns ``Date``, ``Currency`` and
+``Rate``, where Rate is the number of output-currency units one unit of
+Currency was worth on Date. Rows of the output currency itself need no entry.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .readers import read_table
+
+# Columns of a rate table.
+fx_rate_columns = ["Date", "Currency", "Rate"]
+
+
+def statement_rate_factors(
+    trade_currencies: pd.Series,
+    settlement_currencies: pd.Series,
+    rates: pd.Series,
+    currency: str,
+) -> List[np.ndarray]:
+    """
+    Conversion factors from the statement's own exchange rates.
+
+    The statement rate is taken as settlement-currency units per unit of
+    trade currency, so amounts can be expressed in either currency of a row.
+
+    Args:
+        trade_currencies: Trade currency of each row
+        settlement_currencies: Settlement currency of each row
+        rates: Statement exchange rate of each row
+        currency: Output currency
+
+    Returns:
+        Factors for trade-currency amounts and for settlement-currency amounts
+
+    Raises:
+        ValueError: If the output currency is neither currency of some row
+    """
+    trade = trade_currencies.astype(str).to_numpy()
+    settlement = settlement_currencies.astype(str).to_numpy()
+    rate = rates.to_numpy(dtype=float)
+
+    in_trade = trade == currency
+    in_settlement = settlement == currency
+    unconvertible = ~(in_trade | in_settlement)
+    if unconvertible.any():
+        pairs = sorted(set(zip(trade[unconvertible], settlement[unconvertible])))
+        raise ValueError(
+            f"Statement rates can't convert {pairs} to {currency}; "
+            "use a rate table instead"
+        )
+
+    # Same-currency rows have no meaningful rate and need no conversion.
+    same = trade == settlement
+    trade_factors = np.where(in_trade | same, 1.0, rate)
+    settlement_factors = np.where(in_settlement | same, 1.0, 1.0 / rate)
+    return [trade_factors, settlement_factors]
+
+
+def table_rate_factors(
+    dates: pd.Series,
+    currency_columns: List[pd.Series],
+    table: pd.DataFrame,
+    currency: str,
+) -> List[np.ndarray]:
+    """
+    Conversion factors from a rate table, as of each row's date.
+
+    Each currency column is resolved with one sorted as-of join, taking the
+    latest rate on or before the row's date.
+
+    Args:
+        dates: Date of each row
+        currency_columns: Currency of each row, one series per kind of amount
+        table: Rate table sorted by Date, see load_rate_table
+        currency: Output currency
+
+    Returns:
+        One factor array per currency column
+
+    Raises:
+        ValueError: If a currency has no rate on or before a row's date
+    """
+    dates = pd.to_datetime(dates).to_numpy()
+    order = np.argsort(dates, kind="stable")
+    factors = []
+    for currencies in currency_columns:
+        rows = pd.DataFrame(
+            {
+                "Date": dates[order],
+                "Currency": currencies.astype(str).to_numpy()[order],
+            }
+        )
+        joined = pd.merge_asof(rows, table, on="Date", by="Currency")
+        rate = joined["Rate"].to_numpy(dtype=float)
+        rate[rows["Currency"].to_numpy() == currency] = 1.0
+
+        missing = np.isnan(rate)
+        if missing.any():
+            first = rows[missing].drop_duplicates("Currency")
+            raise ValueError(
+                f"No {currency} rate on or before "
+                + ", ".join(
+                    f"{row.Date:%Y-%m-%d} for {row.Currency}"
+                    for row in first.itertuples()
+                )
+            )
+
+        factor = np.empty_like(rate)
+        factor[order] = rate
+        factors.append(factor)
+    return factors
+
+
+@lru_cache(maxsize=8)
+def _load_rate_table(path: str, mtime_ns: int) -> pd.DataFrame:
+    table = read_table(path, encoding="utf-8-sig")
+    missing = [column for column in fx_rate_columns if column not in table.columns]
+    if missing:
+        raise ValueError(f"Columns {missing} are missing from {path}")
+    table = table[fx_rate_columns].dropna()
+    table["Date"] = pd.to_datetime(table["Date"])
+    table["Currency"] = table["Currency"].astype(str).str.strip()
+    table["Rate"] = table["Rate"].astype(float)
+    return table.sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def load_rate_table(path: str) -> pd.DataFrame:
+    """
+    Load a rate table, reusing the parsed table while the file is unchanged.
+
+    Args:
+        path: CSV file with the fx_rate_columns
+
+    Returns:
+        Rate table sorted by Date; treat as read-only
+    """
+    if not Path(path).is_file():
+        raise FileNotFoundError(f"Rate table not found: {path}")
+    return _load_rate_table(os.path.abspath(path), os.stat(path).st_mtime_ns)
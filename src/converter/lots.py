@@ -0,0 +1,169 @@
+"""
+Lot matching for per-lot Yahoo Finance exports.
+
+The engine walks every symbol's transactions once in trade date order and keeps
+the open lots in a deque, so matching is linear in the number of transactions.
+"""
+
+from collections import deque
+from typing import Deque, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .utils import yf_columns
+
+# Supported lot relief methods.
+lot_methods = ["fifo", "lifo", "average"]
+
+# Quantities smaller than this are treated as fully closed.
+QUANTITY_TOLERANCE = 1e-9
+
+# An open lot: (trade date, signed quantity, unit price, commission per share, comment)
+Lot = Tuple[pd.Timestamp, float, float, float, str]
+
+
+def _relieve(lots: Deque[Lot], quantity: float, method: str) -> float:
+    """
+    Close up to quantity shares of the open lots in place.
+
+    Args:
+        lots: Open lots of a single direction
+        quantity: Unsigned quantity to close
+        method: "fifo" closes the oldest lots first, "lifo" the newest
+
+    Returns:
+        The unsigned quantity left over once every lot is closed
+    """
+    while lots and quantity > QUANTITY_TOLERANCE:
+        lot = lots[0] if method == "fifo" else lots[-1]
+        lot_quantity = abs(lot[1])
+        if lot_quantity <= quantity + QUANTITY_TOLERANCE:
+            quantity -= lot_quantity
+            if method == "fifo":
+                lots.popleft()
+            else:
+                lots.pop()
+            continue
+
+        remaining = lot_quantity - quantity
+        updated = (lot[0], np.copysign(remaining, lot[1]), lot[2], lot[3], lot[4])
+        if method == "fifo":
+            lots[0] = updated
+        else:
+            lots[-1] = updated
+        quantity = 0.0
+    return max(quantity, 0.0)
+
+
+def _average_lot(lots: Deque[Lot]) -> Deque[Lot]:
+    """
+    Merge open lots into one lot at the weighted average unit price.
+
+    The merged lot keeps the date of the oldest lot, which is when the
+    current holding period started.
+    """
+    if len(lots) < 2:
+        return lots
+
+    total_quantity = sum(lot[1] for lot in lots)
+    total_cost = sum(lot[1] * lot[2] for lot in lots)
+    total_commission = sum(abs(lot[1]) * lot[3] for lot in lots)
+    first = lots[0]
+    return deque(
+        [
+            (
+                first[0],
+                total_quantity,
+                total_cost / total_quantity,
+                total_commission / abs(total_quantity),
+                first[4],
+            )
+        ]
+    )
+
+
+def open_lots(df: pd.DataFrame, method: str = "fifo") -> pd.DataFrame:
+    """
+    Match transactions into lots and return the lots that remain open.
+
+    Transactions are processed per symbol in trade date order. On the same
+    date, buys are processed before sells. A trade first closes lots of the
+    opposite direction; any remainder opens a new lot, so sells that exceed the
+    holding open short lots which later buys cover.
+
+    Commissions of opening trades are carried on the lot per share, so a
+    partially closed lot keeps its share of the commission.
+
+    Args:
+        df: Transactions in Yahoo Finance format with datetime "Trade Date"
+        method: Lot relief method, one of lot_methods
+
+    Returns:
+        Open lots in Yahoo Finance format, one row per lot
+
+    Raises:
+        ValueError: If method is not a supported lot method
+    """
+    if method not in lot_methods:
+        raise ValueError(f"Unsupported lot method: {method}")
+
+    symbol_codes, symbol_names = pd.factorize(df["Symbol"], sort=False)
+    is_sell = (df["Action"] == "SELL").to_numpy()
+    order = np.lexsort((is_sell, df["Trade Date"].to_numpy(), symbol_codes))
+
+    codes = symbol_codes[order].tolist()
+    dates = df["Trade Date"].to_numpy()[order]
+    signed_quantities = np.where(
+        is_sell,
+        -df["Quantity"].to_numpy(dtype=float),
+        df["Quantity"].to_numpy(dtype=float),
+    )[order].tolist()
+    prices = df["Purchase Price"].to_numpy(dtype=float)[order].tolist()
+    commissions = df["Commission"].fillna(0).to_numpy(dtype=float)[order].tolist()
+    comments = df["Comment"].fillna("").to_numpy(dtype=object)[order].tolist()
+
+    relief = "lifo" if method == "lifo" else "fifo"
+    lot_rows: List[Tuple[int, Lot]] = []
+    lots: Deque[Lot] = deque()
+    current_code = None
+    for i, code in enumerate(codes):
+        if code != current_code:
+            if method == "average":
+                lots = _average_lot(lots)
+            lot_rows.extend((current_code, lot) for lot in lots)
+            lots = deque()
+            current_code = code
+
+        quantity = signed_quantities[i]
+        if abs(quantity) <= QUANTITY_TOLERANCE:
+            continue
+
+        if lots and (lots[0][1] > 0) != (quantity > 0):
+            # Average cost relief closes shares at the pooled unit price.
+            if method == "average":
+                lots = _average_lot(lots)
+            left = _relieve(lots, abs(quantity), relief)
+            if left <= QUANTITY_TOLERANCE:
+                continue
+            quantity = np.copysign(left, quantity)
+
+        commission_per_share = commissions[i] / abs(signed_quantities[i])
+        lots.append((dates[i], quantity, prices[i], commission_per_share, comments[i]))
+
+    if method == "average":
+        lots = _average_lot(lots)
+    lot_rows.extend((current_code, lot) for lot in lots)
+
+    result = pd.DataFrame(
+        {
+            "Symbol": [symbol_names[code] for code, _ in lot_rows],
+            "Trade Date": pd.to_datetime([lot[0] for _, lot in lot_rows]),
+            "Action": ["BUY" if lot[1] > 0 else "SELL" for _, lot in lot_rows],
+            "Quantity": [abs(lot[1]) for _, lot in lot_rows],
+            "Purchase Price": [abs(lot[2]) for _, lot in lot_rows],
+            "Commission": [abs(lot[1]) * lot[3] for _, lot in lot_rows],
+            "Comment": [lot[4] for _, lot in lot_rows],
+        }
+    )
+    return result[yf_columns]
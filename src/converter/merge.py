@@ -0,0 +1,169 @@
+"""
+Merging of overlapping transaction history exports.
+
+Brokers limit the date range of one history export, so a long history is
+downloaded as several files whose ranges overlap. The files are merged with a
+streaming k-way merge on the trade date, and rows present in more than one
+file are kept once.
+
+A row that appears n times in one file is a real repeated trade, so across
+files each distinct row is kept as often as the file that contains it most
+often. Since the merge yields all rows of one date together, duplicates are
+only tracked within the current date, keyed by a 64-bit row hash.
+"""
+
+import csv
+import hashlib
+import heapq
+import io
+from collections import Counter
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .readers import open_text
+
+DateKey = Tuple[str, str, str]
+
+
+def us_date_key(value: str) -> DateKey:
+    """
+    Sort key of an MM/DD/YYYY date, ignoring any trailing "as of" date.
+
+    Args:
+        value: Date text such as "04/01/2026" or "04/01/2026 as of 03/31/2026"
+
+    Returns:
+        Tuple of (year, month, day) text that sorts chronologically
+    """
+    return value[6:10], value[0:2], value[3:5]
+
+
+def _row_hash(row: Sequence[str]) -> bytes:
+    return hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=8).digest()
+
+
+def _read_sorted_rows(
+    path: str,
+    file_index: int,
+    header: List[str],
+    date_column: str,
+    date_key: Callable[[str], DateKey],
+    descending: bool,
+) -> Iterator[Tuple[DateKey, int, List[str]]]:
+    """
+    Yield (date key, file index, row) from one export in file order.
+
+    Rows are reordered to the columns of header. The file must be sorted by
+    date in the expected direction.
+    """
+    with open_text(path, "utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        file_header = next(reader, [])
+        missing = [column for column in header if column not in file_header]
+        if missing:
+            raise ValueError(f"Columns {missing} are missing from {path}")
+        order = [file_header.index(column) for column in header]
+        date_index = header.index(date_column)
+
+        previous = None
+        for line_number, row in enumerate(reader, start=2):
+            if not row:
+                continue
+            row = [row[i] if i < len(row) else "" for i in order]
+            key = date_key(row[date_index])
+            if previous is not None and (
+                key > previous if descending else key < previous
+            ):
+                raise ValueError(
+                    f"{path} is not sorted by {date_column} at line {line_number}"
+                )
+            previous = key
+            yield key, file_index, row
+
+
+def merge_history_files(
+    paths: Sequence[str],
+    date_column: str = "Date",
+    date_key: Callable[[str], DateKey] = us_date_key,
+    descending: bool = True,
+) -> Tuple[List[str], Iterator[List[str]]]:
+    """
+    Stream the rows of several history exports merged by date, without duplicates.
+
+    Within one date, rows keep the order of the first file they appear in.
+
+    Args:
+        paths: History exports, each sorted by date
+        date_column: Column holding the trade date
+        date_key: Function turning date text into a sortable key
+        descending: Whether the exports list the newest date first
+
+    Returns:
+        Tuple of (header of the first export, iterator of merged rows)
+
+    Raises:
+        ValueError: If an export lacks a column of the first export or, while
+            iterating, if an export is not sorted by date
+    """
+    with open_text(paths[0], "utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), [])
+    if date_column not in header:
+        raise ValueError(f"Column {date_column} is missing from {paths[0]}")
+
+    streams = [
+        _read_sorted_rows(path, file_index, header, date_column, date_key, descending)
+        for file_index, path in enumerate(paths)
+    ]
+    merged = heapq.merge(*streams, key=lambda item: item[0], reverse=descending)
+
+    def deduplicated() -> Iterator[List[str]]:
+        current_key = None
+        kept: Counter = Counter()
+        seen_in_file: Counter = Counter()
+        for key, file_index, row in merged:
+            if key != current_key:
+                current_key = key
+                kept.clear()
+                seen_in_file.clear()
+            row_hash = _row_hash(row)
+            seen_in_file[file_index, row_hash] += 1
+            if seen_in_file[file_index, row_hash] > kept[row_hash]:
+                kept[row_hash] += 1
+                yield row
+
+    return header, deduplicated()
+
+
+def merged_history_csv(
+    paths: Sequence[str], max_rows: Optional[int] = None, **kwargs
+) -> io.StringIO:
+    """
+    Merge history exports into an in-memory CSV readable by pandas.read_csv.
+
+    Writing the merged rows back to CSV keeps pandas' type inference and
+    missing-value handling identical to reading a single export.
+
+    Args:
+        paths: History exports, each sorted by date
+        max_rows: Merged rows to keep from the start, all when None
+        **kwargs: Keyword arguments passed to merge_history_files
+
+    Returns:
+        Text buffer positioned at the start of the merged CSV
+    """
+    header, rows = merge_history_files(paths, **kwargs)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    writer.writerow(header)
+    writer.writerows(islice(rows, max_rows))
+    buffer.seek(0)
+    return buffer
+
+
+def history_paths(paths: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Normalize a history argument given as one path or a list of paths.
+    """
+    if isinstance(paths, str):
+        return [paths]
+    return list(paths)
@@ -0,0 +1,201 @@
+"""
+Recognition and pairing of broker exports found in a folder.
+
+Exports are recognized by their header rows rather than their names, so a
+renamed file is still picked up. Schwab history and positions exports are
+paired by the account name Schwab puts at the start of both file names.
+"""
+
+import csv
+import logging
+import os
+import re
+import zipfile
+from itertools import islice
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .cathay_sub_brokerage import CathaySubBrokerageConverter, cathay_columns
+from .readers import (
+    cell_text,
+    export_name,
+    is_workbook,
+    iter_sheet_rows,
+    open_text,
+    sniff_encoding,
+)
+from .schwab import SchwabConverter, schwab_columns
+
+# Suffix of converted files, which are never treated as inputs.
+output_suffix = "_yahoo_finance.csv"
+
+SCHWAB_HISTORY = "schwab_history"
+SCHWAB_POSITIONS = "schwab_positions"
+CATHAY_STATEMENT = "cathay_statement"
+
+# Lines searched for a header; Schwab positions exports start with a title line.
+HEADER_SEARCH_LINES = 20
+
+
+class ConversionJob(NamedTuple):
+    """
+    A set of exports that convert into one Yahoo Finance file.
+
+    Attributes:
+        converter_name: Name of the converter in converter_mapping
+        account: Account the exports belong to
+        arguments: Converter keyword arguments naming the input paths
+        input_paths: Every input file of the job
+        output_path: Path of the converted file, next to the inputs
+    """
+
+    converter_name: str
+    account: str
+    arguments: Dict[str, Union[str, List[str]]]
+    input_paths: List[str]
+    output_path: str
+
+
+def classify_export(path: str) -> Optional[str]:
+    """
+    Recognize the kind of broker export from its header row.
+
+    Args:
+        path: Path to a CSV file or workbook
+
+    Returns:
+        SCHWAB_HISTORY, SCHWAB_POSITIONS or CATHAY_STATEMENT, None otherwise
+    """
+    try:
+        if is_workbook(path):
+            sheet_rows = iter_sheet_rows(path)
+            rows = [
+                [cell_text(value) for value in row if value is not None]
+                for row in islice(sheet_rows, HEADER_SEARCH_LINES)
+            ]
+            sheet_rows.close()
+        else:
+            encoding = sniff_encoding(path)
+            with open_text(path, encoding, errors="replace") as f:
+                rows = list(csv.reader(islice(f, HEADER_SEARCH_LINES)))
+    except OSError:
+        return None
+    except (ImportError, zipfile.BadZipFile) as e:
+        logging.warning(f"Could not read {path}: {e}")
+        return None
+
+    for i, row in enumerate(rows):
+        if i == 0 and all(column in row for column in schwab_columns):
+            return SCHWAB_HISTORY
+        if i == 0 and all(column in row for column in cathay_columns):
+            return CATHAY_STATEMENT
+        if all(column in row for column in ["Symbol", "Qty (Quantity)"]):
+            return SCHWAB_POSITIONS
+    return None
+
+
+def account_name(path: str, kind: str) -> str:
+    """
+    Extract the account name from an export file name.
+
+    Schwab names history exports like "Individual_XXX123_Transactions_...csv"
+    and positions exports like "Individual-Positions-2025-01-28-...csv"; both
+    yield "Individual". Other names yield the file name without extension.
+
+    Args:
+        path: Path to the export
+        kind: Kind of export returned by classify_export
+
+    Returns:
+        The account name
+    """
+    stem = os.path.splitext(os.path.basename(export_name(path)))[0]
+    if kind == SCHWAB_HISTORY:
+        match = re.match(r"(.+?)_Transactions", stem)
+        if match:
+            # Drop the masked account number, e.g. "_XXX123".
+            return re.sub(r"_[X\d.]+$", "", match.group(1))
+    elif kind == SCHWAB_POSITIONS:
+        match = re.match(r"(.+?)-Positions", stem)
+        if match:
+            return match.group(1)
+    return stem
+
+
+def _output_path(path: str) -> str:
+    return os.path.splitext(export_name(path))[0] + output_suffix
+
+
+def _newest(paths: List[str]) -> str:
+    if len(paths) > 1:
+        logging.info(f"Using the newest of {len(paths)} exports: {paths}")
+    return max(paths, key=lambda path: (os.path.getmtime(path), path))
+
+
+def pair_exports(paths: Iterable[str]) -> Tuple[List[ConversionJob], List[str]]:
+    """
+    Group broker exports into conversion jobs.
+
+    Each Cathay statement converts on its own. Schwab history and positions
+    exports are paired by account name; all history exports of an account are
+    merged, and of several positions exports the newest is used. If exactly
+    one Schwab account has only history and one only positions, they are
+    paired with each other.
+
+    Args:
+        paths: Candidate file paths; converted outputs are ignored
+
+    Returns:
+        Tuple of (jobs, paths that are not part of any job)
+    """
+    histories: Dict[str, List[str]] = {}
+    positions: Dict[str, List[str]] = {}
+    jobs: List[ConversionJob] = []
+    unused: List[str] = []
+
+    for path in sorted(paths):
+        if export_name(path).endswith(output_suffix):
+            continue
+        kind = classify_export(path)
+        if kind == CATHAY_STATEMENT:
+            jobs.append(
+                ConversionJob(
+                    CathaySubBrokerageConverter.converter_name,
+                    account_name(path, kind),
+                    {"statement_of_account_file_path": path},
+                    [path],
+                    _output_path(path),
+                )
+            )
+        elif kind == SCHWAB_HISTORY:
+            histories.setdefault(account_name(path, kind), []).append(path)
+        elif kind == SCHWAB_POSITIONS:
+            positions.setdefault(account_name(path, kind), []).append(path)
+        else:
+            unused.append(path)
+
+    pairs = [(account, account) for account in histories if account in positions]
+    lone_histories = [account for account in histories if account not in positions]
+    lone_positions = [account for account in positions if account not in histories]
+    if len(lone_histories) == 1 and len(lone_positions) == 1:
+        pairs.append((lone_histories[0], lone_positions[0]))
+
+    for history_account, positions_account in pairs:
+        positions_path = _newest(positions.pop(positions_account))
+        history_group = histories.pop(history_account)
+        jobs.append(
+            ConversionJob(
+                SchwabConverter.converter_name,
+                history_account,
+                {
+                    "history_data_path": history_group,
+                    "positions_data_path": positions_path,
+                },
+                history_group + [positions_path],
+                _output_path(positions_path),
+            )
+        )
+
+    for group in list(histories.values()) + list(positions.values()):
+        unused.extend(group)
+
+    return jobs, unused
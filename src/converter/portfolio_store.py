@@ -0,0 +1,214 @@
+"""
+Persistent store of converted transactions for point-in-time holdings.
+
+Converted Yahoo Finance tables are saved per account as signed quantities
+indexed by (symbol, trade date), together with the running position after
+each transaction. Holdings on any date are then answered for every symbol at
+once with a binary search over those precomputed arrays, without converting
+the broker exports again.
+
+The store is either a SQLite database with a ``transactions`` table or a
+Parquet file with the same columns, chosen by file suffix like the price
+store. Parquet needs pyarrow (the "parquet" extra).
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .price_store import PARQUET_SUFFIXES
+
+# Columns of the stored transactions; trade_date is an integer YYYYMMDD.
+store_columns = ["account", "symbol", "trade_date", "quantity", "position"]
+
+# Sign of the quantity of each Yahoo Finance action; other actions hold still.
+action_signs = {"BUY": 1.0, "SELL": -1.0}
+
+# Trade dates are below this, so symbol_code * DATE_SPAN + date sorts by both.
+DATE_SPAN = 100_000_000
+
+
+def signed_transactions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn a Yahoo Finance table into signed quantities with running positions.
+
+    Args:
+        df: Table with yf_columns
+
+    Returns:
+        Rows sorted by (symbol, trade_date) with store_columns except account
+    """
+    signs = df["Action"].astype(str).map(action_signs).fillna(0.0)
+    rows = pd.DataFrame(
+        {
+            "symbol": df["Symbol"].astype(str).to_numpy(),
+            "trade_date": df["Trade Date"].astype(np.int64).to_numpy(),
+            "quantity": (df["Quantity"].astype(float) * signs).to_numpy(),
+        }
+    ).sort_values(["symbol", "trade_date"], kind="stable", ignore_index=True)
+    rows["position"] = rows.groupby("symbol", sort=False)["quantity"].cumsum()
+    return rows
+
+
+class Holding(NamedTuple):
+    """
+    Quantity of one symbol held on a date.
+    """
+
+    symbol: str
+    quantity: float
+
+
+class PortfolioStore:
+    """
+    Transactions of one or more accounts, saved in a SQLite or Parquet file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the store; created on the first save
+        """
+        self.path = path
+        self.is_parquet = Path(path).suffix.lower() in PARQUET_SUFFIXES
+
+    def save(self, account: str, df: pd.DataFrame) -> int:
+        """
+        Replace the stored transactions of an account.
+
+        Args:
+            account: Account name
+            df: Converted Yahoo Finance table of the account
+
+        Returns:
+            Number of transactions stored
+        """
+        rows = signed_transactions(df)
+        rows.insert(0, "account", account)
+        if self.is_parquet:
+            if Path(self.path).is_file():
+                stored = pd.read_parquet(self.path, columns=store_columns)
+                rows = pd.concat(
+                    [stored[stored["account"] != account], rows], ignore_index=True
+                )
+            rows.to_parquet(self.path, index=False)
+            return int((rows["account"] == account).sum())
+
+        with closing(sqlite3.connect(self.path)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS transactions ("
+                "account TEXT NOT NULL, symbol TEXT NOT NULL, "
+                "trade_date INTEGER NOT NULL, quantity REAL NOT NULL, "
+                "position REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS transactions_account_symbol_date "
+                "ON transactions (account, symbol, trade_date)"
+            )
+            connection.execute("DELETE FROM transactions WHERE account = ?", (account,))
+            connection.executemany(
+                "INSERT INTO transactions VALUES (?, ?, ?, ?, ?)",
+                rows[store_columns].itertuples(index=False, name=None),
+            )
+        return len(rows)
+
+    def accounts(self) -> List[str]:
+        """
+        Names of the stored accounts.
+
+        Raises:
+            FileNotFoundError: If the store doesn't exist
+        """
+        return sorted(self._load(None)["account"].unique().tolist())
+
+    def _load(self, account: Optional[str]) -> pd.DataFrame:
+        # Opening a missing SQLite file read-only fails with an unhelpful
+        # OperationalError, so check first for both backends.
+        if not Path(self.path).is_file():
+            raise FileNotFoundError(f"Portfolio store not found: {self.path}")
+        if self.is_parquet:
+            filters = [("account", "==", account)] if account is not None else None
+            return pd.read_parquet(self.path, columns=store_columns, filters=filters)
+        query = "SELECT * FROM transactions"
+        params: tuple = ()
+        if account is not None:
+            query += " WHERE account = ?"
+            params = (account,)
+        with closing(
+            sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        ) as connection:
+            return pd.read_sql_query(
+                # rowid keeps same-day rows in their saved, cumulative order.
+                query + " ORDER BY symbol, trade_date, rowid",
+                connection,
+                params=params,
+            )
+
+    def positions(self, account: str) -> "PositionIndex":
+        """
+        Position index of an account, cached while the store file is unchanged.
+
+        Raises:
+            FileNotFoundError: If the store doesn't exist
+            KeyError: If the account is not stored
+        """
+        if not Path(self.path).is_file():
+            raise FileNotFoundError(f"Portfolio store not found: {self.path}")
+        return _position_index(
+            os.path.abspath(self.path), os.stat(self.path).st_mtime_ns, account
+        )
+
+
+class PositionIndex:
+    """
+    Running positions of one account, searchable by (symbol, date).
+    """
+
+    def __init__(self, rows: pd.DataFrame):
+        """
+        Args:
+            rows: Stored rows of one account
+        """
+        rows = rows.sort_values(["symbol", "trade_date"], kind="stable")
+        codes, self.symbols = pd.factorize(rows["symbol"], sort=True)
+        self.keys = codes.astype(np.int64) * DATE_SPAN + rows["trade_date"].to_numpy(
+            dtype=np.int64
+        )
+        self.codes = codes
+        self.position = rows["position"].to_numpy(dtype=np.float64)
+
+    def holdings_on(self, date: int, include_closed: bool = False) -> List[Holding]:
+        """
+        Holdings at the end of a date, for every symbol at once.
+
+        Args:
+            date: Date as an integer YYYYMMDD
+            include_closed: Whether to list symbols held at zero quantity
+
+        Returns:
+            Holdings sorted by symbol
+        """
+        codes = np.arange(len(self.symbols), dtype=np.int64)
+        last = np.searchsorted(self.keys, codes * DATE_SPAN + date, side="right") - 1
+        valid = last >= 0
+        valid[valid] = self.codes[last[valid]] == codes[valid]
+        quantities = np.where(valid, self.position[np.maximum(last, 0)], 0.0)
+        return [
+            Holding(symbol, float(quantity))
+            for symbol, quantity in zip(self.symbols, quantities)
+            if include_closed or abs(quantity) > 1e-9
+        ]
+
+
+@lru_cache(maxsize=16)
+def _position_index(path: str, mtime_ns: int, account: str) -> PositionIndex:
+    rows = PortfolioStore(path)._load(account)
+    if rows.empty:
+        raise KeyError(f"Account {account} is not in {path}")
+    return PositionIndex(rows)
@@ -0,0 +1,206 @@
+"""
+Local historical price store used to backfill dummy transactions.
+
+The store is a file the user supplies, either a SQLite database with a
+``prices(symbol, date, close)`` table or a Parquet file with the same columns.
+Dates are ISO ``YYYY-MM-DD`` strings. No network access is ever made. Parquet
+stores need pyarrow (the "parquet" extra).
+"""
+
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+
+# Columns of the price table.
+price_columns = ["symbol", "date", "close"]
+
+# Suffixes read as Parquet; anything else is opened as SQLite.
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+class PriceStore:
+    """
+    Read-only lookup of daily closes indexed by (symbol, date).
+
+    Lookups are batched: all requested symbols are resolved with one query and
+    the answers are cached on the store for later conversions.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a price store.
+
+        Args:
+            path: Path to a SQLite database or Parquet file
+
+        Raises:
+            FileNotFoundError: If the store file does not exist
+        """
+        if not Path(path).is_file():
+            raise FileNotFoundError(f"Price store not found: {path}")
+
+        self.path = path
+        self.is_parquet = Path(path).suffix.lower() in PARQUET_SUFFIXES
+        self._cache: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+        if not self.is_parquet:
+            self._check_sqlite_index()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def _check_sqlite_index(self) -> None:
+        """
+        Warn when the SQLite table has no index leading with (symbol, date).
+        """
+        with closing(self._connect()) as connection:
+            indexed = False
+            for index in connection.execute("PRAGMA index_list(prices)").fetchall():
+                columns = [
+                    row[2]
+                    for row in connection.execute(f"PRAGMA index_info('{index[1]}')")
+                ]
+                indexed = indexed or columns[:2] == ["symbol", "date"]
+        if not indexed:
+            logging.warning(
+                f"Price store {self.path} has no (symbol, date) index. "
+                "Lookups will scan the whole table."
+            )
+
+    @staticmethod
+    def write(path: str, prices: pd.DataFrame) -> None:
+        """
+        Write a price store keyed by (symbol, date).
+
+        A Parquet path is rewritten sorted by (symbol, date); anything else is
+        written as an indexed SQLite database. Existing quotes for the same
+        (symbol, date) are replaced.
+
+        Args:
+            path: Path of the database or Parquet file to create or extend
+            prices: DataFrame with price_columns
+        """
+        if Path(path).suffix.lower() in PARQUET_SUFFIXES:
+            rows = prices[price_columns]
+            if Path(path).is_file():
+                rows = pd.concat(
+                    [pd.read_parquet(path, columns=price_columns), rows],
+                    ignore_index=True,
+                )
+            rows.drop_duplicates(["symbol", "date"], keep="last").sort_values(
+                ["symbol", "date"]
+            ).to_parquet(path, index=False)
+            return
+
+        with closing(sqlite3.connect(path)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS prices ("
+                "symbol TEXT NOT NULL, date TEXT NOT NULL, close REAL NOT NULL, "
+                "PRIMARY KEY (symbol, date)) WITHOUT ROWID"
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, date, close) VALUES (?, ?, ?)",
+                prices[price_columns].itertuples(index=False, name=None),
+            )
+
+    def _query_sqlite(self, requests: pd.DataFrame) -> pd.DataFrame:
+        with closing(self._connect()) as connection:
+            connection.execute(
+                "CREATE TEMP TABLE price_requests (symbol TEXT, cutoff TEXT)"
+            )
+            connection.executemany(
+                "INSERT INTO price_requests VALUES (?, ?)",
+                requests.itertuples(index=False, name=None),
+            )
+            return pd.read_sql_query(
+                "SELECT r.symbol, r.cutoff, p.date, p.close "
+                "FROM price_requests AS r JOIN prices AS p "
+                "ON p.symbol = r.symbol AND p.date = ("
+                "SELECT MAX(date) FROM prices "
+                "WHERE symbol = r.symbol AND date < r.cutoff)",
+                connection,
+            )
+
+    def _query_parquet(self, requests: pd.DataFrame) -> pd.DataFrame:
+        prices = pd.read_parquet(
+            self.path,
+            columns=price_columns,
+            filters=[("symbol", "in", requests["symbol"].unique().tolist())],
+        )
+        prices = prices.assign(
+            timestamp=pd.to_datetime(prices["date"]),
+            symbol=prices["symbol"].astype(str),
+        ).sort_values("timestamp")
+        requests = requests.assign(
+            timestamp=pd.to_datetime(requests["cutoff"])
+        ).sort_values("timestamp")
+        matched = pd.merge_asof(
+            requests,
+            prices,
+            on="timestamp",
+            by="symbol",
+            allow_exact_matches=False,
+        )
+        return matched.dropna(subset=["close"])
+
+    def closes_before(self, cutoffs: Dict[str, str]) -> Dict[str, Tuple[str, float]]:
+        """
+        Look up the last close strictly before a cutoff date for each symbol.
+
+        Args:
+            cutoffs: Mapping of symbol to ISO cutoff date
+
+        Returns:
+            Mapping of symbol to (ISO quote date, close) for symbols with a quote
+        """
+        missing = [
+            (symbol, cutoff)
+            for symbol, cutoff in cutoffs.items()
+            if (symbol, cutoff) not in self._cache
+        ]
+        if missing:
+            requests = pd.DataFrame(missing, columns=["symbol", "cutoff"])
+            if self.is_parquet:
+                found = self._query_parquet(requests)
+            else:
+                found = self._query_sqlite(requests)
+            for symbol, cutoff, date, close in found[
+                ["symbol", "cutoff", "date", "close"]
+            ].itertuples(index=False, name=None):
+                self._cache[(symbol, cutoff)] = (date, float(close))
+            logging.info(
+                f"Price store {self.path}: {len(found)} of {len(missing)} "
+                "lookups found."
+            )
+
+        return {
+            symbol: self._cache[(symbol, cutoff)]
+            for symbol, cutoff in cutoffs.items()
+            if (symbol, cutoff) in self._cache
+        }
+
+
+@lru_cache(maxsize=8)
+def _open_price_store(path: str, mtime_ns: int) -> PriceStore:
+    return PriceStore(path)
+
+
+def open_price_store(path: str) -> PriceStore:
+    """
+    Open a price store, reusing the cached instance while the file is unchanged.
+
+    Args:
+        path: Path to a SQLite database or Parquet file
+
+    Returns:
+        The price store for path
+    """
+    if not Path(path).is_file():
+        raise FileNotFoundError(f"Price store not found: {path}")
+    return _open_price_store(os.path.abspath(path), os.stat(path).st_mtime_ns)
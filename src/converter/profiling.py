@@ -0,0 +1,157 @@
+"""
+Memory profiling of conversion stages.
+
+A MemoryProfiler passed to a converter measures every pipeline stage it runs
+in two ways: the peak of Python and NumPy allocations traced by tracemalloc,
+and the resident set size (RSS) of the process sampled by a background thread.
+Traced peaks are exact but only cover allocations that go through Python's
+allocator hooks; RSS also shows native memory and is what OOM killers see.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional
+
+
+def current_rss() -> Optional[int]:
+    """
+    Resident set size of this process in bytes, None where it can't be read.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class StageMemory(NamedTuple):
+    """
+    Memory used by one stage.
+
+    Attributes:
+        stage: Stage name
+        seconds: Wall time of the stage
+        traced_peak: Peak traced allocations above those live when the stage
+            started, in bytes
+        rss_start: RSS when the stage started, None when unavailable
+        rss_peak: Highest RSS sampled during the stage, None when unavailable
+    """
+
+    stage: str
+    seconds: float
+    traced_peak: int
+    rss_start: Optional[int]
+    rss_peak: Optional[int]
+
+
+class _RssSampler:
+    """
+    Background thread recording the highest RSS until stopped.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def __enter__(self) -> "_RssSampler":
+        if self.peak is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._thread.is_alive():
+            self._stopped.set()
+            self._thread.join()
+        self._sample()
+
+
+class MemoryProfiler:
+    """
+    Collects StageMemory records for the stages run under it.
+    """
+
+    def __init__(self, sample_interval: float = 0.01):
+        """
+        Initialize the profiler; tracemalloc is started if it isn't tracing.
+
+        Args:
+            sample_interval: Seconds between RSS samples
+        """
+        self.sample_interval = sample_interval
+        self.stages: List[StageMemory] = []
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Measure the block as the stage name.
+
+        Args:
+            name: Stage name recorded in stages
+        """
+        traced_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        with _RssSampler(self.sample_interval) as sampler:
+            rss_start = sampler.peak
+            yield
+        _, traced_peak = tracemalloc.get_traced_memory()
+        self.stages.append(
+            StageMemory(
+                name,
+                time.perf_counter() - start,
+                max(traced_peak - traced_start, 0),
+                rss_start,
+                sampler.peak,
+            )
+        )
+
+    @property
+    def traced_peak(self) -> int:
+        """
+        Largest traced peak of any stage, in bytes.
+        """
+        return max((stage.traced_peak for stage in self.stages), default=0)
+
+    def stop(self) -> None:
+        """
+        Stop tracemalloc if this profiler started it.
+        """
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def format_report(self) -> str:
+        """
+        One line per stage with time, traced peak and RSS.
+        """
+        lines = []
+        for stage in self.stages:
+            line = (
+                f"{stage.stage:<10} {stage.seconds:8.3f}s  "
+                f"traced peak {stage.traced_peak / 2**20:9.1f} MiB"
+            )
+            if stage.rss_peak is not None:
+                line += (
+                    f"  RSS peak {stage.rss_peak / 2**20:9.1f} MiB "
+                    f"(+{(stage.rss_peak - stage.rss_start) / 2**20:.1f})"
+                )
+            lines.append(line)
+        return "\n".join(lines)
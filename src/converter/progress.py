@@ -0,0 +1,152 @@
+"""
+Progress events reported by converters during long conversions.
+
+Converters report every unit of work to a ProgressReporter. The reporter only
+builds an event and calls the callback when the stage changes or when the
+minimum interval has passed, so reporting is cheap enough to leave on.
+
+Rows are counted per stage: rows read by load, normalized rows, history rows
+reconciled and rows emitted. The reported rate is the current throughput,
+measured over the window since the previous event, so it does not decay
+while a slow stage is still working.
+"""
+
+import time
+from typing import Callable, NamedTuple, Optional
+
+# Conversion stages in order, with the share of the overall work they end at.
+stage_fractions = {
+    "load": 0.1,
+    "normalize": 0.2,
+    "reconcile": 0.9,
+    "emit": 1.0,
+}
+
+
+class ProgressEvent(NamedTuple):
+    """
+    Snapshot of a conversion in progress.
+
+    Attributes:
+        converter: Name of the reporting converter
+        stage: Current stage, one of stage_fractions
+        rows_processed: Rows processed so far in the current stage
+        symbols_reconciled: Symbols reconciled so far
+        total_symbols: Symbols to reconcile, 0 when not known yet
+        rows_per_second: Rows of the stage processed per second since the
+            previous event
+        fraction: Estimated share of the conversion completed, 0 to 1
+    """
+
+    converter: str
+    stage: str
+    rows_processed: int
+    symbols_reconciled: int
+    total_symbols: int
+    rows_per_second: float
+    fraction: float
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """
+    Throttled source of ProgressEvents for one conversion.
+    """
+
+    def __init__(
+        self,
+        converter_name: str,
+        callback: Optional[ProgressCallback] = None,
+        min_interval: float = 0.1,
+    ):
+        """
+        Initialize the reporter.
+
+        Args:
+            converter_name: Name of the reporting converter
+            callback: Function receiving events, None to disable reporting
+            min_interval: Minimum seconds between events within a stage
+        """
+        self.converter_name = converter_name
+        self.callback = callback
+        self.min_interval = min_interval
+        self.started = time.monotonic()
+        self.stage = ""
+        self.input_rows = 0
+        self.rows_processed = 0
+        self.symbols_reconciled = 0
+        self.total_symbols = 0
+        self._last_emit = self.started
+        self._last_emit_rows = 0
+
+    def update(
+        self,
+        stage: str,
+        rows: Optional[int] = None,
+        symbols: Optional[int] = None,
+        total_symbols: Optional[int] = None,
+    ) -> None:
+        """
+        Record progress and emit an event if one is due.
+
+        Args:
+            stage: Current stage, one of stage_fractions
+            rows: Rows processed so far in the stage, if changed
+            symbols: Symbols reconciled so far, if changed
+            total_symbols: Symbols to reconcile, if known
+        """
+        if stage == "load" and rows is not None:
+            self.input_rows = rows
+        if self.callback is None:
+            return
+
+        stage_changed = stage != self.stage
+        if stage_changed:
+            self.rows_processed = 0
+        if rows is not None:
+            self.rows_processed = rows
+        if symbols is not None:
+            self.symbols_reconciled = symbols
+        if total_symbols is not None:
+            self.total_symbols = total_symbols
+
+        now = time.monotonic()
+        if not stage_changed and now - self._last_emit < self.min_interval:
+            return
+        window_rows = self.rows_processed - (
+            0 if stage_changed else self._last_emit_rows
+        )
+        rows_per_second = window_rows / max(now - self._last_emit, 1e-9)
+        self.stage = stage
+        self._last_emit = now
+        self._last_emit_rows = self.rows_processed
+        self.callback(self._event(rows_per_second))
+
+    def _event(self, rows_per_second: float) -> ProgressEvent:
+        fraction = stage_fractions.get(self.stage, 0.0)
+        if self.stage == "reconcile" and self.total_symbols:
+            start = stage_fractions["normalize"]
+            fraction = start + (fraction - start) * (
+                self.symbols_reconciled / self.total_symbols
+            )
+        return ProgressEvent(
+            self.converter_name,
+            self.stage,
+            self.rows_processed,
+            self.symbols_reconciled,
+            self.total_symbols,
+            rows_per_second,
+            fraction,
+        )
+
+
+def format_progress(event: ProgressEvent) -> str:
+    """
+    Format a progress event as a single status line.
+    """
+    line = f"[{event.converter}] {event.stage}: {event.rows_processed:,} rows"
+    if event.total_symbols:
+        line += f", {event.symbols_reconciled:,}/{event.total_symbols:,} symbols"
+    return line + f", {event.rows_per_second:,.0f} rows/s ({event.fraction:.0%})"
@@ -0,0 +1,341 @@
+"""
+Readers of broker exports: compression, text encoding and Excel workbooks.
+
+Archived exports may be compressed with gzip, bzip2, xz or Zstandard. The
+compression is recognized by file suffix or, for renamed files, by the magic
+bytes at the start of the file, and the data is decompressed as it is read,
+never to a file on disk. Zstandard needs the optional zstandard package.
+
+Cathay statements arrive as UTF-8, UTF-8 with a byte order mark, or Big5
+(CP950) depending on how they were downloaded and saved. The encoding is
+decided from a short prefix of the file and cached per file version; the file
+itself is then decoded by the CSV parser as it reads, in a single pass.
+
+Exports saved as Excel workbooks (.xlsx) are read from their first sheet with
+openpyxl in read-only mode, which streams rows from the file instead of
+loading the whole workbook. The rows are turned into a DataFrame directly,
+with the same read options as pandas.read_csv, so the converters' pipelines
+run unchanged. openpyxl is an optional dependency (the "xlsx" extra).
+"""
+
+import bz2
+import codecs
+import datetime
+import gzip
+import io
+import lzma
+import os
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+# Compression method of each compressed file suffix, named as in pandas.
+compression_suffixes = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+
+# Leading bytes of each compressed format.
+compression_magic = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+# Bytes read to decide the encoding.
+SNIFF_BYTES = 64 * 1024
+
+# Encoding assumed when a file is not valid UTF-8.
+FALLBACK_ENCODING = "cp950"
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Detect the compression of a file from its suffix or its magic bytes.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        "gzip", "bz2", "xz" or "zstd", None for an uncompressed file
+    """
+    method = compression_suffixes.get(Path(path).suffix.lower())
+    if method is not None:
+        return method
+    with open(path, "rb") as f:
+        head = f.read(max(len(magic) for magic in compression_magic))
+    for magic, method in compression_magic.items():
+        if head.startswith(magic):
+            return method
+    return None
+
+
+def export_name(path: str) -> str:
+    """
+    Path of a file without its compression suffix, e.g. "a.csv" for "a.csv.gz".
+    """
+    if Path(path).suffix.lower() in compression_suffixes:
+        return os.path.splitext(path)[0]
+    return path
+
+
+def open_binary(path: str) -> IO[bytes]:
+    """
+    Open a file for reading, decompressing it as it is read.
+
+    Args:
+        path: Path to a plain or compressed file
+
+    Returns:
+        Binary file object of the decompressed data
+
+    Raises:
+        ImportError: If the file is Zstandard compressed and zstandard is not
+            installed
+    """
+    method = detect_compression(path)
+    if method == "gzip":
+        return gzip.open(path, "rb")
+    if method == "bz2":
+        return bz2.open(path, "rb")
+    if method == "xz":
+        return lzma.open(path, "rb")
+    if method == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                f"Reading {path} requires zstandard: pip install zstandard"
+            ) from e
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        # Buffered so read(n) returns n bytes until the end, like the others.
+        return io.BufferedReader(raw)
+    return open(path, "rb")
+
+
+def open_text(path: str, encoding: str, **kwargs: Any) -> IO[str]:
+    """
+    Open a plain or compressed file as text.
+
+    Args:
+        path: Path to the file
+        encoding: Text encoding of the decompressed data
+        **kwargs: Keyword arguments of io.TextIOWrapper such as errors, newline
+
+    Returns:
+        Text file object
+    """
+    return io.TextIOWrapper(open_binary(path), encoding=encoding, **kwargs)
+
+
+@lru_cache(maxsize=256)
+def _sniff_encoding(path: str, size: int, mtime_ns: int) -> str:
+    with open_binary(path) as f:
+        prefix = f.read(SNIFF_BYTES)
+
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # A multi-byte character may be cut at the end of the prefix.
+        codecs.getincrementaldecoder("utf-8")().decode(
+            prefix, final=len(prefix) < SNIFF_BYTES
+        )
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return "utf-8"
+
+
+def sniff_encoding(path: str) -> str:
+    """
+    Detect the encoding of a text file from its first SNIFF_BYTES bytes.
+
+    Args:
+        path: Path to the file, compressed or not
+
+    Returns:
+        "utf-8-sig" when the file starts with a byte order mark, "utf-8" when
+        the prefix decodes as UTF-8, FALLBACK_ENCODING otherwise
+    """
+    stat = os.stat(path)
+    return _sniff_encoding(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+# Suffixes of Excel workbooks read by read_sheet.
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm")
+
+# Suffixes of files recognized as broker exports, before any compression suffix.
+EXPORT_SUFFIXES = (".csv",) + WORKBOOK_SUFFIXES
+
+
+def is_export(path: str) -> bool:
+    """
+    Check whether a path names a CSV export or workbook, compressed or not.
+    """
+    return export_name(path).lower().endswith(EXPORT_SUFFIXES)
+
+
+def is_workbook(path: str) -> bool:
+    """
+    Check whether a path names an Excel workbook, by its suffix.
+    """
+    return Path(export_name(path)).suffix.lower() in WORKBOOK_SUFFIXES
+
+
+def cell_text(value: Any) -> str:
+    """
+    Text of a sheet cell as a CSV export would show it.
+
+    Whole numbers lose the ".0" openpyxl reads them with, so a stock code
+    stored as a number reads "2330" like in the CSV export.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _cell_value(value: Any, date_format: Optional[str]) -> Any:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime(date_format) if date_format else value.isoformat()
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def iter_sheet_rows(
+    path: str, date_format: Optional[str] = None
+) -> Iterator[List[Any]]:
+    """
+    Stream the rows of the first sheet of a workbook.
+
+    Args:
+        path: Path to the workbook
+        date_format: strftime format of date cells, ISO format when None
+
+    Yields:
+        Cell values of each row; empty cells are None
+
+    Raises:
+        ImportError: If openpyxl is not installed
+    """
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise ImportError(
+            f"Reading {path} requires openpyxl: pip install openpyxl"
+        ) from e
+
+    source: Union[str, IO[bytes]] = path
+    if detect_compression(path) is not None:
+        # Workbooks are zip archives that openpyxl reads by seeking.
+        with open_binary(path) as f:
+            source = io.BytesIO(f.read())
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [_cell_value(value, date_format) for value in row]
+    finally:
+        workbook.close()
+
+
+def _header(row: List[Any]) -> List[str]:
+    names = [
+        cell_text(value) if value is not None else f"Unnamed: {i}"
+        for i, value in enumerate(row)
+    ]
+    # Formatting can extend a sheet past its last column; drop those.
+    while names and row[len(names) - 1] is None:
+        names.pop()
+    return names
+
+
+def read_sheet(
+    path: str,
+    skiprows: int = 0,
+    usecols: Union[None, List[str], Callable[[str], bool]] = None,
+    dtype: Optional[Dict[str, Any]] = None,
+    nrows: Optional[int] = None,
+    date_format: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Read the first sheet of a workbook like pandas.read_csv reads a CSV file.
+
+    Numeric cells stay numbers and blank rows are skipped. Columns given a
+    str or category dtype hold cell texts, as in the CSV export.
+
+    Args:
+        path: Path to the workbook
+        skiprows: Rows above the header row
+        usecols: Columns to keep, as names or a predicate on the name
+        dtype: Dtype per column name
+        nrows: Number of data rows to read, all when None
+        date_format: strftime format turning date cells into the export's text
+
+    Returns:
+        The table below the header row
+
+    Raises:
+        ValueError: If the sheet has no header row or lacks a usecols column
+    """
+    rows = iter_sheet_rows(path, date_format)
+    header_row = next(islice(rows, skiprows, None), None)
+    if header_row is None:
+        raise ValueError(f"No header row in {path}")
+    header = _header(header_row)
+
+    if usecols is None:
+        keep = list(range(len(header)))
+    elif callable(usecols):
+        keep = [i for i, name in enumerate(header) if usecols(name)]
+    else:
+        missing = [name for name in usecols if name not in header]
+        if missing:
+            raise ValueError(
+                f"Usecols do not match columns, columns expected but not found: "
+                f"{missing}"
+            )
+        keep = [i for i, name in enumerate(header) if name in usecols]
+
+    data = (
+        [row[i] if i < len(row) else None for i in keep]
+        for row in rows
+        if any(value is not None for value in row)
+    )
+    df = pd.DataFrame(
+        list(islice(data, nrows)), columns=[header[i] for i in keep], dtype=object
+    ).infer_objects()
+
+    for column, column_dtype in (dtype or {}).items():
+        if column not in df.columns:
+            continue
+        if column_dtype in (str, "str", "category"):
+            # Missing cells stay NaN, like read_csv's str columns.
+            df[column] = df[column].map(cell_text, na_action="ignore").astype(object)
+            if column_dtype != "category":
+                continue
+        df[column] = df[column].astype(column_dtype)
+    return df
+
+
+def read_table(
+    path: str, sheet_date_format: Optional[str] = None, **kwargs: Any
+) -> pd.DataFrame:
+    """
+    Read a CSV file or workbook with pandas.read_csv options.
+
+    Compressed files are decompressed while pandas parses them.
+
+    Args:
+        path: Path to the CSV file or workbook, compressed or not
+        sheet_date_format: strftime format of date cells in workbooks
+        **kwargs: Keyword arguments passed to pandas.read_csv; for workbooks,
+            those read_sheet supports, with encoding ignored
+
+    Returns:
+        The parsed table
+    """
+    if is_workbook(path):
+        kwargs.pop("encoding", None)
+        return read_sheet(path, date_format=sheet_date_format, **kwargs)
+    kwargs.setdefault("compression", detect_compression(path))
+    return pd.read_csv(path, **kwargs)
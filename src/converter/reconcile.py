@@ -0,0 +1,349 @@
+"""
+Reconciliation of visible transaction history against held quantities.
+
+Broker history exports cover a limited date range, so the visible
+transactions of a symbol may not add up to the quantity actually held. The
+functions here decide which dummy transaction makes them agree, and
+reconcile_grouped applies them to a whole history at once for any broker.
+"""
+
+import logging
+import math
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .executors import Executor
+from .failures import SymbolFailure, symbol_errors
+
+# Builds the dummy rows of the given symbols, one row per reconciliation, in
+# the converter's normalized history layout.
+DummyRowsBuilder = Callable[[List[str], List["Reconciliation"]], pd.DataFrame]
+
+
+# Tolerance of quantity_matches; fractional shares don't sum exactly in floats.
+QUANTITY_TOLERANCE = 1e-9
+
+
+def quantity_matches(quantity_sum: float, target_quantity: float) -> bool:
+    """
+    Whether visible history nets to the target quantity, so no dummy is needed.
+
+    Args:
+        quantity_sum: Sum of the signed quantities of the visible transactions
+        target_quantity: Held quantity, zero for a closed position
+
+    Returns:
+        True if the two agree within QUANTITY_TOLERANCE
+    """
+    return math.isclose(
+        quantity_sum,
+        target_quantity,
+        rel_tol=QUANTITY_TOLERANCE,
+        abs_tol=QUANTITY_TOLERANCE,
+    )
+
+
+class Reconciliation(NamedTuple):
+    """
+    Outcome of reconciling one symbol.
+
+    Attributes:
+        keep_history: Whether the visible transactions are kept
+        dummy_action: "Buy" or "Sell" for the dummy transaction, None if not needed
+        dummy_quantity: Unsigned quantity of the dummy transaction
+        dummy_price: Price of the dummy transaction
+        failure: Error isolated in fail-soft mode; the symbol is left out
+    """
+
+    keep_history: bool
+    dummy_action: Optional[str] = None
+    dummy_quantity: float = 0.0
+    dummy_price: float = 0.0
+    failure: Optional[SymbolFailure] = None
+
+
+def plan_reconciliation(
+    symbol: str,
+    quantities: np.ndarray,
+    prices: np.ndarray,
+    target_quantity: Optional[float],
+    target_total_value: Optional[float],
+    fix_exceed_range: bool,
+) -> Reconciliation:
+    """
+    Decide how to reconcile one symbol's signed history with its position.
+
+    Args:
+        symbol: Stock symbol being reconciled
+        quantities: Signed quantities of the visible transactions
+        prices: Prices of the visible transactions
+        target_quantity: Held quantity, or None for a closed position
+        target_total_value: Cost basis of the held quantity, None when closed
+        fix_exceed_range: Whether mismatches may be fixed with dummy rows
+
+    Returns:
+        The reconciliation to apply
+
+    Raises:
+        NotImplementedError: If fix_exceed_range is False and data is incomplete
+    """
+    quantity_sum = quantities.sum()
+
+    if target_quantity is None:
+        if quantity_matches(quantity_sum, 0.0):
+            logging.info(f"Symbol: {symbol} is closed with balanced history.")
+            return Reconciliation(True)
+
+        logging.info(f"Symbol: {symbol} is closed with incomplete history. Fixing...")
+
+        if not fix_exceed_range:
+            raise NotImplementedError(
+                "Closed position quantity mismatch fixing is not implemented "
+                "for fix_exceed_range=False"
+            )
+
+        value_delta = (quantities * prices).sum()
+        add_quantity = abs(quantity_sum)
+        add_action = "Sell" if quantity_sum > 0 else "Buy"
+        return Reconciliation(
+            True, add_action, add_quantity, abs(value_delta) / add_quantity
+        )
+
+    if quantity_matches(quantity_sum, target_quantity):
+        logging.info(f"Symbol: {symbol} has the correct quantity. Skip fix.")
+        return Reconciliation(True)
+
+    logging.info(f"Symbol: {symbol} has incorrect quantity. Fixing...")
+
+    # if Quantity not match probably due to the missing data because exceed time range
+    if not fix_exceed_range:
+        raise NotImplementedError(
+            "Quantity mismatch fixing is not implemented for fix_exceed_range=False"
+        )
+
+    sum_value = (quantities * prices).sum()
+    add_quantity = abs(target_quantity - quantity_sum)
+    add_action = "Buy" if target_total_value > sum_value else "Sell"
+    add_price = abs(target_total_value - sum_value) / add_quantity
+
+    if add_action == "Sell" and (target_quantity > quantity_sum):
+        logging.info(
+            f"Break Symbol {symbol} because the quantity is less than the target quantity. Replace all with dummy data."
+        )
+        return Reconciliation(
+            False, "Buy", target_quantity, target_total_value / target_quantity
+        )
+
+    return Reconciliation(True, add_action, add_quantity, add_price)
+
+
+class ReconcileTask(NamedTuple):
+    """
+    One symbol's range of history rows grouped by symbol.
+
+    Attributes:
+        symbol: Stock symbol being reconciled
+        start: First row of the symbol in the grouped columns
+        stop: Row after the last row of the symbol
+        target_quantity: Held quantity, or None for a closed position
+        target_total_value: Cost basis of the held quantity, None when closed
+    """
+
+    symbol: str
+    start: int
+    stop: int
+    target_quantity: Optional[float]
+    target_total_value: Optional[float]
+
+
+def reconcile_tasks(
+    columns: Dict[str, np.ndarray],
+    tasks: List[ReconcileTask],
+    fix_exceed_range: bool,
+    fail_soft: bool = False,
+) -> List[Reconciliation]:
+    """
+    Reconcile a batch of symbols against history columns grouped by symbol.
+
+    Args:
+        columns: "quantity" and "price" arrays, each task a contiguous range
+        tasks: Symbols to reconcile
+        fix_exceed_range: Whether mismatches may be fixed with dummy rows
+        fail_soft: Whether symbol_errors become failed reconciliations
+
+    Returns:
+        One Reconciliation per task, in task order
+    """
+    quantities = columns["quantity"]
+    prices = columns["price"]
+    reconciliations = []
+    for task in tasks:
+        try:
+            reconciliation = plan_reconciliation(
+                task.symbol,
+                quantities[task.start : task.stop],
+                prices[task.start : task.stop],
+                task.target_quantity,
+                task.target_total_value,
+                fix_exceed_range,
+            )
+        except symbol_errors as e:
+            if not fail_soft:
+                raise
+            reconciliation = Reconciliation(
+                False, failure=SymbolFailure.from_exception(task.symbol, "reconcile", e)
+            )
+        reconciliations.append(reconciliation)
+    return reconciliations
+
+
+def symbols_to_reconcile(
+    position_symbols: List[str],
+    history_symbols: pd.Series,
+    include_closed_positions: bool,
+) -> List[str]:
+    """
+    Build the symbol list for reconciliation.
+
+    Held symbols come first. When requested, symbols that only appear in the
+    history are appended in first-seen order.
+
+    Args:
+        position_symbols: Symbols of the holdings, in holdings order
+        history_symbols: Symbol of each history row
+        include_closed_positions: Whether to add history-only symbols
+
+    Returns:
+        Symbols to reconcile, in output order
+    """
+    if not include_closed_positions:
+        return list(position_symbols)
+
+    history = history_symbols.dropna().astype(str).str.strip()
+    history = history[(history != "") & ~history.isin(position_symbols)]
+    return list(position_symbols) + history.drop_duplicates().to_list()
+
+
+def reconcile_grouped(
+    history: pd.DataFrame,
+    symbols: List[str],
+    targets: pd.DataFrame,
+    dummy_rows: DummyRowsBuilder,
+    executor: Executor,
+    fix_exceed_range: bool,
+    columns: Tuple[str, str, str] = ("Symbol", "Quantity", "Price"),
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    on_failure: Optional[Callable[[SymbolFailure], None]] = None,
+) -> pd.DataFrame:
+    """
+    Reconcile every symbol of a history against its holdings.
+
+    History rows are grouped by symbol with one stable sort and the holdings
+    are joined to the symbols in one lookup, so each symbol is a contiguous
+    range of the quantity and price columns that the executor partitions.
+    The completed history lists symbols in the given order, each with its
+    visible rows in file order followed by its dummy row.
+
+    Args:
+        history: Normalized history with signed quantities
+        symbols: Symbols to reconcile, in output order; rows of other
+            symbols are dropped
+        targets: Holdings indexed by symbol, with "quantity" and
+            "total_value" (cost basis) columns; symbols missing from it are
+            reconciled to zero
+        dummy_rows: Builds the dummy rows of the symbols that need one
+        executor: Executor running the reconciliation partitions
+        fix_exceed_range: Whether mismatches may be fixed with dummy rows
+        columns: Names of the symbol, signed quantity and price columns
+        on_progress: Called with the numbers of symbols and of history rows
+            reconciled so far
+        on_failure: Called with each symbol failing with one of symbol_errors,
+            whose rows are then left out; None lets the error stop the run
+
+    Returns:
+        Completed history data for all symbols
+
+    Raises:
+        NotImplementedError: If fix_exceed_range is False and data is incomplete
+            and on_failure is None
+    """
+    symbol_column, quantity_column, price_column = columns
+    symbol_position = pd.Series(np.arange(len(symbols)), index=symbols)
+    row_position = (
+        history[symbol_column]
+        .astype(object)
+        .map(symbol_position)
+        .fillna(-1)
+        .to_numpy(dtype=np.int64)
+    )
+    order = np.argsort(row_position, kind="stable")
+    sorted_positions = row_position[order]
+    bounds = np.searchsorted(sorted_positions, np.arange(len(symbols) + 1))
+
+    aligned = targets[~targets.index.duplicated()].reindex(symbols)
+    held = aligned["quantity"].notna().to_numpy()
+    tasks = []
+    for i, (symbol, quantity, total_value) in enumerate(
+        zip(symbols, aligned["quantity"], aligned["total_value"])
+    ):
+        if not held[i]:
+            logging.info(
+                f"Symbol: {symbol} is not in current positions. "
+                "Reconciling visible history to zero quantity."
+            )
+        tasks.append(
+            ReconcileTask(
+                symbol,
+                int(bounds[i]),
+                int(bounds[i + 1]),
+                float(quantity) if held[i] else None,
+                float(total_value) if held[i] else None,
+            )
+        )
+
+    reconciliations = executor.map_partitions(
+        partial(
+            reconcile_tasks,
+            fix_exceed_range=fix_exceed_range,
+            fail_soft=on_failure is not None,
+        ),
+        {
+            "quantity": history[quantity_column].to_numpy(dtype=np.float64)[order],
+            "price": history[price_column].to_numpy(dtype=np.float64)[order],
+        },
+        tasks,
+        weights=[task.stop - task.start + 1 for task in tasks],
+        on_progress=(
+            None
+            if on_progress is None
+            else lambda done: on_progress(done, int(bounds[done]))
+        ),
+    )
+
+    for reconciliation in reconciliations:
+        if reconciliation.failure is not None:
+            on_failure(reconciliation.failure)
+
+    keep_symbol = np.array([r.keep_history for r in reconciliations] + [False])
+    kept = keep_symbol[sorted_positions]
+    dummy_positions = [
+        i for i, r in enumerate(reconciliations) if r.dummy_action is not None
+    ]
+    parts = [history.iloc[order[kept]]]
+    if dummy_positions:
+        parts.append(
+            dummy_rows(
+                [symbols[i] for i in dummy_positions],
+                [reconciliations[i] for i in dummy_positions],
+            )
+        )
+
+    # Stable sort keeps file order within a symbol and the dummy row last.
+    sort_keys = np.concatenate(
+        [sorted_positions[kept], np.array(dummy_positions, dtype=np.int64)]
+    )
+    combined = pd.concat(parts, ignore_index=True)
+    return combined.iloc[np.argsort(sort_keys, kind="stable")].reset_index(drop=True)
@@ -4,12 +4,29 @@ Schwab broker data converter implementation.
 
 import argparse
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 
-from .base import BaseConverter
+from .actions import ActionRule, apply_action_table
+from .base import (
+    BaseConverter,
+    LoadedData,
+    NormalizedData,
+    ReconciledData,
+)
 from .config import DEFAULT_DUMMY_DATE
+from .failures import SymbolFailure
+from .lots import lot_methods, open_lots
+from .merge import history_paths, merged_history_csv
+from .price_store import PriceStore, open_price_store
+from .readers import is_workbook, iter_sheet_rows, open_text
+from .reconcile import (
+    Reconciliation,
+    quantity_matches,
+    reconcile_grouped,
+    symbols_to_reconcile,
+)
 from .utils import yf_columns
 
 # Schwab transaction columns required by the conversion logic.
@@ -22,6 +39,37 @@ schwab_columns = [
     "Fees & Comm",
 ]
 
+# Schwab positions columns required by the conversion logic.
+schwab_position_columns = [
+    "Symbol",
+    "Qty (Quantity)",
+    "Cost Basis",
+]
+
+# Low-cardinality text columns stored as categoricals on ingest.
+schwab_categorical_columns = ["Action", "Symbol"]
+
+# Text form of dates in Schwab exports, given to date cells of workbooks.
+schwab_date_format = "%m/%d/%Y"
+
+# Schwab actions and how they map to Yahoo Finance transactions.
+schwab_action_table: Dict[str, ActionRule] = {
+    "Buy": ActionRule(1, "BUY", ""),
+    "Sell": ActionRule(-1, "SELL", "correct to sell"),
+    "Reinvest Shares": ActionRule(1, "BUY", "Reinvest Shares"),
+    "Sell Short": ActionRule(-1, "SELL", "Sell Short"),
+    "Buy to Cover": ActionRule(1, "BUY", "Buy to Cover"),
+    "Stock Split": ActionRule(0, "", "Stock Split"),
+    "Journaled Shares": ActionRule(0, "", "Journaled Shares"),
+    "Qual Div Reinvest": ActionRule(0, "", "", include=False),
+    "Reinvest Dividend": ActionRule(0, "", "", include=False),
+    "Qualified Dividend": ActionRule(0, "", "", include=False),
+    "Cash Dividend": ActionRule(0, "", "", include=False),
+    "NRA Tax Adj": ActionRule(0, "", "", include=False),
+    "MoneyLink Transfer": ActionRule(0, "", "", include=False),
+    "Wire Received": ActionRule(0, "", "", include=False),
+}
+
 # Mapping from Schwab columns to Yahoo Finance columns
 column_mapping = {
     "Date": "Trade Date",
@@ -38,14 +86,28 @@ def find_position_header_index(
     """
     Find the row index where the header starts in Schwab positions file.
 
+    Rows of a workbook are searched as the CSV lines they would export to.
+    Compressed files are decompressed only as far as the header row.
+
     Args:
-        file_path: Path to the positions CSV file
+        file_path: Path to the positions CSV file or workbook, compressed or not
         header_keywords: Keywords to identify the header row
 
     Returns:
         The index of the header row, or None if not found
     """
-    with open(file_path, "r", encoding="utf-8") as f:
+    if is_workbook(file_path):
+        rows = iter_sheet_rows(file_path)
+        try:
+            for i, row in enumerate(rows):
+                line = ",".join(str(value) for value in row if value is not None)
+                if all(keyword in line for keyword in header_keywords):
+                    return i
+        finally:
+            rows.close()
+        return None
+
+    with open_text(file_path, "utf-8") as f:
         for i, line in enumerate(f):
             if all(keyword in line for keyword in header_keywords):
                 return i  # Return the correct header index
@@ -61,6 +123,15 @@ class SchwabConverter(BaseConverter):
     """
 
     converter_name = "schwab"
+    action_table = schwab_action_table
+    stage_options = {
+        "reconcile": [
+            "fix_exceed_range",
+            "include_closed_positions",
+            "default_dummy_date",
+        ],
+        "emit": ["lot_method"],
+    }
 
     @staticmethod
     def add_arguments(parser: argparse.ArgumentParser) -> None:
@@ -75,8 +146,10 @@ class SchwabConverter(BaseConverter):
             "--history-data",
             dest="history_data_path",
             type=str,
+            nargs="+",
             required=True,
-            help="Path to history CSV file",
+            help="Path to history CSV file; several overlapping exports are "
+            "merged by date and deduplicated",
         )
         parser.add_argument(
             "--fix-exceed-range",
@@ -94,14 +167,33 @@ class SchwabConverter(BaseConverter):
             default=DEFAULT_DUMMY_DATE,
             help="Date used when filling dummy transactions",
         )
+        parser.add_argument(
+            "--lot-method",
+            type=str,
+            choices=lot_methods,
+            default=None,
+            help="Export the remaining open lots matched with this method "
+            "instead of the full transaction history",
+        )
+        parser.add_argument(
+            "--price-store",
+            dest="price_store_path",
+            type=str,
+            default=None,
+            help="SQLite or Parquet file of daily closes used to date and price "
+            "dummy transactions",
+        )
+        BaseConverter.add_pipeline_arguments(parser)
 
     def __init__(
         self,
         positions_data_path: str,
-        history_data_path: str,
+        history_data_path: Union[str, List[str]],
         fix_exceed_range: bool,
         include_closed_positions: bool = False,
         default_dummy_date: Optional[str] = None,
+        lot_method: Optional[str] = None,
+        price_store_path: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -109,26 +201,53 @@ class SchwabConverter(BaseConverter):
 
         Args:
             positions_data_path: Path to the positions CSV file
-            history_data_path: Path to the transaction history CSV file
+            history_data_path: Path to the transaction history CSV file, or a
+                list of overlapping history exports to merge
             fix_exceed_range: Whether to attempt fixing quantity mismatches
             include_closed_positions: Whether to include history-only closed positions
             default_dummy_date: Date to use for dummy transactions if needed
-            **kwargs: Additional keyword arguments
+            lot_method: Lot method used to export open lots instead of history
+            price_store_path: Local price store used to date and price dummy rows
+            **kwargs: Additional keyword arguments, see BaseConverter
         """
+        super().__init__(**kwargs)
 
         self.positions_data_path = positions_data_path
         self.history_data_path = history_data_path
         self.fix_exceed_range = fix_exceed_range
         self.include_closed_positions = include_closed_positions
         self.default_dummy_date = default_dummy_date or DEFAULT_DUMMY_DATE
+        self.lot_method = lot_method
+        self.price_store_path = price_store_path
+        self.price_store: Optional[PriceStore] = (
+            open_price_store(price_store_path) if price_store_path else None
+        )
+        self._dummy_quotes: Dict[str, Tuple[str, float]] = {}
 
-        self.positions_data_df: pd.DataFrame = pd.read_csv(positions_data_path)
-        self.history_data_df: pd.DataFrame = pd.read_csv(history_data_path)
-
-        super().__init__(**kwargs)
+        self.loaded: LoadedData = self._run_stage("load", self.load)
+        self.history_data_df: pd.DataFrame = self.loaded.transactions
+        self.positions_data_df: pd.DataFrame = self.loaded.positions
 
         self.pre_check()
 
+    def input_paths(self) -> List[str]:
+        paths = history_paths(self.history_data_path) + [self.positions_data_path]
+        if self.price_store_path:
+            paths.append(self.price_store_path)
+        return paths
+
+    def load(self) -> LoadedData:
+        """
+        Read the history and positions exports.
+
+        Returns:
+            History transactions and positions, restricted to the columns used
+        """
+        positions = self._read_positions_data()
+        history = self._read_history_data()
+        self.progress.update("load", rows=len(history))
+        return LoadedData(history, positions)
+
     def pre_check(self) -> None:
         """
         Check if the input data has the expected format.
@@ -149,23 +268,53 @@ class SchwabConverter(BaseConverter):
             df: DataFrame to modify
             column_name: Column name to clean
         """
-        df[column_name] = df[column_name].replace(r"[$,]", "", regex=True).astype(float)
+        column = df[column_name]
+        if column.dtype == object:
+            # Workbook cells mix numbers with text such as "$1,024.49".
+            column = column.astype("string").str.replace(r"[$,]", "", regex=True)
+        df[column_name] = column.astype(float)
 
-    def pre_process_history_data(self) -> None:
+    def _read_history_data(self) -> pd.DataFrame:
         """
-        Preprocess the history data to prepare for conversion.
+        Read the columns of the history export(s) used by the conversion.
+
+        Several exports are merged by date with duplicate rows removed, so
+        overlapping date ranges don't count a trade twice.
+
+        Returns:
+            Transaction history, newest first
+
+        Raises:
+            ValueError: If several exports are given and one is a workbook
         """
-        df = self.history_data_df.dropna(subset=["Quantity", "Price"]).copy()
-        if "Comment" not in df.columns:
-            df["Comment"] = ""
-        self.clean_column(df, "Price")
-        self.clean_column(df, "Fees & Comm")
-        df["Quantity"] = df["Quantity"].astype(float)
-        self.history_data_df = df
+        paths = history_paths(self.history_data_path)
+        read_options = {
+            "usecols": lambda column: column in schwab_columns,
+            "dtype": {column: "category" for column in schwab_categorical_columns},
+            "nrows": self.max_rows,
+        }
+        if len(paths) == 1:
+            return self.read_csv(
+                paths[0],
+                self._read_key("schwab-history"),
+                sheet_date_format=schwab_date_format,
+                **read_options,
+            )
+        workbooks = [path for path in paths if is_workbook(path)]
+        if workbooks:
+            raise ValueError(
+                f"Only CSV history exports can be merged, got workbooks {workbooks}"
+            )
+        return pd.read_csv(
+            merged_history_csv(paths, max_rows=self.max_rows), **read_options
+        )
 
-    def pre_process_positions_data(self) -> None:
+    def _read_positions_data(self) -> pd.DataFrame:
         """
-        Preprocess the positions data to prepare for conversion.
+        Read the columns of the positions file used by the conversion.
+
+        Returns:
+            Positions table starting at the detected header row
 
         Raises:
             ValueError: If the header row can't be found in the positions file
@@ -174,14 +323,56 @@ class SchwabConverter(BaseConverter):
         if header_index is None:
             raise ValueError(f"Could not find header row in {self.positions_data_path}")
 
-        df = pd.read_csv(self.positions_data_path, skiprows=header_index)
-        df = df.dropna(how="all").copy()
+        return self.read_csv(
+            self.positions_data_path,
+            "schwab-positions",
+            skiprows=header_index,
+            usecols=lambda column: column in schwab_position_columns,
+            sheet_date_format=schwab_date_format,
+        )
 
-        df = df[df["Symbol"].astype(str).str.isupper()].copy()
+    def pre_process_history_data(self) -> None:
+        """
+        Preprocess the history data to prepare for conversion.
+
+        Actions are normalized through action_table, so quantities are signed
+        (negative for shares leaving the account) from here on. Share
+        movements without a price, such as stock splits, get a zero price.
+        """
+        df = self.history_data_df.dropna(subset=["Quantity"]).copy()
         self.clean_column(df, "Price")
+        self.clean_column(df, "Fees & Comm")
+        df["Price"] = df["Price"].fillna(0.0)
+        self.clean_column(df, "Quantity")
+        self.history_data_df = apply_action_table(df, self.action_table)
+
+    def pre_process_positions_data(self) -> None:
+        """
+        Preprocess the positions data to prepare for conversion.
+        """
+        df = self.positions_data_df.dropna(how="all").copy()
+
+        df = df[df["Symbol"].astype(str).str.isupper()].copy()
         self.clean_column(df, "Cost Basis")
         self.positions_data_df = df
 
+    def normalize(self, loaded: LoadedData) -> NormalizedData:
+        """
+        Clean numeric columns and normalize actions of history and positions.
+
+        Args:
+            loaded: Output of the load stage
+
+        Returns:
+            Normalized history and positions
+        """
+        self.history_data_df = loaded.transactions
+        self.positions_data_df = loaded.positions
+        self.pre_process_history_data()
+        self.pre_process_positions_data()
+        self.progress.update("normalize", rows=len(self.history_data_df))
+        return NormalizedData(self.history_data_df, self.positions_data_df)
+
     def _symbols_to_process(self) -> List[str]:
         """
         Build the symbol list for conversion.
@@ -189,210 +380,213 @@ class SchwabConverter(BaseConverter):
         Current positions are always processed first. When requested, symbols
         that only appear in transaction history are appended in file order.
         """
-        position_symbols = self.positions_data_df["Symbol"].to_list()
-        if not self.include_closed_positions:
-            return position_symbols
-
-        seen_symbols = set(position_symbols)
-        history_symbols: List[str] = []
-        valid_history_symbols = (
-            self.history_data_df["Symbol"].dropna().astype(str).str.strip()
+        symbols = symbols_to_reconcile(
+            self.positions_data_df["Symbol"].to_list(),
+            self.history_data_df["Symbol"],
+            self.include_closed_positions,
         )
+        return self._selected_symbols(symbols)
 
-        for symbol in valid_history_symbols:
-            if not symbol or symbol in seen_symbols:
-                continue
-            seen_symbols.add(symbol)
-            history_symbols.append(symbol)
-
-        return position_symbols + history_symbols
-
-    def _complete_history_data(
-        self,
-        symbol: str,
-        filtered_position_data_df: pd.DataFrame,
-        filtered_history_data_df: pd.DataFrame,
-    ) -> pd.DataFrame:
+    def _lookup_dummy_quotes(self, symbols: List[str]) -> Dict[str, Tuple[str, float]]:
         """
-        Complete history data for a given symbol by fixing quantity mismatches.
+        Look up real closes for the symbols that will need a dummy transaction.
+
+        A symbol needs a dummy row when its visible history does not net to the
+        position quantity (zero for closed positions). The dummy row is placed
+        on the last trading day before the symbol's first visible transaction,
+        or before the default dummy date when there is no history. All symbols
+        are resolved with a single batched store query.
 
         Args:
-            symbol: Stock symbol to process
-            filtered_position_data_df: Position data for the symbol
-            filtered_history_data_df: History data for the symbol
+            symbols: Symbols that will be processed
 
         Returns:
-            Completed history data for the symbol
-
-        Raises:
-            NotImplementedError: If fix_exceed_range is False and data is incomplete
+            Mapping of symbol to (dummy date in Schwab format, close price)
         """
-        target_quantity = float(filtered_position_data_df["Qty (Quantity)"].values[0])
-        target_total_value = float(filtered_position_data_df["Cost Basis"].values[0])
+        if self.price_store is None:
+            return {}
 
-        df = filtered_history_data_df.copy()
-        df.loc[df["Action"] == "Sell", "Quantity"] = -abs(df["Quantity"])
-
-        if df["Quantity"].sum() == target_quantity:
-            logging.info(f"Symbol: {symbol} has the correct quantity. Skip fix.")
-            return df
+        history = self.history_data_df
+        net_quantity = (
+            history["Quantity"].groupby(history["Symbol"], observed=True).sum()
+        )
+        first_dates = (
+            pd.to_datetime(history["Date"].str[:10], format="%m/%d/%Y")
+            .groupby(history["Symbol"], observed=True)
+            .min()
+        )
+        target_quantity = (
+            self.positions_data_df.set_index("Symbol")["Qty (Quantity)"]
+            .astype(float)
+            .groupby(level=0)
+            .first()
+        )
 
-        logging.info(f"Symbol: {symbol} has incorrect quantity. Fixing...")
+        default_cutoff = pd.to_datetime(self.default_dummy_date)
+        cutoffs: Dict[str, str] = {}
+        for symbol in symbols:
+            if quantity_matches(
+                net_quantity.get(symbol, 0.0), target_quantity.get(symbol, 0.0)
+            ):
+                continue
+            cutoff = first_dates.get(symbol, default_cutoff)
+            cutoffs[symbol] = cutoff.strftime("%Y-%m-%d")
 
-        # if Quantity not match probably due to the missing data because exceed time range
-        if self.fix_exceed_range:
-            df["Value"] = df["Quantity"] * df["Price"]
-            sum_value = df["Value"].sum()
-            add_quantity = abs(target_quantity - df["Quantity"].sum())
-            add_action = "Buy" if target_total_value > sum_value else "Sell"
-            add_price = abs(target_total_value - sum_value) / add_quantity
+        if not cutoffs:
+            return {}
 
-            if add_action == "Sell" and (target_quantity > df["Quantity"].sum()):
-                logging.info(
-                    f"Break Symbol {symbol} because the quantity is less than the target quantity. Replace all with dummy data."
-                )
-                new_row = {
-                    "Date": self.default_dummy_date,
-                    "Action": "Buy",
-                    "Symbol": symbol,
-                    "Quantity": target_quantity,
-                    "Price": target_total_value / target_quantity,
-                }
-                df = pd.DataFrame.from_dict(new_row, orient="index").T
-            else:
-                new_row = {
-                    "Date": self.default_dummy_date,
-                    "Action": add_action,
-                    "Symbol": symbol,
-                    "Quantity": add_quantity,
-                    "Price": add_price,
-                }
-                new_row_df = pd.DataFrame.from_dict(new_row, orient="index").T
-                df = pd.concat([df, new_row_df], ignore_index=True)
-
-            if "Value" in df.columns:
-                df = df.drop(columns=["Value"])
-            df["Quantity"] = abs(df["Quantity"])
-        else:
-            raise NotImplementedError(
-                "Quantity mismatch fixing is not implemented for fix_exceed_range=False"
-            )
-
-        return df
+        quotes = self.price_store.closes_before(cutoffs)
+        return {
+            symbol: (pd.to_datetime(date).strftime("%m/%d/%Y"), close)
+            for symbol, (date, close) in quotes.items()
+        }
 
-    def _complete_closed_position_history_data(
-        self,
-        symbol: str,
-        filtered_history_data_df: pd.DataFrame,
-    ) -> pd.DataFrame:
+    def _dummy_date_and_price(self, symbol: str, price: float) -> Tuple[str, float]:
         """
-        Complete history-only data for a symbol that is no longer held.
+        Return the date and price of a dummy buy for symbol.
 
-        History-only symbols have no current position row to reconcile against,
-        so the target quantity is zero. If the visible transaction history does
-        not net to zero, add one dummy transaction for the missing side.
+        Uses the price store quote when one was found, otherwise the default
+        dummy date and the given reconciled price.
         """
-        df = filtered_history_data_df.copy()
-        df.loc[df["Action"] == "Sell", "Quantity"] = -abs(df["Quantity"])
+        return self._dummy_quotes.get(symbol, (self.default_dummy_date, price))
 
-        quantity_delta = df["Quantity"].sum()
-        if abs(quantity_delta) < 1e-9:
-            logging.info(f"Symbol: {symbol} is closed with balanced history.")
-            return df
+    def _dummy_sell_dates(self, symbols: List[str]) -> Dict[str, str]:
+        """
+        Date dummy sells on the day after each symbol's last visible trade.
 
-        logging.info(f"Symbol: {symbol} is closed with incomplete history. Fixing...")
+        Shares missing from the position left after the visible trades; a
+        sell dated before them would open a short lot ahead of the real buys
+        when lots are matched.
 
-        if not self.fix_exceed_range:
-            raise NotImplementedError(
-                "Closed position quantity mismatch fixing is not implemented "
-                "for fix_exceed_range=False"
-            )
+        Args:
+            symbols: Symbols needing a dummy sell
 
-        value_delta = (df["Quantity"] * df["Price"]).sum()
-        add_quantity = abs(quantity_delta)
-        add_action = "Sell" if quantity_delta > 0 else "Buy"
-        add_price = abs(value_delta) / add_quantity
-        new_row = {
-            "Date": self.default_dummy_date,
-            "Action": add_action,
-            "Symbol": symbol,
-            "Quantity": add_quantity,
-            "Price": add_price,
+        Returns:
+            Mapping of symbol to dummy date in Schwab format
+        """
+        history = self.history_data_df
+        rows = history[history["Symbol"].isin(symbols)]
+        last_dates = (
+            pd.to_datetime(rows["Date"].str[:10], format="%m/%d/%Y")
+            .groupby(rows["Symbol"], observed=True)
+            .max()
+        )
+        return {
+            symbol: (date + pd.Timedelta(days=1)).strftime("%m/%d/%Y")
+            for symbol, date in last_dates.items()
         }
-        new_row_df = pd.DataFrame.from_dict(new_row, orient="index").T
-        df = pd.concat([df, new_row_df], ignore_index=True)
-        df["Quantity"] = abs(df["Quantity"])
-
-        return df
 
-    def _parse_history_and_check(self, target_symbol: str) -> pd.DataFrame:
+    def _dummy_rows(
+        self, symbols: List[str], reconciliations: List[Reconciliation]
+    ) -> pd.DataFrame:
         """
-        Parse history data for a given symbol and check against position data.
+        Build the dummy transactions of several symbols at once.
 
         Args:
-            target_symbol: Stock symbol to process
+            symbols: Stock symbols needing a dummy transaction
+            reconciliations: Reconciliation of each symbol, with a dummy action
 
         Returns:
-            Processed history data for the symbol
-        """
-        history_data_df = self.history_data_df
-        positions_data_df = self.positions_data_df
-        filtered_history_data_df = history_data_df[
-            history_data_df["Symbol"] == target_symbol
-        ]
-        filtered_positions_data_df = positions_data_df[
-            positions_data_df["Symbol"] == target_symbol
-        ]
-
-        if filtered_positions_data_df.empty:
-            logging.info(
-                f"Symbol: {target_symbol} is not in current positions. "
-                "Reconciling visible history to zero quantity."
-            )
-            return self._complete_closed_position_history_data(
-                target_symbol,
-                filtered_history_data_df,
-            )
-
-        return self._complete_history_data(
-            target_symbol, filtered_positions_data_df, filtered_history_data_df
+            One row per symbol in the normalized history layout
+        """
+        sell_dates = self._dummy_sell_dates(
+            [s for s, r in zip(symbols, reconciliations) if r.dummy_action == "Sell"]
         )
+        records = []
+        for symbol, reconciliation in zip(symbols, reconciliations):
+            rule = self.action_table[reconciliation.dummy_action]
+            if symbol in sell_dates:
+                dummy_date = sell_dates[symbol]
+                dummy_price = reconciliation.dummy_price
+            else:
+                dummy_date, dummy_price = self._dummy_date_and_price(
+                    symbol, reconciliation.dummy_price
+                )
+            records.append(
+                {
+                    "Date": dummy_date,
+                    "Action": rule.action,
+                    "Symbol": symbol,
+                    "Quantity": rule.sign * abs(reconciliation.dummy_quantity),
+                    "Price": dummy_price,
+                    "Comment": rule.comment,
+                }
+            )
+        return pd.DataFrame(records)
 
-    def convert(self) -> pd.DataFrame:
+    def reconcile(self, normalized: NormalizedData) -> ReconciledData:
         """
-        Convert Schwab data to Yahoo Finance format.
+        Complete each symbol's history so it agrees with its position.
+
+        Every executor reconciles the history grouped by symbol, see
+        reconcile_grouped. In fail-soft mode a symbol failing with one of
+        symbol_errors is left out and recorded instead.
+
+        Args:
+            normalized: Output of the normalize stage
 
         Returns:
-            DataFrame in Yahoo Finance format
+            Completed history of every processed symbol
         """
-        self.pre_process_history_data()
-        self.pre_process_positions_data()
+        self.history_data_df = normalized.transactions
+        self.positions_data_df = normalized.positions
 
         symbol_to_process = self._symbols_to_process()
-        complete_dfs = [
-            self._parse_history_and_check(symbol) for symbol in symbol_to_process
-        ]
-        total_complete_df = pd.concat(complete_dfs, ignore_index=True)
-        total_complete_df = total_complete_df.rename(columns=column_mapping)
-
-        # Mark transaction direction explicitly while keeping quantity and price positive.
-        sell_mask = total_complete_df["Action"] == "Sell"
-        total_complete_df.loc[sell_mask, "Quantity"] = abs(
-            total_complete_df.loc[sell_mask, "Quantity"]
+        self.progress.update(
+            "reconcile", symbols=0, total_symbols=len(symbol_to_process)
         )
-        total_complete_df["Purchase Price"] = abs(total_complete_df["Purchase Price"])
-        total_complete_df["Action"] = "BUY"
-        total_complete_df.loc[sell_mask, "Action"] = "SELL"
-
-        # Add comments for certain transaction types
-        total_complete_df["Comment"] = total_complete_df["Action"].map(
-            {"Sell": "correct to sell", "Reinvest Shares": "Reinvest Shares"}
+        self._dummy_quotes = self._lookup_dummy_quotes(symbol_to_process)
+
+        positions = self.positions_data_df
+        targets = pd.DataFrame(
+            {
+                "quantity": positions["Qty (Quantity)"].to_numpy(dtype=float),
+                "total_value": positions["Cost Basis"].to_numpy(dtype=float),
+            },
+            index=positions["Symbol"].to_numpy(),
+        )
+        failures: List[SymbolFailure] = []
+        completed = reconcile_grouped(
+            self.history_data_df,
+            symbol_to_process,
+            targets,
+            self._dummy_rows,
+            self.executor,
+            self.fix_exceed_range,
+            on_progress=lambda done, rows: self.progress.update(
+                "reconcile", rows=rows, symbols=done
+            ),
+            on_failure=failures.append if self.fail_soft else None,
         )
+        return ReconciledData(completed, tuple(failures))
+
+    def emit(self, reconciled: ReconciledData) -> pd.DataFrame:
+        """
+        Build the Yahoo Finance table from the completed history.
+
+        Args:
+            reconciled: Output of the reconcile stage
+
+        Returns:
+            DataFrame in Yahoo Finance format, or its open lots when a lot
+            method is set
+        """
+        total_complete_df = reconciled.transactions.rename(columns=column_mapping)
+
+        # Direction is explicit in Action; keep quantity and price positive.
+        total_complete_df["Quantity"] = abs(total_complete_df["Quantity"])
+        total_complete_df["Purchase Price"] = abs(total_complete_df["Purchase Price"])
 
         # Select only the required columns and format the date
         total_complete_df = total_complete_df[yf_columns].copy()
         total_complete_df["Trade Date"] = pd.to_datetime(
             total_complete_df["Trade Date"]
-        ).dt.strftime("%Y%m%d")
+        )
+        if self.lot_method is not None:
+            total_complete_df = open_lots(total_complete_df, self.lot_method)
+        total_complete_df["Trade Date"] = total_complete_df["Trade Date"].dt.strftime(
+            "%Y%m%d"
+        )
+        self.progress.update("emit", rows=len(total_complete_df))
 
         return total_complete_df
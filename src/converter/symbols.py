@@ -0,0 +1,141 @@
+"""
+Resolution of broker product codes to Yahoo Finance tickers.
+
+Yahoo Finance needs exchange-qualified tickers (for example ``2330.TW`` or
+``0700.HK``), while broker statements list a bare product code next to the
+market it trades on. The user supplies a CSV mapping file with the columns
+``交易市場`` (market), ``商品代碼`` (product code) and ``Symbol``. The file is
+loaded once into an index on (market, code) and reused across conversions
+while it is unchanged.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .readers import read_table
+
+MARKET_COLUMN = "交易市場"
+CODE_COLUMN = "商品代碼"
+SYMBOL_COLUMN = "Symbol"
+
+# Columns of the mapping file.
+symbol_map_columns = [MARKET_COLUMN, CODE_COLUMN, SYMBOL_COLUMN]
+
+
+class SymbolMap:
+    """
+    Index of (market, product code) to ticker.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load a mapping file.
+
+        Args:
+            path: CSV file with the symbol_map_columns
+
+        Raises:
+            ValueError: If a column of symbol_map_columns is missing
+        """
+        self.path = path
+        table = read_table(path, dtype=str, encoding="utf-8-sig").fillna("")
+        missing = [c for c in symbol_map_columns if c not in table.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} are missing from {path}")
+        table = table[symbol_map_columns].apply(lambda column: column.str.strip())
+
+        duplicated = table.duplicated([MARKET_COLUMN, CODE_COLUMN], keep="last")
+        if duplicated.any():
+            logging.warning(
+                f"{int(duplicated.sum())} duplicate entries in {path}; "
+                "the last entry of each product code is used"
+            )
+            table = table[~duplicated]
+
+        self.index = pd.MultiIndex.from_frame(table[[MARKET_COLUMN, CODE_COLUMN]])
+        self.symbols = table[SYMBOL_COLUMN].to_numpy(dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def resolve(
+        self, markets: pd.Series, codes: pd.Series
+    ) -> Tuple[pd.Series, List[Tuple[str, str]]]:
+        """
+        Resolve the tickers of a whole statement at once.
+
+        Each distinct (market, code) pair is looked up once in the index and
+        the results are broadcast back to the rows. Codes without an entry
+        keep the product code as their ticker.
+
+        Args:
+            markets: Market of each row
+            codes: Product code of each row, aligned with markets
+
+        Returns:
+            Tuple of (categorical tickers aligned with codes, unmapped
+            (market, code) pairs in first-seen order)
+        """
+        market_codes, market_names = _factorize(markets)
+        code_codes, code_names = _factorize(codes)
+        pair_keys = market_codes * len(code_names) + code_codes
+        unique_keys, first_rows, inverse = np.unique(
+            pair_keys, return_index=True, return_inverse=True
+        )
+
+        pair_markets = market_names[unique_keys // len(code_names)]
+        pair_codes = code_names[unique_keys % len(code_names)]
+        positions = self.index.get_indexer(
+            pd.MultiIndex.from_arrays([pair_markets, pair_codes])
+        )
+        found = positions >= 0
+        # Position -1 (not found) picks the trailing placeholder.
+        lookup = np.append(self.symbols, "")
+        tickers = np.where(found, lookup[positions], pair_codes)
+
+        unmapped = [
+            (pair_markets[i], pair_codes[i])
+            for i in np.argsort(first_rows)
+            if not found[i]
+        ]
+        resolved = pd.Series(
+            pd.Categorical(tickers[inverse]), index=codes.index, name=codes.name
+        )
+        return resolved, unmapped
+
+
+def _factorize(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split values into integer codes and stripped text names, missing as "".
+    """
+    categorical = values.astype("category")
+    names = np.array(
+        [""] + [str(name).strip() for name in categorical.cat.categories], dtype=object
+    )
+    return categorical.cat.codes.to_numpy(np.int64) + 1, names
+
+
+@lru_cache(maxsize=8)
+def _load_symbol_map(path: str, mtime_ns: int) -> SymbolMap:
+    return SymbolMap(path)
+
+
+def load_symbol_map(path: str) -> SymbolMap:
+    """
+    Load a symbol mapping, reusing the cached index while the file is unchanged.
+
+    Args:
+        path: Path to the mapping CSV file
+
+    Returns:
+        The symbol map for path
+    """
+    if not Path(path).is_file():
+        raise FileNotFoundError(f"Symbol mapping not found: {path}")
+    return _load_symbol_map(os.path.abspath(path), os.stat(path).st_mtime_ns)
@@ -0,0 +1,231 @@
+"""
+Admission control for web conversions.
+
+Every conversion request passes through the AdmissionController before it
+starts. Uploads above the size limit are refused outright. Small uploads run
+in their own lane so they don't wait behind large ones. Large uploads share a
+fixed number of slots, and when the waiting line for those slots is full new
+requests are refused at once instead of queueing without bound. Each admitted
+conversion gets a deadline; it is checked before every pipeline stage and on
+every progress event, so a runaway conversion stops at its next stage or
+progress report. A stage that reports no progress, such as parsing a large
+export, runs to its end before the deadline can stop it.
+
+Limits default to the values below and can be set with environment
+variables, for example on a hosted Space:
+
+- YAHOO_CONVERTER_MAX_UPLOAD_MB: largest upload in MiB
+- YAHOO_CONVERTER_MAX_CONCURRENT: large conversions running at once
+- YAHOO_CONVERTER_MAX_QUEUE: large conversions waiting for a slot
+- YAHOO_CONVERTER_SMALL_UPLOAD_KB: uploads up to this size use the fast lane
+- YAHOO_CONVERTER_SMALL_CONCURRENT: small conversions running at once
+- YAHOO_CONVERTER_DEADLINE_SECONDS: time limit of one conversion
+- YAHOO_CONVERTER_MAX_EXTRACTED_MB: total size of the files unpacked from the
+  zip archives of one batch upload
+- YAHOO_CONVERTER_MAX_ARCHIVE_MEMBERS: members of those archives, all together
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from src.converter.progress import ProgressCallback, ProgressEvent
+from src.web.metrics import registry
+
+ENVIRONMENT_PREFIX = "YAHOO_CONVERTER_"
+
+admission_rejections = registry.counter(
+    "converter_admission_rejections_total",
+    "Conversion requests refused by admission control.",
+    ["reason"],
+)
+deadline_cancellations = registry.counter(
+    "converter_deadline_cancellations_total",
+    "Conversions stopped for exceeding their deadline.",
+)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a conversion request is refused.
+    """
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised inside a conversion that ran past its deadline.
+    """
+
+
+class AdmissionSettings(NamedTuple):
+    """
+    Limits applied by the AdmissionController.
+
+    Attributes:
+        max_upload_mb: Largest accepted upload, all files of a request together
+        max_concurrent: Large conversions running at once
+        max_queue: Large conversions allowed to wait for a slot
+        small_upload_kb: Uploads up to this size run in the fast lane
+        small_concurrent: Fast-lane conversions running at once
+        deadline_seconds: Time limit of one conversion, including waiting
+        max_extracted_mb: Largest total size unpacked from a batch's archives
+        max_archive_members: Most members in a batch's archives, all together
+    """
+
+    max_upload_mb: float = 50.0
+    max_concurrent: int = 2
+    max_queue: int = 8
+    small_upload_kb: float = 256.0
+    small_concurrent: int = 2
+    deadline_seconds: float = 120.0
+    max_extracted_mb: float = 500.0
+    max_archive_members: int = 1000
+
+    @classmethod
+    def from_environment(cls) -> "AdmissionSettings":
+        """
+        Build settings from YAHOO_CONVERTER_* variables, defaults otherwise.
+        """
+        values = {}
+        for name, default in cls._field_defaults.items():
+            value = os.environ.get(ENVIRONMENT_PREFIX + name.upper())
+            if value is not None:
+                values[name] = type(default)(value)
+        return cls(**values)
+
+    @property
+    def max_upload_bytes(self) -> int:
+        return int(self.max_upload_mb * 2**20)
+
+    @property
+    def max_extracted_bytes(self) -> int:
+        return int(self.max_extracted_mb * 2**20)
+
+    @property
+    def small_upload_bytes(self) -> int:
+        return int(self.small_upload_kb * 2**10)
+
+
+class Deadline:
+    """
+    Point in time by which an admitted conversion must finish.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def check(self) -> None:
+        """
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.remaining() <= 0:
+            deadline_cancellations.inc()
+            raise DeadlineExceeded(
+                f"Conversion stopped after exceeding its {self.seconds:g}s limit"
+            )
+
+    def wrap(self, callback: Optional[ProgressCallback] = None) -> ProgressCallback:
+        """
+        Build a progress callback that enforces the deadline.
+
+        Args:
+            callback: Progress callback to forward events to
+
+        Returns:
+            Callback to pass as the converter's progress_callback
+        """
+
+        def checked(event: ProgressEvent) -> None:
+            self.check()
+            if callback is not None:
+                callback(event)
+
+        return checked
+
+
+def upload_size(files: Iterable[Any]) -> int:
+    """
+    Total size in bytes of uploaded files; None entries are skipped.
+    """
+    return sum(os.path.getsize(f.name) for f in files if f is not None)
+
+
+class AdmissionController:
+    """
+    Admits conversions into a fast lane or the bounded large lane.
+    """
+
+    def __init__(self, settings: Optional[AdmissionSettings] = None):
+        """
+        Initialize the controller.
+
+        Args:
+            settings: Limits to apply, from the environment when None
+        """
+        self.settings = settings or AdmissionSettings.from_environment()
+        self._small_slots = threading.BoundedSemaphore(self.settings.small_concurrent)
+        self._large_slots = threading.BoundedSemaphore(self.settings.max_concurrent)
+        self._lock = threading.Lock()
+        self.waiting = 0
+
+    def _reject(self, reason: str, message: str) -> AdmissionRejected:
+        admission_rejections.inc(reason)
+        return AdmissionRejected(message)
+
+    @contextmanager
+    def admit(self, size: int) -> Iterator[Deadline]:
+        """
+        Hold a conversion slot for the block.
+
+        Args:
+            size: Upload size of the request in bytes
+
+        Yields:
+            The deadline of the conversion
+
+        Raises:
+            AdmissionRejected: If the upload is too large, the waiting line is
+                full or no slot frees up before the deadline
+        """
+        settings = self.settings
+        if size > settings.max_upload_bytes:
+            raise self._reject(
+                "too_large",
+                f"Upload of {size / 2**20:.1f} MiB exceeds the "
+                f"{settings.max_upload_mb:g} MiB limit",
+            )
+
+        deadline = Deadline(settings.deadline_seconds)
+        if size <= settings.small_upload_bytes:
+            slots = self._small_slots
+        else:
+            slots = self._large_slots
+            with self._lock:
+                if self.waiting >= settings.max_queue:
+                    raise self._reject(
+                        "queue_full", "Too many conversions waiting, try again later"
+                    )
+                self.waiting += 1
+
+        try:
+            acquired = slots.acquire(timeout=max(deadline.remaining(), 0))
+        finally:
+            if slots is self._large_slots:
+                with self._lock:
+                    self.waiting -= 1
+        if not acquired:
+            raise self._reject("timeout", "No conversion slot became free in time")
+        try:
+            yield deadline
+        finally:
+            slots.release()
+
+
+admission = AdmissionController()
@@ -0,0 +1,16 @@
+"""
+Caches shared by the web converters across requests.
+"""
+
+from src.converter.cache import InputCache, StageCache
+from src.web.metrics import register_input_cache, register_stage_cache
+
+# Gradio stores identical uploads under the same path, so resubmitting a file,
+# for example with different options, reuses its parsed table.
+input_cache = InputCache()
+register_input_cache("web", input_cache)
+
+# Stage outputs of those files; changing an option that only later stages
+# depend on, such as including closed positions, skips loading and normalizing.
+stage_cache = StageCache()
+register_stage_cache("web", stage_cache)
@@ -2,8 +2,9 @@
 Web UI converters for different broker formats.
 """
 
+from .batch import batch_converter
 from .cathay_sub_brokerage import cathay_sub_brokerage_converter
 from .schwab import schwab_converter
 
 # Note: Firstrade converter implementation is postponed
-__all__ = ["schwab_converter", "cathay_sub_brokerage_converter"]
+__all__ = ["schwab_converter", "cathay_sub_brokerage_converter", "batch_converter"]
@@ -0,0 +1,331 @@
+"""
+Batch converter web interface component.
+
+Accepts the exports of many accounts at once, as CSV files or zip archives,
+pairs them per account like the watch mode and converts the accounts
+concurrently. Results are collected into one zip that is updated and
+returned as each account finishes.
+"""
+
+import csv
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import gradio as gr
+
+from src.converter import converter_mapping
+from src.converter.pairing import ConversionJob, pair_exports
+from src.converter.readers import is_export, is_workbook
+from src.converter.schwab import SchwabConverter
+from src.web.admission import (
+    AdmissionRejected,
+    Deadline,
+    admission,
+    admission_rejections,
+    upload_size,
+)
+from src.web.cache import input_cache, stage_cache
+from src.web.metrics import track_conversion
+
+# Accounts converted at the same time.
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+
+# Bytes unpacked from an archive member at a time.
+EXTRACT_CHUNK_BYTES = 2**20
+
+# Name of the status table inside the result zip.
+SUMMARY_NAME = "summary.csv"
+
+
+class JobStatus(NamedTuple):
+    """
+    Outcome of one account's conversion.
+
+    Attributes:
+        account: Account name the exports were paired by
+        converter: Converter name
+        status: "ok" or "failed"
+        seconds: Conversion time
+        rows: Rows written, 0 when failed
+        output: Path of the output inside the zip, empty when failed
+        error: Error message, empty when converted
+    """
+
+    account: str
+    converter: str
+    status: str
+    seconds: float
+    rows: int
+    output: str
+    error: str
+
+
+summary_columns = list(JobStatus._fields)
+
+
+def _reject_archive(message: str) -> AdmissionRejected:
+    admission_rejections.inc("archive_too_large")
+    return AdmissionRejected(message)
+
+
+def extract_uploads(
+    paths: List[str],
+    directory: str,
+    max_bytes: Optional[int] = None,
+    max_members: Optional[int] = None,
+) -> List[str]:
+    """
+    Collect the uploaded exports, unpacking zip archives.
+
+    Each upload is placed in its own folder so files with the same name
+    don't overwrite each other; archive members keep only their file name.
+    Workbooks are zip files too, but are kept as they are. The bytes written
+    and the members of all archives together are capped, counting what is
+    actually unpacked rather than the sizes the archives declare.
+
+    Args:
+        paths: Uploaded file paths
+        directory: Folder to place the files in
+        max_bytes: Most bytes unpacked from all archives, from the admission
+            settings when None
+        max_members: Most members of all archives, from the admission
+            settings when None
+
+    Returns:
+        Paths of the CSV files and workbooks
+
+    Raises:
+        AdmissionRejected: If the archives exceed either cap
+    """
+    if max_bytes is None:
+        max_bytes = admission.settings.max_extracted_bytes
+    if max_members is None:
+        max_members = admission.settings.max_archive_members
+
+    export_paths = []
+    extracted_bytes = 0
+    members = 0
+    for i, path in enumerate(paths):
+        target = os.path.join(directory, str(i))
+        os.makedirs(target, exist_ok=True)
+        if zipfile.is_zipfile(path) and not is_workbook(path):
+            with zipfile.ZipFile(path) as archive:
+                infos = archive.infolist()
+                members += len(infos)
+                if members > max_members:
+                    raise _reject_archive(
+                        f"Archives hold more than {max_members} files"
+                    )
+                for j, member in enumerate(infos):
+                    name = os.path.basename(member.filename)
+                    if member.is_dir() or not is_export(name):
+                        continue
+                    member_target = os.path.join(target, str(j))
+                    os.makedirs(member_target, exist_ok=True)
+                    with (
+                        archive.open(member) as src,
+                        open(os.path.join(member_target, name), "wb") as dst,
+                    ):
+                        while chunk := src.read(EXTRACT_CHUNK_BYTES):
+                            extracted_bytes += len(chunk)
+                            if extracted_bytes > max_bytes:
+                                raise _reject_archive(
+                                    f"Archives unpack to more than "
+                                    f"{max_bytes / 2**20:g} MiB"
+                                )
+                            dst.write(chunk)
+                    export_paths.append(os.path.join(member_target, name))
+        else:
+            export_paths.append(shutil.copy(path, target))
+    return export_paths
+
+
+def _convert_job(
+    job: ConversionJob,
+    options: Dict[str, Dict[str, Any]],
+    deadline: Optional[Deadline],
+) -> Tuple[int, float]:
+    """
+    Convert one job, writing its output to job.output_path.
+
+    Returns:
+        Tuple of (rows written, seconds taken)
+    """
+    start = time.perf_counter()
+    with track_conversion(job.converter_name) as observation:
+        converter = converter_mapping[job.converter_name](
+            **job.arguments,
+            **options.get(job.converter_name, {}),
+            progress_callback=deadline.wrap() if deadline else None,
+            cancel_check=deadline.check if deadline else None,
+            input_cache=input_cache,
+            stage_cache=stage_cache,
+        )
+        df = converter.convert()
+        observation.record(converter, df)
+    df.to_csv(job.output_path, index=False)
+    return len(df), time.perf_counter() - start
+
+
+def _member_name(job: ConversionJob, used: Dict[str, int]) -> str:
+    name = f"{job.account}/{os.path.basename(job.output_path)}"
+    used[name] = used.get(name, 0) + 1
+    if used[name] > 1:
+        stem, extension = os.path.splitext(name)
+        name = f"{stem}_{used[name]}{extension}"
+    return name
+
+
+def run_batch(
+    paths: List[str],
+    zip_path: str,
+    options: Optional[Dict[str, Dict[str, Any]]] = None,
+    workers: int = BATCH_WORKERS,
+    deadline: Optional[Deadline] = None,
+) -> Iterator[List[JobStatus]]:
+    """
+    Convert the exports of many accounts concurrently into one zip.
+
+    The zip is valid after every step: each finished account is appended to
+    it, and the status summary is added once all accounts are done.
+
+    Args:
+        paths: Uploaded CSV files, workbooks and zip archives
+        zip_path: Path of the result zip
+        options: Extra converter keyword arguments per converter name
+        workers: Number of accounts converted at the same time
+        deadline: Deadline of the whole batch, shared by every account's
+            conversion; None for none
+
+    Yields:
+        Statuses of the accounts finished so far, after each account
+    """
+    options = options or {}
+    work_directory = tempfile.mkdtemp(prefix="batch_")
+    try:
+        jobs, unused = pair_exports(extract_uploads(paths, work_directory))
+        for path in unused:
+            logging.warning(f"Not a recognized export, skipped: {path}")
+
+        statuses: List[JobStatus] = []
+        used_names: Dict[str, int] = {}
+        zipfile.ZipFile(zip_path, "w").close()
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures: Dict[Future, ConversionJob] = {
+                pool.submit(_convert_job, job, options, deadline): job for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    rows, seconds = future.result()
+                except Exception as e:
+                    logging.error(f"Error converting {job.account}: {e}", exc_info=True)
+                    statuses.append(
+                        JobStatus(
+                            job.account,
+                            job.converter_name,
+                            "failed",
+                            0.0,
+                            0,
+                            "",
+                            str(e),
+                        )
+                    )
+                else:
+                    name = _member_name(job, used_names)
+                    with zipfile.ZipFile(
+                        zip_path, "a", compression=zipfile.ZIP_DEFLATED
+                    ) as archive:
+                        archive.write(job.output_path, name)
+                    statuses.append(
+                        JobStatus(
+                            job.account,
+                            job.converter_name,
+                            "ok",
+                            round(seconds, 3),
+                            rows,
+                            name,
+                            "",
+                        )
+                    )
+                yield list(statuses)
+
+        summary = io.StringIO()
+        writer = csv.writer(summary)
+        writer.writerow(summary_columns)
+        writer.writerows(statuses)
+        with zipfile.ZipFile(
+            zip_path, "a", compression=zipfile.ZIP_DEFLATED
+        ) as archive:
+            archive.writestr(SUMMARY_NAME, summary.getvalue())
+        yield list(statuses)
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+
+def process_files(
+    files: Any,
+    include_closed_positions: bool = False,
+) -> Iterator[Tuple[Optional[str], List[List[Any]]]]:
+    """
+    Convert uploaded exports of many accounts and stream the results.
+
+    Args:
+        files: Uploaded CSV files, workbooks and zip archives
+        include_closed_positions: Whether Schwab conversions include
+            history-only closed positions
+
+    Yields:
+        Tuple of (result zip path, status rows) after each finished account
+    """
+    files = files if isinstance(files, list) else [files] if files else []
+    zip_path = os.path.join(tempfile.mkdtemp(prefix="yahoo_finance_"), "converted.zip")
+    options = {
+        SchwabConverter.converter_name: {
+            "fix_exceed_range": True,
+            "include_closed_positions": include_closed_positions,
+        }
+    }
+    yield None, []
+    # The whole batch holds one conversion slot and shares its deadline.
+    with admission.admit(upload_size(files)) as deadline:
+        for statuses in run_batch(
+            [f.name for f in files], zip_path, options, deadline=deadline
+        ):
+            yield zip_path, [list(status) for status in statuses]
+
+
+# Gradio interface for batch conversion
+batch_converter = gr.Interface(
+    fn=process_files,
+    inputs=[
+        gr.File(
+            label="Upload exports of any number of accounts (CSV or XLSX files, or zip archives)",
+            file_count="multiple",
+        ),
+        gr.Checkbox(
+            label="Include closed positions from Schwab transaction history",
+            value=False,
+        ),
+    ],
+    outputs=[
+        gr.File(label="Download converted files (zip)"),
+        gr.Dataframe(headers=summary_columns, label="Status"),
+    ],
+    title="Batch Converter",
+    description="Convert the exports of many accounts at once.",
+    article="""
+    ### Instructions
+    1. Upload the Schwab history and positions exports and Cathay statements of all accounts, or zip archives of them
+    2. Click "Submit"; accounts are paired by file name and converted concurrently
+    3. Download the zip, with one folder per account and a summary.csv, as accounts finish
+    """,
+    flagging_mode="never",
+)
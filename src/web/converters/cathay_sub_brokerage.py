@@ -7,14 +7,26 @@ import logging
 import os
 import shutil
 import tempfile
-from typing import Any, Tuple
+from typing import Any, Iterator, Optional, Tuple
 
 import gradio as gr
+import pandas as pd
 
 from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.readers import export_name
+from src.web.admission import admission, upload_size
+from src.web.cache import input_cache, stage_cache
+from src.web.metrics import track_conversion
+from src.web.preview import PREVIEW_ROWS, format_preview, preview_conversion
+from src.web.progress import gradio_progress_callback
 
 
-def process_file(statement_of_account: Any, file_position: Any) -> Tuple[str, str]:
+def process_file(
+    statement_of_account: Any,
+    symbol_map: Any = None,
+    file_position: Any = None,
+    progress: Any = gr.Progress(),
+) -> Iterator[Tuple[Optional[str], str, Optional[pd.DataFrame], str]]:
     log_stream = io.StringIO()
     stream_handler = logging.StreamHandler(log_stream)
     stream_handler.setLevel(logging.DEBUG)
@@ -26,12 +38,36 @@ def process_file(statement_of_account: Any, file_position: Any) -> Tuple[str, st
     logger = logging.getLogger()
     logger.addHandler(stream_handler)
 
+    output_position_file_name = None
+    preview_rows = None
     try:
+        arguments = {
+            "statement_of_account_file_path": statement_of_account.name,
+            "symbol_map_path": symbol_map.name if symbol_map else None,
+            "holdings_file_path": file_position.name if file_position else None,
+            "input_cache": input_cache,
+            "stage_cache": stage_cache,
+        }
+
+        # Show the first converted rows before converting the whole statement
+        with admission.admit(0):
+            preview = preview_conversion(CathaySubBrokerageConverter, arguments)
+        preview_rows = preview.rows
+        yield None, format_preview(preview), preview_rows, log_stream.getvalue()
+
         # Initialize and run the converter
-        converter = CathaySubBrokerageConverter(
-            statement_of_account_file_path=statement_of_account.name,
-        )
-        converted_result = converter.convert()
+        size = upload_size([statement_of_account, symbol_map, file_position])
+        with (
+            admission.admit(size) as deadline,
+            track_conversion(CathaySubBrokerageConverter.converter_name) as observation,
+        ):
+            converter = CathaySubBrokerageConverter(
+                **arguments,
+                progress_callback=deadline.wrap(gradio_progress_callback(progress)),
+                cancel_check=deadline.check,
+            )
+            converted_result = converter.convert()
+            observation.record(converter, converted_result)
 
         # Write the converted result to a temporary file
         temp_result = tempfile.NamedTemporaryFile(
@@ -41,14 +77,20 @@ def process_file(statement_of_account: Any, file_position: Any) -> Tuple[str, st
         temp_result.close()
 
         # Create a new filename for the converted file
-        output_position_file_name = os.path.basename(statement_of_account.name).replace(
-            ".csv", "_yahoo_finance.csv"
+        statement_name = os.path.basename(export_name(statement_of_account.name))
+        output_position_file_name = (
+            os.path.splitext(statement_name)[0] + "_yahoo_finance.csv"
         )
         shutil.move(temp_result.name, output_position_file_name)
+        status = (
+            f"Converted {len(converted_result)} rows of "
+            f"{converted_result['Symbol'].nunique()} symbols."
+        )
     except Exception as e:
         # Log any exceptions
         logger.error(f"Error processing files: {e}", exc_info=True)
         output_position_file_name = None
+        status = f"Conversion failed: {e}"
     finally:
         # Remove our custom handler so we don't affect global logging
         logger.removeHandler(stream_handler)
@@ -56,18 +98,26 @@ def process_file(statement_of_account: Any, file_position: Any) -> Tuple[str, st
     # Get the log output from our StringIO stream
     logs = log_stream.getvalue()
 
-    # Return both the file and the logs
-    return output_position_file_name, logs
+    # Return the file, the status, the preview and the logs
+    yield output_position_file_name, status, preview_rows, logs
 
 
 # Gradio interface for Schwab converter
 cathay_sub_brokerage_converter = gr.Interface(
     fn=process_file,
     inputs=[
-        gr.File(label="Upload Statement of Account file (CSV format)"),
+        gr.File(label="Upload Statement of Account file (CSV or XLSX format)"),
+        gr.File(
+            label="Optional symbol mapping file (CSV with 交易市場, 商品代碼, Symbol)"
+        ),
+        gr.File(
+            label="Optional holdings file (CSV or XLSX with 交易市場, 商品代碼, 庫存股數, 持有成本)"
+        ),
     ],
     outputs=[
         gr.File(label="Download Yahoo Finance Format CSV"),
+        gr.Markdown(label="Status"),
+        gr.Dataframe(label=f"Preview (first {PREVIEW_ROWS} rows)"),
         gr.Textbox(label="Conversion Logs", lines=20),
     ],
     title="Cathay sub-brokerage to Yahoo Finance Converter",
@@ -75,8 +125,10 @@ cathay_sub_brokerage_converter = gr.Interface(
     article="""
     ### Instructions
     1. Upload your Statement of Account file (transactions)
-    2. Click "Submit" to convert the files
-    3. Download the resulting Yahoo Finance compatible CSV
+    2. Optionally upload a symbol mapping file to export exchange-qualified tickers (e.g. 2330.TW)
+    3. Optionally upload your current holdings to add dummy transactions where the statement doesn't cover them
+    4. Click "Submit" to convert the files; a preview of the first converted rows appears first
+    5. Download the resulting Yahoo Finance compatible CSV
     """,
     flagging_mode="never",
 )
@@ -7,26 +7,44 @@ import logging
 import os
 import shutil
 import tempfile
-from typing import Any, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
 
 import gradio as gr
+import pandas as pd
 
+from src.converter.readers import export_name
 from src.converter.schwab import SchwabConverter
+from src.web.admission import admission, upload_size
+from src.web.cache import input_cache, stage_cache
+from src.web.metrics import track_conversion
+from src.web.preview import PREVIEW_ROWS, format_preview, preview_conversion
+from src.web.progress import gradio_progress_callback
+
+
+def _as_list(files: Any) -> List[Any]:
+    return files if isinstance(files, list) else [files]
 
 
 def process_file(
-    file_history: Any, file_position: Any, include_closed_positions: bool = False
-) -> Tuple[str, str]:
+    file_history: Any,
+    file_position: Any,
+    include_closed_positions: bool = False,
+    progress: Any = gr.Progress(),
+) -> Iterator[Tuple[Optional[str], str, Optional[pd.DataFrame], str]]:
     """
     Process uploaded Schwab files and convert to Yahoo Finance format.
 
+    A preview of the first transactions is yielded as soon as it is ready,
+    then the converted file once the full conversion is done.
+
     Args:
-        file_history: Uploaded history file
+        file_history: Uploaded history file, or several overlapping history files
         file_position: Uploaded position file
         include_closed_positions: Whether to include history-only closed positions
+        progress: Gradio progress tracker fed by the converter's progress events
 
-    Returns:
-        Tuple containing the output file name and log messages
+    Yields:
+        Tuple of (output file name, status, preview rows, log messages)
     """
     # Set up a StringIO stream to capture logs
     log_stream = io.StringIO()
@@ -41,15 +59,38 @@ def process_file(
     logger = logging.getLogger()
     logger.addHandler(stream_handler)
 
+    output_position_file_name = None
+    preview_rows = None
     try:
+        arguments = {
+            "history_data_path": [f.name for f in _as_list(file_history)],
+            "positions_data_path": file_position.name,
+            "fix_exceed_range": True,
+            "include_closed_positions": include_closed_positions,
+            "input_cache": input_cache,
+            "stage_cache": stage_cache,
+        }
+
+        # The preview reads only the start of the upload, so it takes the
+        # fast lane instead of waiting for a large conversion slot.
+        with admission.admit(0):
+            preview = preview_conversion(SchwabConverter, arguments)
+        preview_rows = preview.rows
+        yield None, format_preview(preview), preview_rows, log_stream.getvalue()
+
         # Initialize and run the converter
-        converter = SchwabConverter(
-            history_data_path=file_history.name,
-            positions_data_path=file_position.name,
-            fix_exceed_range=True,
-            include_closed_positions=include_closed_positions,
-        )
-        converted_result = converter.convert()
+        size = upload_size(_as_list(file_history) + [file_position])
+        with (
+            admission.admit(size) as deadline,
+            track_conversion(SchwabConverter.converter_name) as observation,
+        ):
+            converter = SchwabConverter(
+                **arguments,
+                progress_callback=deadline.wrap(gradio_progress_callback(progress)),
+                cancel_check=deadline.check,
+            )
+            converted_result = converter.convert()
+            observation.record(converter, converted_result)
 
         # Write the converted result to a temporary file
         temp_result = tempfile.NamedTemporaryFile(
@@ -59,14 +100,20 @@ def process_file(
         temp_result.close()
 
         # Create a new filename for the converted file
-        output_position_file_name = os.path.basename(file_position.name).replace(
-            ".csv", "_yahoo_finance.csv"
+        output_position_file_name = (
+            os.path.splitext(os.path.basename(export_name(file_position.name)))[0]
+            + "_yahoo_finance.csv"
         )
         shutil.move(temp_result.name, output_position_file_name)
+        status = (
+            f"Converted {len(converted_result)} rows of "
+            f"{converted_result['Symbol'].nunique()} symbols."
+        )
     except Exception as e:
         # Log any exceptions
         logger.error(f"Error processing files: {e}", exc_info=True)
         output_position_file_name = None
+        status = f"Conversion failed: {e}"
     finally:
         # Remove our custom handler so we don't affect global logging
         logger.removeHandler(stream_handler)
@@ -74,16 +121,19 @@ def process_file(
     # Get the log output from our StringIO stream
     logs = log_stream.getvalue()
 
-    # Return both the file and the logs
-    return output_position_file_name, logs
+    # Return the file, the status, the preview and the logs
+    yield output_position_file_name, status, preview_rows, logs
 
 
 # Gradio interface for Schwab converter
 schwab_converter = gr.Interface(
     fn=process_file,
     inputs=[
-        gr.File(label="Upload history file (CSV format)"),
-        gr.File(label="Upload position file (CSV format)"),
+        gr.File(
+            label="Upload history files (CSV format, overlapping exports are merged, or one XLSX)",
+            file_count="multiple",
+        ),
+        gr.File(label="Upload position file (CSV or XLSX format)"),
         gr.Checkbox(
             label="Include closed positions from transaction history",
             value=False,
@@ -91,16 +141,18 @@ schwab_converter = gr.Interface(
     ],
     outputs=[
         gr.File(label="Download Yahoo Finance Format CSV"),
+        gr.Markdown(label="Status"),
+        gr.Dataframe(label=f"Preview (first {PREVIEW_ROWS} rows)"),
         gr.Textbox(label="Conversion Logs", lines=20),
     ],
     title="Schwab to Yahoo Finance Converter",
     description="Convert Schwab CSV files to Yahoo Finance format for portfolio import.",
     article="""
     ### Instructions
-    1. Upload your Schwab history file (transactions)
+    1. Upload your Schwab history file (transactions), or several exports covering different date ranges
     2. Upload your Schwab positions file (current holdings)
     3. Optionally include symbols that were fully sold and no longer appear in positions
-    4. Click "Submit" to convert the files
+    4. Click "Submit" to convert the files; a preview of the first converted rows appears first
     5. Download the resulting Yahoo Finance compatible CSV
     """,
     flagging_mode="never",
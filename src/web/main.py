@@ -3,11 +3,22 @@ Web interface main entry point for Yahoo Finance CSV converter.
 """
 
 import logging
+import time
 from typing import Any, Optional
 
 import gradio as gr
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
 
-from src.web.converters import cathay_sub_brokerage_converter, schwab_converter
+from src.web.converters import (
+    batch_converter,
+    cathay_sub_brokerage_converter,
+    schwab_converter,
+)
+from src.web.admission import admission
+from src.web.metrics import CONTENT_TYPE, registry
+from src.web.warmup import warm_up
 
 # Configure logging
 logging.basicConfig(
@@ -16,8 +27,8 @@ logging.basicConfig(
 
 # Create tabbed interface with available converters
 app = gr.TabbedInterface(
-    [schwab_converter, cathay_sub_brokerage_converter],
-    ["Schwab Converter", "Cathay sub-brokerage Converter"],
+    [schwab_converter, cathay_sub_brokerage_converter, batch_converter],
+    ["Schwab Converter", "Cathay sub-brokerage Converter", "Batch Converter"],
     title="Yahoo Finance CSV Converter",
     theme=gr.themes.Soft(
         primary_hue="orange",
@@ -25,11 +36,32 @@ app = gr.TabbedInterface(
     ),
 )
 
+# Requests wait in the admission lanes rather than in the Gradio queue, which
+# only buffers short bursts; see src.web.admission.
+app.queue(
+    default_concurrency_limit=admission.settings.max_concurrent
+    + admission.settings.small_concurrent
+    + admission.settings.max_queue,
+    max_size=admission.settings.max_queue,
+)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """
+    Serve conversion metrics in the Prometheus text format.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+# Routes added to the FastAPI app next to the Gradio routes.
+extra_routes = [Route("/metrics", metrics_endpoint, methods=["GET"])]
+
 
 def launch(
     share: bool = True,
     server_name: Optional[str] = None,
     server_port: Optional[int] = None,
+    warmup: bool = True,
 ) -> Any:
     """
     Launch the web interface.
@@ -38,11 +70,24 @@ def launch(
         share: Whether to create a publicly shareable link
         server_name: Server name to use (defaults to gradio defaults)
         server_port: Server port to use (defaults to gradio defaults)
+        warmup: Whether to run a small conversion per converter before serving
 
     Returns:
         Gradio app instance
     """
-    return app.launch(share=share, server_name=server_name, server_port=server_port)
+    if warmup:
+        start = time.perf_counter()
+        warm_up()
+        logging.info(f"Warmup took {time.perf_counter() - start:.3f}s")
+    # Process CPU time covers the imports, which dominate a cold start.
+    logging.info(f"Startup took {time.process_time():.3f}s of CPU time")
+    return app.launch(
+        share=share,
+        server_name=server_name,
+        server_port=server_port,
+        max_file_size=admission.settings.max_upload_bytes,
+        app_kwargs={"routes": list(extra_routes)},
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,341 @@
+"""
+Conversion metrics in the Prometheus text exposition format.
+
+Counters and histograms are kept in process and rendered on each scrape, so
+no metrics client library is needed. The web app serves them at /metrics next
+to the Gradio routes; other processes, such as the benchmarks, can serve the
+same registry with start_metrics_server.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.converter.base import BaseConverter
+from src.converter.cache import InputCache, StageCache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds of the conversion latency histogram buckets.
+latency_buckets = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    Monotonic counter with one value per label combination.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Add to the counter for the given label values.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """
+        Current value for the given label values.
+        """
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.label_names, labels)} {value:g}"
+                )
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with one set of buckets per label combination.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = latency_buckets,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label combination: bucket counts, then sum and count.
+        self._values: Dict[Labels, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one observation for the given label values.
+        """
+        with self._lock:
+            counts, total, count = self._values.get(
+                labels, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[labels] = (counts, total + value, count + 1)
+
+    def count(self, *labels: str) -> int:
+        """
+        Number of observations for the given label values.
+        """
+        return self._values.get(labels, ([], 0.0, 0))[2]
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        names = self.label_names + ("le",)
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(
+                        f"{self.name}_bucket"
+                        f"{_format_labels(names, labels + (f'{bound:g}',))} "
+                        f"{bucket_count}"
+                    )
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, labels + ('+Inf',))} "
+                    f"{count}"
+                )
+                label_text = _format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{label_text} {total:g}")
+                lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together on each scrape.
+    """
+
+    def __init__(self):
+        self._metrics: List[object] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def counter(
+        self, name: str, help_text: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, help_text: str, label_names: Sequence[str] = ()
+    ) -> Histogram:
+        metric = Histogram(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """
+        Add a function returning exposition lines computed at scrape time.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+conversion_requests = registry.counter(
+    "converter_requests_total", "Conversions started.", ["converter"]
+)
+conversion_errors = registry.counter(
+    "converter_errors_total",
+    "Conversions that raised, by exception type.",
+    ["converter", "type"],
+)
+conversion_seconds = registry.histogram(
+    "converter_duration_seconds", "Wall time of conversions.", ["converter"]
+)
+input_rows = registry.counter(
+    "converter_input_rows_total", "Input rows read by conversions.", ["converter"]
+)
+output_rows = registry.counter(
+    "converter_output_rows_total", "Rows written by conversions.", ["converter"]
+)
+
+
+# Converters whose first conversion in this process was already logged.
+_first_conversions_logged = set()
+_first_conversions_lock = threading.Lock()
+
+
+class ConversionObservation:
+    """
+    Results of one tracked conversion, filled in by the caller.
+    """
+
+    def __init__(self):
+        self.converter: Optional[BaseConverter] = None
+        self.result: Optional[pd.DataFrame] = None
+
+    def record(self, converter: BaseConverter, result: pd.DataFrame) -> None:
+        """
+        Attach the converter and its output to the observation.
+        """
+        self.converter = converter
+        self.result = result
+
+
+@contextmanager
+def track_conversion(converter_name: str) -> Iterator[ConversionObservation]:
+    """
+    Record request count, latency, row counts and errors of one conversion.
+
+    Exceptions raised inside the block are counted by type and re-raised.
+    The latency of the first conversion of each converter is also logged.
+
+    Args:
+        converter_name: Converter label of the recorded metrics
+
+    Yields:
+        Observation to pass the converter and its output to
+    """
+    conversion_requests.inc(converter_name)
+    observation = ConversionObservation()
+    start = time.perf_counter()
+    try:
+        yield observation
+    except Exception as e:
+        conversion_errors.inc(converter_name, type(e).__name__)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        conversion_seconds.observe(elapsed, converter_name)
+        with _first_conversions_lock:
+            first = converter_name not in _first_conversions_logged
+            _first_conversions_logged.add(converter_name)
+        if first:
+            # Shows cold-start cost next to the warmup times logged at startup.
+            logging.info(f"First {converter_name} request took {elapsed:.3f}s")
+        if observation.converter is not None:
+            input_rows.inc(
+                converter_name, amount=observation.converter.progress.input_rows
+            )
+        if observation.result is not None:
+            output_rows.inc(converter_name, amount=len(observation.result))
+
+
+def register_input_cache(name: str, cache: InputCache) -> None:
+    """
+    Expose the hit and miss counts of an input cache.
+
+    Args:
+        name: Cache label of the exposed metrics
+        cache: The cache to read at scrape time
+    """
+
+    def collect() -> List[str]:
+        label = _format_labels(["cache"], [name])
+        return [
+            "# HELP converter_cache_hits_total Parsed input cache hits.",
+            "# TYPE converter_cache_hits_total counter",
+            f"converter_cache_hits_total{label} {cache.hits}",
+            "# HELP converter_cache_misses_total Parsed input cache misses.",
+            "# TYPE converter_cache_misses_total counter",
+            f"converter_cache_misses_total{label} {cache.misses}",
+        ]
+
+    registry.add_collector(collect)
+
+
+def register_stage_cache(name: str, cache: StageCache) -> None:
+    """
+    Expose the hit and miss counts of a pipeline stage cache.
+
+    Args:
+        name: Cache label of the exposed metrics
+        cache: The cache to read at scrape time
+    """
+
+    def collect() -> List[str]:
+        label = _format_labels(["cache"], [name])
+        return [
+            "# HELP converter_stage_cache_hits_total Pipeline stage cache hits.",
+            "# TYPE converter_stage_cache_hits_total counter",
+            f"converter_stage_cache_hits_total{label} {cache.hits}",
+            "# HELP converter_stage_cache_misses_total Pipeline stage cache misses.",
+            "# TYPE converter_stage_cache_misses_total counter",
+            f"converter_stage_cache_misses_total{label} {cache.misses}",
+        ]
+
+    registry.add_collector(collect)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve the registry at /metrics from a background thread.
+
+    Args:
+        port: Port to listen on
+        host: Interface to listen on, local only by default
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Serving metrics at http://{host}:{server.server_port}/metrics")
+    return server
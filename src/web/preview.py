@@ -0,0 +1,82 @@
+"""
+Quick previews of web conversions.
+
+Before a large upload is converted in full, the first PREVIEW_SOURCE_ROWS
+transactions are converted on their own. That checks the export's columns,
+shows the first converted rows and counts their symbols within a fraction of
+a second, while the full conversion is still to run. The preview reconciles
+only the rows it read, so dummy rows may differ in the final file.
+"""
+
+import time
+from typing import Any, Dict, NamedTuple, Type
+
+import pandas as pd
+
+from src.converter.base import BaseConverter
+
+# Transactions read from the start of the export for the preview.
+PREVIEW_SOURCE_ROWS = 1000
+
+# Converted rows shown in the preview.
+PREVIEW_ROWS = 20
+
+
+class Preview(NamedTuple):
+    """
+    Result of a preview conversion.
+
+    Attributes:
+        rows: First PREVIEW_ROWS converted rows
+        symbols: Symbols in the preview conversion
+        source_rows: Transaction rows the preview read
+        seconds: Time the preview took
+    """
+
+    rows: pd.DataFrame
+    symbols: int
+    source_rows: int
+    seconds: float
+
+
+def preview_conversion(
+    converter_class: Type[BaseConverter], arguments: Dict[str, Any]
+) -> Preview:
+    """
+    Convert the first PREVIEW_SOURCE_ROWS transactions of an upload.
+
+    Symbols that can't be reconciled from the partial history are left out
+    rather than failing the preview.
+
+    Args:
+        converter_class: Converter of the upload
+        arguments: Keyword arguments of the full conversion
+
+    Returns:
+        The preview
+
+    Raises:
+        ValueError: If the export doesn't have the converter's columns
+    """
+    start = time.perf_counter()
+    converter = converter_class(
+        **arguments, max_rows=PREVIEW_SOURCE_ROWS, fail_soft=True
+    )
+    df = converter.convert()
+    return Preview(
+        df.head(PREVIEW_ROWS),
+        int(df["Symbol"].nunique()),
+        len(converter.loaded.transactions),
+        time.perf_counter() - start,
+    )
+
+
+def format_preview(preview: Preview) -> str:
+    """
+    Status text shown with the preview while the full conversion runs.
+    """
+    return (
+        f"Columns check passed. Preview of the first {preview.source_rows} "
+        f"transactions ({preview.symbols} symbols) converted in "
+        f"{preview.seconds:.2f}s; converting the full file..."
+    )
@@ -0,0 +1,24 @@
+"""
+Bridge from converter progress events to the Gradio progress bar.
+"""
+
+from typing import Any
+
+from src.converter.progress import ProgressCallback, ProgressEvent, format_progress
+
+
+def gradio_progress_callback(progress: Any) -> ProgressCallback:
+    """
+    Build a converter progress callback that drives a gr.Progress tracker.
+
+    Args:
+        progress: The gr.Progress instance injected into the event handler
+
+    Returns:
+        Callback to pass as the converter's progress_callback
+    """
+
+    def callback(event: ProgressEvent) -> None:
+        progress(event.fraction, desc=format_progress(event))
+
+    return callback
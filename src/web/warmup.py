@@ -0,0 +1,104 @@
+"""
+Cold-start warmup of the web app.
+
+The first conversion in a fresh process pays for importing pandas internals,
+compiling the date parsers and loading converter code. Running a tiny
+conversion through every registered converter before serving moves that cost
+to startup, where it is logged, instead of the first user's request.
+"""
+
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from src.converter import converter_mapping
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.schwab import SchwabConverter
+
+# Small exports in the layout of the real ones, covering a cash row, a
+# position the history doesn't fully cover and a closed position.
+SCHWAB_HISTORY = """\
+"Date","Action","Symbol","Description","Quantity","Price","Fees & Comm","Amount"
+"03/03/2025","Sell","MSFT","MICROSOFT CORP","2","$410.50","$0.01","$820.99"
+"02/14/2025","Reinvest Shares","VTI","VANGUARD TOTAL STOCK MARKET ETF","0.125","$300.40","","-$37.55"
+"02/03/2025","MoneyLink Transfer","","Tfr BANK","","","","$1,000.00"
+"01/15/2025","Buy","VTI","VANGUARD TOTAL STOCK MARKET ETF","3","$290.10","","-$870.30"
+"01/06/2025","Buy","MSFT","MICROSOFT CORP","2","$420.00","","-$840.00"
+"01/02/2025","Buy","AAPL","APPLE INC","5","$243.85","","-$1,219.25"
+"""
+SCHWAB_POSITIONS = """\
+"Positions for account Individual ...000 as of 07:22 AM ET, 2025/03/05"
+
+"Symbol","Description","Qty (Quantity)","Price","Cost Basis"
+"AAPL","APPLE INC","8","235.00","$1,850.00"
+"VTI","VANGUARD TOTAL STOCK MARKET ETF","3.125","295.00","$907.85"
+"Cash & Cash Investments","--","--","--","--"
+"Positions Total","","--","--","$2,757.85"
+"""
+CATHAY_STATEMENT = """\
+交易日期,商品代碼,商品名稱,交易市場,交易種類,交易幣別,交割幣別,股數,價格,匯率,成交金額,手續費,其他費用,應收/付(-)金額
+2025/01/02,AAPL,Apple Inc.,US,買進,USD,USD,5,243.85,1,1219.25,1.5,0,-1220.75
+2025/01/06,MSFT,Microsoft Corp.,US,買進,USD,USD,2,420.00,1,840.00,1.5,0,-841.50
+2025/03/03,MSFT,Microsoft Corp.,US,賣出,USD,USD,2,410.50,1,821.00,1.5,0.01,819.49
+"""
+
+
+def _write(directory: str, name: str, content: str) -> str:
+    path = Path(directory) / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def _schwab_arguments(directory: str) -> Dict[str, Any]:
+    return {
+        "history_data_path": _write(directory, "history.csv", SCHWAB_HISTORY),
+        "positions_data_path": _write(directory, "positions.csv", SCHWAB_POSITIONS),
+        "fix_exceed_range": True,
+        "include_closed_positions": True,
+    }
+
+
+def _cathay_arguments(directory: str) -> Dict[str, Any]:
+    return {
+        "statement_of_account_file_path": _write(
+            directory, "statement_of_account.csv", CATHAY_STATEMENT
+        )
+    }
+
+
+# Builders of small inputs per converter name, writing into a directory and
+# returning the converter keyword arguments.
+warmup_inputs: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    SchwabConverter.converter_name: _schwab_arguments,
+    CathaySubBrokerageConverter.converter_name: _cathay_arguments,
+}
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Run one small conversion through each registered converter.
+
+    A failing warmup is logged and doesn't prevent the app from starting.
+
+    Returns:
+        Seconds taken per converter name, for the converters warmed up
+    """
+    seconds: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="warmup_") as directory:
+        for name, converter_class in converter_mapping.items():
+            build_arguments = warmup_inputs.get(name)
+            if build_arguments is None:
+                logging.warning(f"No warmup inputs for converter {name}, skipped")
+                continue
+            start = time.perf_counter()
+            try:
+                converter_class(**build_arguments(f"{directory}/{name}")).convert()
+            except Exception as e:
+                logging.warning(f"Warmup of {name} failed: {e}")
+                continue
+            seconds[name] = time.perf_counter() - start
+            logging.info(f"Warmed up {name} in {seconds[name]:.3f}s")
+    return seconds
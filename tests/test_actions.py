@@ -0,0 +1,75 @@
+import pandas as pd
+
+from src.converter.actions import ActionRule, apply_action_table
+from src.converter.schwab import SchwabConverter, schwab_action_table
+
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def test_action_table_signs_quantities_and_sets_action_and_comment() -> None:
+    df = pd.DataFrame(
+        {
+            "Action": [
+                "Buy",
+                "Sell",
+                "Reinvest Shares",
+                "Sell Short",
+                "Buy to Cover",
+                "Stock Split",
+                "Journaled Shares",
+                "Journaled Shares",
+                "Qual Div Reinvest",
+                "Some New Action",
+            ],
+            "Quantity": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, -8.0, 9.0, 10.0],
+        }
+    )
+
+    result = apply_action_table(df, schwab_action_table)
+
+    assert result["Quantity"].tolist() == [1.0, -2.0, 3.0, -4.0, 5.0, 6.0, 7.0, -8.0]
+    assert result["Action"].tolist() == [
+        "BUY",
+        "SELL",
+        "BUY",
+        "SELL",
+        "BUY",
+        "BUY",
+        "BUY",
+        "SELL",
+    ]
+    assert result["Comment"].tolist() == [
+        "",
+        "correct to sell",
+        "Reinvest Shares",
+        "Sell Short",
+        "Buy to Cover",
+        "Stock Split",
+        "Journaled Shares",
+        "Journaled Shares",
+    ]
+
+
+def test_schwab_action_table_can_be_extended_per_converter() -> None:
+    class NoReinvestSchwabConverter(SchwabConverter):
+        action_table = {
+            **schwab_action_table,
+            "Reinvest Shares": ActionRule(1, "BUY", "DRIP", include=False),
+        }
+
+    default = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+    ).convert()
+    extended = NoReinvestSchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+    ).convert()
+
+    reinvest_rows = default[default["Comment"] == "Reinvest Shares"]
+    assert not reinvest_rows.empty
+    assert (reinvest_rows["Action"] == "BUY").all()
+    assert "Reinvest Shares" not in extended["Comment"].to_list()
+    assert "DRIP" not in extended["Comment"].to_list()
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from src.converter.schwab import SchwabConverter
+from src.web.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    AdmissionSettings,
+    Deadline,
+    DeadlineExceeded,
+    admission_rejections,
+    deadline_cancellations,
+)
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+SETTINGS = AdmissionSettings(
+    max_upload_mb=1,
+    max_concurrent=1,
+    max_queue=1,
+    small_upload_kb=1,
+    small_concurrent=1,
+    deadline_seconds=5,
+)
+LARGE = 100 * 1024
+
+
+def test_oversized_upload_is_rejected():
+    controller = AdmissionController(SETTINGS)
+    before = admission_rejections.value("too_large")
+
+    with pytest.raises(AdmissionRejected, match="exceeds"):
+        with controller.admit(2 * 2**20):
+            pass
+
+    assert admission_rejections.value("too_large") == before + 1
+
+
+def test_small_uploads_pass_while_large_lane_is_full():
+    controller = AdmissionController(SETTINGS)
+    release = threading.Event()
+    admitted = threading.Event()
+
+    def hold_large_slot():
+        with controller.admit(LARGE):
+            admitted.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold_large_slot)
+    waiter = threading.Thread(target=hold_large_slot)
+    holder.start()
+    admitted.wait()
+    waiter.start()
+    while controller.waiting == 0:
+        time.sleep(0.01)
+
+    try:
+        # The single waiting place is taken: the next large request fails fast.
+        with pytest.raises(AdmissionRejected, match="waiting"):
+            with controller.admit(LARGE):
+                pass
+        with controller.admit(100):
+            pass
+    finally:
+        release.set()
+        holder.join()
+        waiter.join()
+
+
+def test_deadline_stops_a_running_conversion():
+    with pytest.raises(DeadlineExceeded):
+        SchwabConverter(
+            positions_data_path=str(POSITIONS_PATH),
+            history_data_path=str(HISTORY_PATH),
+            fix_exceed_range=True,
+            progress_callback=Deadline(0).wrap(),
+        ).convert()
+
+
+def test_deadline_is_checked_between_stages_without_progress_events():
+    deadline = Deadline(60)
+    converter = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+        cancel_check=deadline.check,
+    )
+    before = deadline_cancellations.value()
+    deadline.expires = time.monotonic()
+
+    with pytest.raises(DeadlineExceeded):
+        converter.convert()
+    assert deadline_cancellations.value() == before + 1
+    assert "normalize" not in converter.stage_seconds
@@ -0,0 +1,77 @@
+import csv
+import io
+import zipfile
+
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement
+from src.web.admission import AdmissionRejected, Deadline
+from src.web.converters.batch import SUMMARY_NAME, extract_uploads, run_batch
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def test_batch_pairs_accounts_and_streams_one_zip(tmp_path):
+    upload = tmp_path / "exports.zip"
+    with zipfile.ZipFile(upload, "w") as archive:
+        archive.write(HISTORY_PATH, "Joint_XXX123_Transactions_20250128.csv")
+        archive.write(POSITIONS_PATH, "Joint-Positions-2025-01-28.csv")
+    statement = write_cathay_statement(tmp_path / "cathay", 100, n_symbols=3)
+    zip_path = tmp_path / "converted.zip"
+
+    steps = list(
+        run_batch(
+            [str(upload), str(statement)],
+            str(zip_path),
+            {"schwab": {"fix_exceed_range": True}},
+            workers=2,
+        )
+    )
+
+    assert [len(statuses) for statuses in steps] == [1, 2, 2]
+    assert {(s.account, s.status) for s in steps[-1]} == {
+        ("Joint", "ok"),
+        ("statement_of_account", "ok"),
+    }
+    with zipfile.ZipFile(zip_path) as archive:
+        names = set(archive.namelist())
+        summary = list(csv.DictReader(io.StringIO(archive.read(SUMMARY_NAME).decode())))
+    assert names == {
+        "Joint/Joint-Positions-2025-01-28_yahoo_finance.csv",
+        "statement_of_account/statement_of_account_yahoo_finance.csv",
+        SUMMARY_NAME,
+    }
+    assert {row["status"] for row in summary} == {"ok"}
+
+
+def test_extraction_caps_unpacked_bytes_and_members(tmp_path):
+    bomb = tmp_path / "bomb.zip"
+    with zipfile.ZipFile(bomb, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("a_Transactions_20250128.csv", b"0" * 5_000_000)
+    many = tmp_path / "many.zip"
+    with zipfile.ZipFile(many, "w") as archive:
+        for i in range(5):
+            archive.writestr(f"{i}.txt", b"")
+
+    assert bomb.stat().st_size < 50_000
+    with pytest.raises(AdmissionRejected, match="MiB"):
+        extract_uploads([str(bomb)], str(tmp_path / "out1"), max_bytes=2**20)
+    with pytest.raises(AdmissionRejected, match="files"):
+        extract_uploads([str(many), str(many)], str(tmp_path / "out2"), max_members=8)
+    assert len(extract_uploads([str(bomb)], str(tmp_path / "out3"))) == 1
+
+
+def test_accounts_share_the_deadline_of_the_batch(tmp_path):
+    statements = [
+        write_cathay_statement(tmp_path / name, 50, n_symbols=2) for name in "ab"
+    ]
+    deadline = Deadline(0.0)
+
+    *_, statuses = run_batch(
+        [str(path) for path in statements],
+        str(tmp_path / "converted.zip"),
+        workers=1,
+        deadline=deadline,
+    )
+
+    assert [s.status for s in statuses] == ["failed", "failed"]
+    assert all("limit" in s.error for s in statuses)
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+
+
+@pytest.mark.parametrize("executor", ["serial", "chunked"])
+def test_cathay_statement_is_reconciled_against_holdings(tmp_path, executor):
+    statement_path = write_cathay_statement(tmp_path, 300, n_symbols=4)
+    plain = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(statement_path)
+    ).convert()
+    signed = plain["Quantity"].where(plain["Action"] == "BUY", -plain["Quantity"])
+    held = signed.groupby(plain["Symbol"].astype(str)).sum()
+
+    # SA holds 5 more shares than the statement shows; SB was sold out
+    # before the export; SC and SD match the statement.
+    holdings_path = tmp_path / "holdings.csv"
+    holdings_path.write_text(
+        "交易市場,商品代碼,庫存股數,持有成本\n"
+        f"US,SA,{held['SA'] + 5},1000000\n"
+        f"US,SC,{held['SC']},0\n"
+        f"US,SD,{held['SD']},0\n",
+        encoding="utf-8",
+    )
+
+    result = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(statement_path),
+        holdings_file_path=str(holdings_path),
+        executor=executor,
+    ).convert()
+
+    signed = result["Quantity"].where(result["Action"] == "BUY", -result["Quantity"])
+    net = signed.groupby(result["Symbol"].astype(str)).sum()
+    assert net.to_dict() == pytest.approx(
+        {"SA": held["SA"] + 5, "SB": 0, "SC": held["SC"], "SD": held["SD"]}
+    )
+    dummies = result[result["Trade Date"] == "20200101"]
+    assert sorted(dummies["Symbol"].astype(str)) == ["SA", "SB"]
+    # Held symbols come first, in holdings order.
+    assert list(pd.unique(result["Symbol"].astype(str)))[:3] == ["SA", "SC", "SD"]
+
+
+def test_holdings_are_rejected_with_currency_conversion(tmp_path):
+    statement_path = write_cathay_statement(tmp_path, 10, n_symbols=1)
+    holdings_path = tmp_path / "holdings.csv"
+    holdings_path.write_text(
+        "交易市場,商品代碼,庫存股數,持有成本\nUS,SA,1,100\n", encoding="utf-8"
+    )
+
+    with pytest.raises(ValueError, match="--currency"):
+        CathaySubBrokerageConverter(
+            statement_of_account_file_path=str(statement_path),
+            holdings_file_path=str(holdings_path),
+            currency="TWD",
+        )
@@ -0,0 +1,116 @@
+import bz2
+import gzip
+import lzma
+
+import pandas as pd
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement
+from src.cli.main import main
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.pairing import CATHAY_STATEMENT, classify_export, pair_exports
+from src.converter.readers import detect_compression, sniff_encoding
+from src.converter.schwab import SchwabConverter, find_position_header_index
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def _zstd_compress(data):
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+compressors = {
+    ".gz": gzip.compress,
+    ".bz2": bz2.compress,
+    ".xz": lzma.compress,
+    ".zst": _zstd_compress,
+}
+
+
+def _compress(source, target, suffix):
+    target.write_bytes(compressors[suffix](source.read_bytes()))
+    return str(target)
+
+
+def _convert_schwab(history, positions):
+    return SchwabConverter(
+        history_data_path=history,
+        positions_data_path=positions,
+        fix_exceed_range=True,
+    ).convert()
+
+
+@pytest.mark.parametrize("suffix", list(compressors))
+def test_compressed_schwab_exports_convert_like_plain_ones(tmp_path, suffix):
+    history = _compress(HISTORY_PATH, tmp_path / f"history.csv{suffix}", suffix)
+    positions = _compress(POSITIONS_PATH, tmp_path / f"positions.csv{suffix}", suffix)
+
+    assert find_position_header_index(positions) == find_position_header_index(
+        str(POSITIONS_PATH)
+    )
+    pd.testing.assert_frame_equal(
+        _convert_schwab([history, history], positions),
+        _convert_schwab(str(HISTORY_PATH), str(POSITIONS_PATH)),
+    )
+
+
+def test_compression_is_detected_from_magic_bytes(tmp_path):
+    plain = write_cathay_statement(tmp_path / "plain", 200, n_symbols=4)
+    big5 = tmp_path / "big5.csv"
+    big5.write_text(plain.read_text(encoding="utf-8"), encoding="cp950")
+    # Renamed after compressing, so only the content tells it is gzip.
+    statement = _compress(big5, tmp_path / "statement.csv", ".gz")
+
+    expected = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(plain)
+    ).convert()
+    result = CathaySubBrokerageConverter(
+        statement_of_account_file_path=statement
+    ).convert()
+
+    assert detect_compression(statement) == "gzip"
+    assert sniff_encoding(statement) == "cp950"
+    assert classify_export(statement) == CATHAY_STATEMENT
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_compressed_exports_pair_to_plain_outputs(tmp_path):
+    statement = write_cathay_statement(tmp_path, 50, n_symbols=2)
+    compressed = _compress(statement, tmp_path / "account.csv.xz", ".xz")
+
+    jobs, _ = pair_exports([compressed])
+
+    assert jobs[0].account == "account"
+    assert jobs[0].output_path == str(tmp_path / "account_yahoo_finance.csv")
+
+
+def test_cli_compresses_output_by_suffix(tmp_path):
+    arguments = [
+        "--converter-type",
+        "schwab",
+        "--history-data",
+        str(HISTORY_PATH),
+        "--positions-data",
+        str(POSITIONS_PATH),
+        "--fix-exceed-range",
+    ]
+    plain_path = tmp_path / "full.csv"
+    compressed_path = tmp_path / "full.csv.gz"
+    assert main(arguments + ["--output", str(plain_path)]) == 0
+    assert main(arguments + ["--output", str(compressed_path)]) == 0
+    assert (
+        main(
+            arguments
+            + [
+                "--output",
+                str(tmp_path / "delta.csv.bz2"),
+                "--previous-output",
+                str(compressed_path),
+            ]
+        )
+        == 0
+    )
+
+    assert gzip.decompress(compressed_path.read_bytes()) == plain_path.read_bytes()
+    assert detect_compression(str(tmp_path / "delta_removed.csv.bz2")) == "bz2"
+    assert len(pd.read_csv(tmp_path / "delta.csv.bz2")) == 0
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from src.cli.main import main
+from src.converter.delta import compute_delta, read_yahoo_csv
+from src.converter.schwab import SchwabConverter
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def _convert():
+    return SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+    ).convert()
+
+
+def test_delta_keeps_new_and_changed_rows_and_reports_removed(tmp_path):
+    current = _convert().reset_index(drop=True)
+    previous = current.drop(index=[0, 1]).copy()
+    previous.loc[2, "Purchase Price"] += 1
+    previous = pd.concat([previous, current.iloc[[3]]], ignore_index=True)
+    previous_path = tmp_path / "previous.csv"
+    previous.to_csv(previous_path, index=False)
+
+    delta = compute_delta(current, read_yahoo_csv(str(previous_path)))
+
+    assert list(delta.added.index) == [0, 1, 2]
+    assert len(delta.removed) == 2
+    assert float(delta.removed["Purchase Price"].iloc[0]) == (
+        current.loc[2, "Purchase Price"] + 1
+    )
+
+
+def test_cli_writes_only_rows_missing_from_previous_output(tmp_path):
+    arguments = [
+        "--converter-type",
+        "schwab",
+        "--history-data",
+        str(HISTORY_PATH),
+        "--positions-data",
+        str(POSITIONS_PATH),
+        "--fix-exceed-range",
+    ]
+    full_path = tmp_path / "full.csv"
+    assert main(arguments + ["--output", str(full_path)]) == 0
+
+    delta_path = tmp_path / "delta.csv"
+    assert (
+        main(
+            arguments
+            + ["--output", str(delta_path), "--previous-output", str(full_path)]
+        )
+        == 0
+    )
+
+    assert len(pd.read_csv(delta_path)) == 0
+    assert len(pd.read_csv(tmp_path / "delta_removed.csv")) == 0
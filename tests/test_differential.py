@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from src.benchmark.differential import (
+    compare_outputs,
+    differential_modes,
+    run_differential,
+)
+from src.benchmark.reference import (
+    ReferenceCathaySubBrokerageConverter,
+    ReferenceSchwabConverter,
+)
+from src.benchmark.synthetic import write_cathay_holdings, write_cathay_statement
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.schwab import SchwabConverter
+from test_schwab_converter import (
+    HISTORY_PATH,
+    POSITIONS_PATH,
+    _load_expected_position_quantities,
+    _signed_quantities_from_transaction_type,
+)
+
+
+def test_every_mode_matches_reference_converter_on_randomized_inputs() -> None:
+    results = run_differential(cases=3, rows=400, seed=7)
+
+    assert {r.converter for r in results} == set(differential_modes)
+    assert {r.mode for r in results} == {"serial", "chunked", "parallel"}
+    assert [r.mismatch for r in results] == [None] * len(results)
+    assert all(r.reference_seconds > 0 and r.mode_seconds > 0 for r in results)
+
+
+def test_compare_outputs_reports_value_and_error_differences() -> None:
+    reference = pd.DataFrame(
+        {
+            "Symbol": ["AAPL"],
+            "Trade Date": ["20260101"],
+            "Action": ["BUY"],
+            "Quantity": [1.0],
+            "Purchase Price": [100.0],
+            "Commission": [0.0],
+            "Comment": [""],
+        }
+    )
+    candidate = reference.assign(Quantity=[2.0])
+
+    assert compare_outputs(reference, None, reference.copy(), None) is None
+    assert compare_outputs(reference, None, candidate, None) is not None
+    assert compare_outputs(None, ValueError("x"), None, ValueError("y")) is None
+    assert compare_outputs(None, ValueError("x"), reference, None) is not None
+
+
+@pytest.mark.parametrize("include_closed_positions", [False, True])
+def test_reference_converter_matches_schwab_fixture(include_closed_positions) -> None:
+    settings = {
+        "positions_data_path": str(POSITIONS_PATH),
+        "history_data_path": str(HISTORY_PATH),
+        "fix_exceed_range": True,
+        "include_closed_positions": include_closed_positions,
+    }
+    reference = ReferenceSchwabConverter(**settings).convert()
+
+    expected_quantities = _load_expected_position_quantities()
+    actual_quantities = _signed_quantities_from_transaction_type(reference)
+    for symbol, expected_quantity in expected_quantities.items():
+        assert actual_quantities[symbol] == pytest.approx(expected_quantity)
+    assert (
+        compare_outputs(reference, None, SchwabConverter(**settings).convert(), None)
+        is None
+    )
+
+
+def test_reference_converter_matches_cathay_with_holdings(tmp_path) -> None:
+    statement_path = write_cathay_statement(tmp_path, 400, n_symbols=30, seed=1)
+    settings = {
+        "statement_of_account_file_path": str(statement_path),
+        "holdings_file_path": str(
+            write_cathay_holdings(tmp_path, statement_path, seed=2)
+        ),
+    }
+    reference = ReferenceCathaySubBrokerageConverter(**settings).convert()
+
+    assert (reference["Trade Date"] == "20200101").any()
+    assert (
+        compare_outputs(
+            reference, None, CathaySubBrokerageConverter(**settings).convert(), None
+        )
+        is None
+    )
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cli.main import main
+from src.converter.reconcile import ReconcileTask, reconcile_tasks
+from src.converter.schwab import SchwabConverter
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def _converter(**kwargs):
+    return SchwabConverter(
+        history_data_path=str(HISTORY_PATH),
+        positions_data_path=str(POSITIONS_PATH),
+        fix_exceed_range=False,
+        include_closed_positions=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("executor", ["serial", "chunked"])
+def test_fail_soft_leaves_out_only_the_failing_symbols(executor):
+    with pytest.raises(NotImplementedError):
+        _converter(executor=executor).convert()
+
+    converter = _converter(executor=executor, fail_soft=True)
+    df = converter.convert()
+
+    failed = {failure.symbol for failure in converter.failures}
+    assert {failure.error for failure in converter.failures} == {"NotImplementedError"}
+    assert df["Symbol"].astype(str).unique().tolist() == ["URA"]
+    assert "URA" not in failed
+    assert "AAPL" in failed
+
+
+def test_arithmetic_errors_are_isolated_per_symbol():
+    columns = {"quantity": np.array([-1.0, 2.0]), "price": np.array([20.0, 5.0])}
+    tasks = [
+        # Held at zero shares with a negative cost basis: the replacement buy
+        # would be priced at cost / 0.
+        ReconcileTask("BAD", 0, 1, 0.0, -50.0),
+        ReconcileTask("GOOD", 1, 2, 2.0, 10.0),
+    ]
+
+    with pytest.raises(ZeroDivisionError):
+        reconcile_tasks(columns, tasks, fix_exceed_range=True)
+    bad, good = reconcile_tasks(columns, tasks, fix_exceed_range=True, fail_soft=True)
+
+    assert bad.failure.error == "ZeroDivisionError"
+    assert not bad.keep_history and bad.dummy_action is None
+    assert good.failure is None and good.keep_history
+
+
+def test_rerun_converts_only_the_failed_symbols(tmp_path):
+    arguments = [
+        "--converter-type",
+        "schwab",
+        "--history-data",
+        str(HISTORY_PATH),
+        "--positions-data",
+        str(POSITIONS_PATH),
+        "--include-closed-positions",
+    ]
+    report_path = tmp_path / "partial_errors.json"
+    assert (
+        main(arguments + ["--output", str(tmp_path / "partial.csv"), "--fail-soft"])
+        == 0
+    )
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+
+    assert report["converter"] == "schwab"
+    assert report["failed_symbols"] == [f["symbol"] for f in report["failures"]]
+
+    retry_path = tmp_path / "retry.csv"
+    full_path = tmp_path / "full.csv"
+    fixed = arguments + ["--fix-exceed-range"]
+    assert (
+        main(fixed + ["--output", str(retry_path), "--retry-failed", str(report_path)])
+        == 0
+    )
+    assert main(fixed + ["--output", str(full_path)]) == 0
+
+    full = pd.read_csv(full_path)
+    expected = full[full["Symbol"].isin(report["failed_symbols"])]
+    pd.testing.assert_frame_equal(
+        pd.read_csv(retry_path), expected.reset_index(drop=True)
+    )
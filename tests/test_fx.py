@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.fx import statement_rate_factors
+
+
+def _statement_with_currencies(tmp_path):
+    path = write_cathay_statement(tmp_path, 200, n_symbols=4)
+    df = pd.read_csv(path)
+    # Settle the second half in TWD at the statement's rate.
+    twd = df.index >= len(df) // 2
+    df.loc[twd, "交割幣別"] = "TWD"
+    df.loc[twd, "匯率"] = 30.0
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def _convert(path, **kwargs):
+    return CathaySubBrokerageConverter(
+        statement_of_account_file_path=path, **kwargs
+    ).convert()
+
+
+def test_statement_rates_convert_fees_to_trade_currency(tmp_path):
+    path, df = _statement_with_currencies(tmp_path)
+    plain = _convert(path)
+
+    usd = _convert(path, currency="USD")
+
+    settled_in_twd = (df.loc[plain.index, "交割幣別"] == "TWD").to_numpy()
+    np.testing.assert_allclose(usd["Purchase Price"], plain["Purchase Price"])
+    np.testing.assert_allclose(
+        usd["Commission"],
+        np.where(settled_in_twd, 1 / 30.0, 1.0) * plain["Commission"],
+    )
+    # USD-settled rows carry no TWD rate in the statement.
+    with pytest.raises(ValueError, match="rate table"):
+        _convert(path, currency="TWD")
+
+
+def test_rate_table_is_joined_as_of_trade_date(tmp_path):
+    path, df = _statement_with_currencies(tmp_path)
+    rates_path = tmp_path / "rates.csv"
+    rates_path.write_text(
+        "Date,Currency,Rate\n" "2000-01-01,USD,30\n" "2022-01-01,USD,32\n",
+        encoding="utf-8",
+    )
+    plain = _convert(path)
+
+    result = _convert(path, currency="TWD", fx_rates_path=str(rates_path))
+
+    trade_dates = pd.to_datetime(df.loc[plain.index, "交易日期"])
+    rate = np.where(trade_dates >= "2022-01-01", 32.0, 30.0)
+    np.testing.assert_allclose(result["Purchase Price"], rate * plain["Purchase Price"])
+
+
+def test_statement_rates_reject_unrelated_currency():
+    with pytest.raises(ValueError, match="rate table"):
+        statement_rate_factors(
+            pd.Series(["USD"]), pd.Series(["USD"]), pd.Series([1.0]), "JPY"
+        )
@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+
+from src.converter.lots import open_lots
+from src.converter.schwab import SchwabConverter
+
+from test_schwab_converter import (
+    HISTORY_PATH,
+    POSITIONS_PATH,
+    _load_expected_position_quantities,
+    _signed_quantities_from_transaction_type,
+)
+
+
+def _transactions() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Symbol": ["AAA", "AAA", "AAA", "BBB"],
+            "Trade Date": pd.to_datetime(
+                ["2024-01-03", "2024-01-02", "2024-01-01", "2024-01-01"]
+            ),
+            "Action": ["SELL", "BUY", "BUY", "BUY"],
+            "Quantity": [12.0, 5.0, 10.0, 1.0],
+            "Purchase Price": [3.0, 2.0, 1.0, 50.0],
+            "Commission": [1.0, 0.5, 1.0, 0.0],
+            "Comment": ["", "", "", ""],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    ("method", "expected_date", "expected_price", "expected_commission"),
+    [
+        ("fifo", "2024-01-02", 2.0, 0.3),
+        ("lifo", "2024-01-01", 1.0, 0.3),
+        ("average", "2024-01-01", 20.0 / 15.0, 0.3),
+    ],
+)
+def test_open_lots_relieves_sells_with_selected_method(
+    method: str,
+    expected_date: str,
+    expected_price: float,
+    expected_commission: float,
+) -> None:
+    result = open_lots(_transactions(), method)
+
+    aaa = result[result["Symbol"] == "AAA"]
+    assert len(aaa) == 1
+    assert aaa["Trade Date"].iloc[0] == pd.Timestamp(expected_date)
+    assert aaa["Action"].iloc[0] == "BUY"
+    assert aaa["Quantity"].iloc[0] == pytest.approx(3.0)
+    assert aaa["Purchase Price"].iloc[0] == pytest.approx(expected_price)
+    assert aaa["Commission"].iloc[0] == pytest.approx(expected_commission)
+    assert result["Symbol"].tolist() == ["AAA", "BBB"]
+
+
+def test_open_lots_turns_oversold_position_into_short_lot() -> None:
+    df = _transactions()
+    df.loc[0, "Quantity"] = 20.0
+
+    result = open_lots(df, "fifo")
+    aaa = result[result["Symbol"] == "AAA"]
+
+    assert aaa["Action"].tolist() == ["SELL"]
+    assert aaa["Quantity"].iloc[0] == pytest.approx(5.0)
+    assert aaa["Purchase Price"].iloc[0] == pytest.approx(3.0)
+
+
+@pytest.mark.parametrize("method", ["fifo", "lifo", "average"])
+def test_schwab_lot_export_matches_position_quantities(method: str) -> None:
+    result = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+        include_closed_positions=True,
+        lot_method=method,
+    ).convert()
+    expected_quantities = _load_expected_position_quantities()
+    actual_quantities = _signed_quantities_from_transaction_type(result)
+
+    assert (result["Action"] == "BUY").all()
+    pd.testing.assert_index_equal(actual_quantities.index, expected_quantities.index)
+    for symbol, expected_quantity in expected_quantities.items():
+        assert actual_quantities[symbol] == pytest.approx(expected_quantity)
+
+
+def test_dummy_sell_is_dated_after_the_last_trade_for_lot_matching(tmp_path) -> None:
+    history_path = tmp_path / "history.csv"
+    history_path.write_text(
+        '"Date","Action","Symbol","Quantity","Price","Fees & Comm"\n'
+        '"02/03/2025","Buy","AAPL","5","$110.00",""\n'
+        '"01/02/2025","Buy","AAPL","10","$100.00",""\n'
+    )
+    positions_path = tmp_path / "positions.csv"
+    positions_path.write_text(
+        '"Positions for account Example as of 07:22 AM ET, 2026/04/15"\n'
+        "\n"
+        '"Symbol","Description","Qty (Quantity)","Price","Cost Basis"\n'
+        '"AAPL","APPLE INC","6","250","$600.00"\n'
+        '"Cash & Cash Investments","--","--","--","--"\n'
+        '"Positions Total","","--","--","$600.00"\n'
+    )
+    arguments = {
+        "positions_data_path": str(positions_path),
+        "history_data_path": str(history_path),
+        "fix_exceed_range": True,
+    }
+
+    transactions = SchwabConverter(**arguments).convert()
+    lots = SchwabConverter(**arguments, lot_method="lifo").convert()
+
+    dummy = transactions[transactions["Action"] == "SELL"]
+    assert dummy["Trade Date"].tolist() == ["20250204"]
+    assert lots["Trade Date"].tolist() == ["20250102"]
+    assert lots["Action"].tolist() == ["BUY"]
+    assert lots["Quantity"].tolist() == pytest.approx([6.0])
+    assert lots["Purchase Price"].tolist() == pytest.approx([100.0])
@@ -0,0 +1,68 @@
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement, write_schwab_inputs
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.profiling import MemoryProfiler
+from src.converter.schwab import SchwabConverter
+
+ROWS = 20_000
+
+# Peak traced bytes per input row of the most memory-hungry stage. Measured
+# at about 320 (Schwab) and 360 (Cathay); the budgets leave room for noise
+# but catch a stage that starts copying whole frames again.
+BYTES_PER_ROW_BUDGET = {
+    "schwab": 640,
+    "cathay": 720,
+}
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("memory")
+    history_path, positions_path = write_schwab_inputs(directory, ROWS, 200)
+    statement_path = write_cathay_statement(directory, ROWS, 200)
+    return history_path, positions_path, statement_path
+
+
+def _profile(create_converter):
+    profiler = MemoryProfiler()
+    try:
+        create_converter(profiler).convert()
+    finally:
+        profiler.stop()
+    assert [stage.stage for stage in profiler.stages] == [
+        "load",
+        "normalize",
+        "reconcile",
+        "emit",
+    ]
+    return profiler.traced_peak / ROWS
+
+
+def test_schwab_peak_memory_per_row_within_budget(inputs):
+    history_path, positions_path, _ = inputs
+
+    bytes_per_row = _profile(
+        lambda profiler: SchwabConverter(
+            positions_data_path=str(positions_path),
+            history_data_path=str(history_path),
+            fix_exceed_range=True,
+            include_closed_positions=True,
+            memory_profiler=profiler,
+        )
+    )
+
+    assert bytes_per_row < BYTES_PER_ROW_BUDGET["schwab"]
+
+
+def test_cathay_peak_memory_per_row_within_budget(inputs):
+    _, _, statement_path = inputs
+
+    bytes_per_row = _profile(
+        lambda profiler: CathaySubBrokerageConverter(
+            statement_of_account_file_path=str(statement_path),
+            memory_profiler=profiler,
+        )
+    )
+
+    assert bytes_per_row < BYTES_PER_ROW_BUDGET["cathay"]
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from src.converter.merge import merge_history_files
+from src.converter.schwab import SchwabConverter
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def _write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_overlapping_history_exports_convert_like_the_full_export(tmp_path):
+    header, *rows = HISTORY_PATH.read_text(encoding="utf-8").splitlines()
+    newer = _write_lines(tmp_path / "newer.csv", [header] + rows[: len(rows) * 6 // 10])
+    older = _write_lines(tmp_path / "older.csv", [header] + rows[len(rows) * 4 // 10 :])
+
+    def convert(history):
+        return SchwabConverter(
+            positions_data_path=str(POSITIONS_PATH),
+            history_data_path=history,
+            fix_exceed_range=True,
+            include_closed_positions=True,
+        ).convert()
+
+    pd.testing.assert_frame_equal(
+        convert([older, newer]), convert(str(HISTORY_PATH)), check_categorical=False
+    )
+
+
+def test_merge_keeps_repeated_trades_once_per_occurrence(tmp_path):
+    header = '"Date","Action","Symbol","Quantity"'
+    fill = '"01/03/2025","Buy","AAPL","1"'
+    first = _write_lines(
+        tmp_path / "first.csv", [header, '"01/05/2025","Sell","AAPL","1"', fill, fill]
+    )
+    second = _write_lines(
+        tmp_path / "second.csv", [header, fill, '"01/02/2025","Buy","MSFT","2"']
+    )
+
+    _, rows = merge_history_files([first, second])
+
+    assert [row[0] for row in rows] == [
+        "01/05/2025",
+        "01/03/2025",
+        "01/03/2025",
+        "01/02/2025",
+    ]
+
+
+def test_merge_rejects_unsorted_exports(tmp_path):
+    header = '"Date","Action","Symbol","Quantity"'
+    path = _write_lines(
+        tmp_path / "unsorted.csv",
+        [header, '"01/02/2025","Buy","AAPL","1"', '"01/03/2025","Buy","AAPL","1"'],
+    )
+
+    _, rows = merge_history_files([path, path])
+    with pytest.raises(ValueError, match="not sorted"):
+        list(rows)
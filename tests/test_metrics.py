@@ -0,0 +1,52 @@
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from src.web.metrics import (
+    Histogram,
+    conversion_errors,
+    conversion_requests,
+    output_rows,
+    start_metrics_server,
+    track_conversion,
+)
+
+
+def test_track_conversion_counts_requests_rows_and_errors():
+    with track_conversion("test-converter") as observation:
+        observation.result = pd.DataFrame({"Symbol": ["A", "B"]})
+    with pytest.raises(KeyError):
+        with track_conversion("test-converter"):
+            raise KeyError("Symbol")
+
+    assert conversion_requests.value("test-converter") == 2
+    assert output_rows.value("test-converter") == 2
+    assert conversion_errors.value("test-converter", "KeyError") == 1
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ["converter"], [0.1, 1.0])
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{converter="a",le="0.1"} 1',
+        'latency_seconds_bucket{converter="a",le="1"} 2',
+        'latency_seconds_bucket{converter="a",le="+Inf"} 2',
+        'latency_seconds_sum{converter="a"} 0.55',
+        'latency_seconds_count{converter="a"} 2',
+    ]
+
+
+def test_metrics_server_serves_prometheus_text():
+    server = start_metrics_server(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode("utf-8")
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.shutdown()
+
+    assert "# TYPE converter_duration_seconds histogram" in body
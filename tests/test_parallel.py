@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cli.main import main
+from src.converter.executors import _pools, create_executor
+from src.converter.schwab import SchwabConverter
+
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def test_parallel_reconciliation_matches_serial_output() -> None:
+    results = [
+        SchwabConverter(
+            positions_data_path=str(POSITIONS_PATH),
+            history_data_path=str(HISTORY_PATH),
+            fix_exceed_range=True,
+            include_closed_positions=True,
+            **mode,
+        ).convert()
+        for mode in ({}, {"executor": "parallel", "workers": 2})
+    ]
+
+    pd.testing.assert_frame_equal(
+        results[0], results[1], check_dtype=False, check_categorical=False
+    )
+
+
+def test_parallel_executor_honors_the_worker_count() -> None:
+    assert create_executor("parallel", workers=1).workers == 1
+    assert create_executor("parallel", workers=3).workers == 3
+    with pytest.raises(ValueError):
+        create_executor("parallel", workers=0)
+
+
+def test_workers_do_not_pick_the_parallel_executor() -> None:
+    assert create_executor().name == "serial"
+    with pytest.raises(ValueError, match="--executor parallel"):
+        create_executor(workers=2)
+    with pytest.raises(ValueError, match="--executor parallel"):
+        create_executor("chunked", workers=2)
+
+
+def test_parallel_executor_reuses_its_worker_pool() -> None:
+    executor = create_executor("parallel", workers=2)
+    columns = {"value": np.arange(10, dtype=np.float64)}
+
+    first = executor.map_partitions(_sum_ranges, columns, [(0, 5), (5, 10)])
+    pool = _pools[2]
+    second = create_executor("parallel", workers=2).map_partitions(
+        _sum_ranges, columns, [(0, 10)]
+    )
+
+    assert first == [10.0, 35.0]
+    assert second == [45.0]
+    assert _pools[2] is pool
+
+
+def _sum_ranges(columns, ranges):
+    return [float(columns["value"][start:stop].sum()) for start, stop in ranges]
+
+
+def test_cli_rejects_fewer_than_one_worker(capsys) -> None:
+    with pytest.raises(SystemExit):
+        main(
+            [
+                "--converter-type",
+                "schwab",
+                "--output",
+                "out.csv",
+                "--history-data",
+                str(HISTORY_PATH),
+                "--positions-data",
+                str(POSITIONS_PATH),
+                "--workers",
+                "0",
+            ]
+        )
+    assert "--workers: must be at least 1" in capsys.readouterr().err
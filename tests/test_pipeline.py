@@ -0,0 +1,49 @@
+import pandas as pd
+
+from src.converter.cache import StageCache
+from src.converter.schwab import SchwabConverter
+
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def _converter(**kwargs) -> SchwabConverter:
+    settings = {
+        "positions_data_path": str(POSITIONS_PATH),
+        "history_data_path": str(HISTORY_PATH),
+        "fix_exceed_range": True,
+        "include_closed_positions": True,
+    }
+    return SchwabConverter(**{**settings, **kwargs})
+
+
+def test_chunked_executor_matches_serial_output() -> None:
+    pd.testing.assert_frame_equal(
+        _converter(executor="chunked").convert(),
+        _converter().convert(),
+        check_categorical=False,
+    )
+
+
+def test_stage_cache_reuses_stages_whose_options_are_unchanged(monkeypatch) -> None:
+    stage_cache = StageCache()
+    expected = _converter(stage_cache=stage_cache).convert()
+
+    reconciled = []
+    original_reconcile = SchwabConverter.reconcile
+    monkeypatch.setattr(
+        SchwabConverter,
+        "reconcile",
+        lambda self, normalized: reconciled.append(1)
+        or original_reconcile(self, normalized),
+    )
+
+    result = _converter(stage_cache=stage_cache).convert()
+    pd.testing.assert_frame_equal(result, expected)
+
+    # Only the emit stage depends on the lot method.
+    lots = _converter(stage_cache=stage_cache, lot_method="fifo").convert()
+    assert reconciled == []
+    assert len(lots) < len(expected)
+
+    _converter(stage_cache=stage_cache, include_closed_positions=False).convert()
+    assert reconciled == [1]
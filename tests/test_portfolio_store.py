@@ -0,0 +1,94 @@
+import importlib.util
+import io
+
+import pandas as pd
+import pytest
+
+from src.cli.main import main
+from src.converter.portfolio_store import PortfolioStore
+from src.converter.schwab import SchwabConverter
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+YAHOO_ROWS = pd.DataFrame(
+    {
+        "Symbol": ["AAPL", "AAPL", "MSFT", "AAPL", "MSFT"],
+        "Trade Date": ["20240102", "20240105", "20240103", "20240105", "20240110"],
+        "Action": ["BUY", "BUY", "BUY", "SELL", "SELL"],
+        "Quantity": [10.0, 5.0, 3.0, 12.0, 3.0],
+        "Purchase Price": [1.0] * 5,
+        "Commission": [0.0] * 5,
+        "Comment": [""] * 5,
+    }
+)
+
+
+requires_pyarrow = pytest.mark.skipif(
+    importlib.util.find_spec("pyarrow") is None, reason="pyarrow not installed"
+)
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["portfolio.sqlite", pytest.param("portfolio.parquet", marks=requires_pyarrow)],
+)
+def test_holdings_as_of_date(tmp_path, name):
+    store = PortfolioStore(str(tmp_path / name))
+    store.save("other", YAHOO_ROWS.assign(Quantity=100.0))
+    store.save("main", YAHOO_ROWS)
+    index = store.positions("main")
+
+    assert index.holdings_on(20240101) == []
+    assert index.holdings_on(20240104) == [("AAPL", 10.0), ("MSFT", 3.0)]
+    assert index.holdings_on(20240105) == [("AAPL", 3.0), ("MSFT", 3.0)]
+    assert index.holdings_on(20240110, include_closed=True) == [
+        ("AAPL", 3.0),
+        ("MSFT", 0.0),
+    ]
+    assert store.accounts() == ["main", "other"]
+
+
+def test_query_subcommand_reads_store_written_by_conversion(tmp_path, capsys):
+    store_path = tmp_path / "portfolio.sqlite"
+    output_path = tmp_path / "Individual.csv"
+    assert (
+        main(
+            [
+                "--converter-type",
+                "schwab",
+                "--output",
+                str(output_path),
+                "--history-data",
+                str(HISTORY_PATH),
+                "--positions-data",
+                str(POSITIONS_PATH),
+                "--fix-exceed-range",
+                "--store",
+                str(store_path),
+            ]
+        )
+        == 0
+    )
+    capsys.readouterr()
+
+    assert main(["query", "--store", str(store_path), "--date", "2100-01-01"]) == 0
+
+    holdings = pd.read_csv(io.StringIO(capsys.readouterr().out))
+    converter = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+    )
+    converter.convert()
+    positions = converter.positions_data_df
+    expected = dict(zip(positions["Symbol"], positions["Qty (Quantity)"].astype(float)))
+    assert dict(zip(holdings["Symbol"], holdings["Quantity"])) == pytest.approx(
+        {symbol: quantity for symbol, quantity in expected.items() if quantity}
+    )
+
+
+@pytest.mark.parametrize("account", [[], ["--account", "main"]])
+def test_query_reports_a_missing_store(tmp_path, account, capsys):
+    store_path = str(tmp_path / "missing.sqlite")
+
+    assert main(["query", "--store", store_path, "--date", "2024-01-01", *account]) == 1
+    assert capsys.readouterr().out == ""
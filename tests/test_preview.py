@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.converter.schwab import SchwabConverter
+from src.web.cache import stage_cache
+from src.web.converters.schwab import process_file
+from src.web.preview import PREVIEW_ROWS, PREVIEW_SOURCE_ROWS, preview_conversion
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def _arguments(**kwargs):
+    return {
+        "history_data_path": str(HISTORY_PATH),
+        "positions_data_path": str(POSITIONS_PATH),
+        "fix_exceed_range": True,
+        **kwargs,
+    }
+
+
+def test_max_rows_reads_only_the_start_of_the_history():
+    full = SchwabConverter(**_arguments())
+    full.convert()
+    partial = SchwabConverter(**_arguments(max_rows=3))
+    partial.convert()
+
+    assert len(partial.loaded.transactions) == 3
+    assert len(full.loaded.transactions) > 3
+
+
+def test_preview_converts_the_first_rows():
+    preview = preview_conversion(SchwabConverter, _arguments())
+    full = SchwabConverter(**_arguments()).convert()
+
+    assert len(preview.rows) <= PREVIEW_ROWS
+    assert preview.source_rows <= PREVIEW_SOURCE_ROWS
+    assert 0 < preview.symbols <= full["Symbol"].nunique()
+    assert list(preview.rows.columns) == list(full.columns)
+
+
+def test_web_conversion_yields_the_preview_first(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    updates = list(
+        process_file(
+            [SimpleNamespace(name=str(HISTORY_PATH))],
+            SimpleNamespace(name=str(POSITIONS_PATH)),
+            progress=lambda *args, **kwargs: None,
+        )
+    )
+
+    (preview_file, preview_status, preview_rows, _), final = updates
+    assert preview_file is None
+    assert preview_status.startswith("Columns check passed.")
+    assert final[0] == "positions_yahoo_finance.csv"
+    assert final[1].startswith("Converted ")
+    pd.testing.assert_frame_equal(final[2], preview_rows)
+
+
+def test_web_resubmission_with_another_option_reuses_cached_stages(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+
+    def convert(include_closed_positions):
+        *_, (_, status, _, _) = process_file(
+            [SimpleNamespace(name=str(HISTORY_PATH))],
+            SimpleNamespace(name=str(POSITIONS_PATH)),
+            include_closed_positions,
+            progress=lambda *args, **kwargs: None,
+        )
+        return status
+
+    open_only = convert(False)
+    hits = stage_cache.hits
+    with_closed = convert(True)
+
+    # Load and normalize are reused by both the preview and the conversion.
+    assert stage_cache.hits - hits >= 4
+    assert with_closed != open_only
+
+
+def test_web_conversion_reports_a_wrong_export_without_a_preview():
+    updates = list(
+        process_file(
+            [SimpleNamespace(name=str(POSITIONS_PATH))],
+            SimpleNamespace(name=str(POSITIONS_PATH)),
+            progress=lambda *args, **kwargs: None,
+        )
+    )
+
+    assert len(updates) == 1
+    file_name, status, rows, _ = updates[0]
+    assert file_name is None and rows is None
+    assert status.startswith("Conversion failed")
@@ -0,0 +1,138 @@
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from src.converter.price_store import PriceStore
+from src.converter.schwab import SchwabConverter
+
+from test_schwab_converter import (
+    HISTORY_PATH,
+    POSITIONS_PATH,
+    _load_expected_position_quantities,
+    _signed_quantities_from_transaction_type,
+)
+
+requires_pyarrow = pytest.mark.skipif(
+    importlib.util.find_spec("pyarrow") is None, reason="pyarrow not installed"
+)
+store_names = ["prices.sqlite", pytest.param("prices.parquet", marks=requires_pyarrow)]
+
+
+@pytest.fixture(params=store_names)
+def price_store_path(request, tmp_path) -> str:
+    path = str(tmp_path / request.param)
+    PriceStore.write(
+        path,
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL", "AAPL", "AAPL", "MSFT"],
+                "date": ["2025-11-10", "2025-11-12", "2025-11-13", "2019-12-31"],
+                "close": [268.0, 271.5, 273.0, 157.7],
+            }
+        ),
+    )
+    return path
+
+
+def test_price_store_returns_last_close_before_each_cutoff(
+    price_store_path: str,
+) -> None:
+    store = PriceStore(price_store_path)
+
+    quotes = store.closes_before(
+        {"AAPL": "2025-11-13", "MSFT": "2020-01-01", "NVDA": "2020-01-01"}
+    )
+
+    assert quotes == {
+        "AAPL": ("2025-11-12", 271.5),
+        "MSFT": ("2019-12-31", 157.7),
+    }
+
+
+@pytest.mark.parametrize("name", store_names)
+def test_price_store_write_extends_and_replaces_quotes(tmp_path, name: str) -> None:
+    path = str(tmp_path / name)
+    PriceStore.write(
+        path,
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL", "MSFT"],
+                "date": ["2025-01-02"] * 2,
+                "close": [1.0, 2.0],
+            }
+        ),
+    )
+    PriceStore.write(
+        path,
+        pd.DataFrame(
+            {
+                "symbol": ["AAPL", "AAPL"],
+                "date": ["2025-01-02", "2025-01-03"],
+                "close": [3.0, 4.0],
+            }
+        ),
+    )
+
+    quotes = PriceStore(path).closes_before(
+        {"AAPL": "2025-01-03", "MSFT": "2025-02-01"}
+    )
+
+    assert quotes == {"AAPL": ("2025-01-02", 3.0), "MSFT": ("2025-01-02", 2.0)}
+
+
+def test_schwab_dates_and_prices_dummy_rows_from_price_store(
+    price_store_path: str,
+) -> None:
+    result = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+        price_store_path=price_store_path,
+    ).convert()
+
+    aapl = result[result["Symbol"] == "AAPL"]
+    dummy_rows = aapl[aapl["Trade Date"] == "20251112"]
+    assert len(dummy_rows) == 1
+    assert dummy_rows["Purchase Price"].iloc[0] == pytest.approx(271.5)
+    assert "20200101" not in aapl["Trade Date"].to_list()
+
+    expected_quantities = _load_expected_position_quantities()
+    actual_quantities = _signed_quantities_from_transaction_type(result)
+    for symbol, expected_quantity in expected_quantities.items():
+        assert actual_quantities[symbol] == pytest.approx(expected_quantity)
+
+
+def test_fractional_shares_that_net_to_the_position_need_no_dummy_row(
+    tmp_path, price_store_path: str
+) -> None:
+    history_path = tmp_path / "history.csv"
+    history_path.write_text(
+        '"Date","Action","Symbol","Quantity","Price","Fees & Comm"\n'
+        '"03/02/2020","Reinvest Shares","VTI","0.2","$150.00",""\n'
+        '"02/03/2020","Reinvest Shares","VTI","0.1","$140.00",""\n'
+        '"01/02/2020","Buy","MSFT","1","$160.00",""\n'
+    )
+    positions_path = tmp_path / "positions.csv"
+    positions_path.write_text(
+        '"Positions for account Example as of 07:22 AM ET, 2026/04/15"\n'
+        "\n"
+        '"Symbol","Description","Qty (Quantity)","Price","Cost Basis"\n'
+        '"VTI","VANGUARD TOTAL STOCK MARKET ETF","0.3","300","$44.00"\n'
+        '"MSFT","MICROSOFT CORP","2","400","$320.00"\n'
+        '"Cash & Cash Investments","--","--","--","--"\n'
+        '"Positions Total","","--","--","$364.00"\n'
+    )
+
+    result = SchwabConverter(
+        positions_data_path=str(positions_path),
+        history_data_path=str(history_path),
+        fix_exceed_range=True,
+        price_store_path=price_store_path,
+    ).convert()
+
+    vti = result[result["Symbol"] == "VTI"]
+    msft = result[result["Symbol"] == "MSFT"]
+    assert sorted(vti["Trade Date"]) == ["20200203", "20200302"]
+    assert msft["Trade Date"].to_list() == ["20200102", "20191231"]
+    assert msft["Purchase Price"].iloc[1] == pytest.approx(157.7)
@@ -0,0 +1,79 @@
+from src.converter import progress
+from src.converter.progress import ProgressEvent, ProgressReporter
+from src.converter.schwab import SchwabConverter
+
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+
+def test_schwab_reports_stages_in_order_with_symbol_counts() -> None:
+    events: list[ProgressEvent] = []
+    converter = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+        progress_callback=events.append,
+    )
+
+    result = converter.convert()
+
+    stages = [event.stage for event in events]
+    assert stages[0] == "load"
+    assert stages[-1] == "emit"
+    assert sorted(set(stages)) == ["emit", "load", "normalize", "reconcile"]
+    fractions = [event.fraction for event in events]
+    assert fractions == sorted(fractions)
+    assert events[-1].fraction == 1.0
+    assert events[-1].symbols_reconciled == events[-1].total_symbols
+    assert events[-1].total_symbols == result["Symbol"].nunique()
+    assert events[0].rows_processed > 0
+
+
+def test_schwab_reports_history_rows_reconciled() -> None:
+    events: list[ProgressEvent] = []
+    converter = SchwabConverter(
+        positions_data_path=str(POSITIONS_PATH),
+        history_data_path=str(HISTORY_PATH),
+        fix_exceed_range=True,
+        progress_callback=events.append,
+    )
+    converter.progress.min_interval = 0
+
+    converter.convert()
+
+    reconciled_rows = [e.rows_processed for e in events if e.stage == "reconcile"]
+    assert reconciled_rows == sorted(reconciled_rows)
+    assert 0 < reconciled_rows[-1] <= len(converter.history_data_df)
+
+
+def test_progress_reporter_throttles_events_within_a_stage() -> None:
+    events: list[ProgressEvent] = []
+    reporter = ProgressReporter("test", events.append, min_interval=3600)
+
+    reporter.update("reconcile", rows=10, total_symbols=1000)
+    for i in range(1000):
+        reporter.update("reconcile", symbols=i + 1)
+    reporter.update("emit")
+
+    assert [event.stage for event in events] == ["reconcile", "emit"]
+    assert events[-1].symbols_reconciled == 1000
+
+
+def test_progress_rate_is_measured_since_the_previous_event(monkeypatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr(progress.time, "monotonic", lambda: clock[0])
+    events: list[ProgressEvent] = []
+    reporter = ProgressReporter("test", events.append, min_interval=1)
+
+    for now, stage, rows in [
+        (10, "load", 1000),
+        (11, "reconcile", 0),
+        (13, "reconcile", 400),
+        (14, "reconcile", 500),
+        (20, "emit", 600),
+    ]:
+        clock[0] = now
+        reporter.update(stage, rows=rows)
+
+    assert [event.rows_processed for event in events] == [1000, 0, 400, 500, 600]
+    assert [event.rows_per_second for event in events] == [100, 0, 200, 100, 100]
+    assert reporter.input_rows == 1000
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.pairing import CATHAY_STATEMENT, classify_export
+from src.converter.readers import sniff_encoding
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "cp950"])
+def test_cathay_statements_load_in_any_export_encoding(tmp_path, encoding):
+    utf8_path = write_cathay_statement(tmp_path / "utf8", 200, n_symbols=4)
+    text = utf8_path.read_text(encoding="utf-8")
+    path = tmp_path / f"statement_{encoding}.csv"
+    path.write_text(text, encoding=encoding)
+
+    expected = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(utf8_path)
+    ).convert()
+    result = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(path)
+    ).convert()
+
+    assert sniff_encoding(str(path)) == encoding
+    assert classify_export(str(path)) == CATHAY_STATEMENT
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_sniffing_tolerates_a_character_cut_at_the_prefix_end(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.converter.readers.SNIFF_BYTES", 4)
+    path = tmp_path / "cut.csv"
+    # "交易" is three bytes per character in UTF-8; the prefix ends mid-character.
+    path.write_text("a,交易\n", encoding="utf-8")
+
+    assert sniff_encoding(str(path)) == "utf-8"
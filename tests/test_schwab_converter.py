@@ -1,13 +1,25 @@
 import warnings
 from pathlib import Path
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 import pytest
 from pandas.errors import SettingWithCopyWarning
 
-from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.benchmark.synthetic import write_cathay_statement, write_schwab_inputs
+from src.converter import reconcile
+from src.converter.cathay_sub_brokerage import (
+    CathaySubBrokerageConverter,
+    cathay_required_columns,
+)
 from src.converter.config import DEFAULT_DUMMY_DATE
-from src.converter.schwab import SchwabConverter, find_position_header_index
+from src.converter.schwab import (
+    SchwabConverter,
+    find_position_header_index,
+    schwab_columns,
+    schwab_position_columns,
+)
 from src.converter.utils import yf_columns
 
 
@@ -162,26 +174,25 @@ def test_schwab_fixture_can_include_closed_positions_from_history() -> None:
 
 def test_schwab_fixture_reconciles_closed_positions_to_zero(monkeypatch) -> None:
     completed_symbols: list[str] = []
-    original_complete_history_data = SchwabConverter._complete_history_data
+    original_plan_reconciliation = reconcile.plan_reconciliation
 
-    def spy_complete_history_data(
-        self: SchwabConverter,
+    def spy_plan_reconciliation(
         symbol: str,
-        filtered_position_data_df: pd.DataFrame,
-        filtered_history_data_df: pd.DataFrame,
-    ) -> pd.DataFrame:
-        completed_symbols.append(symbol)
-        return original_complete_history_data(
-            self,
-            symbol,
-            filtered_position_data_df,
-            filtered_history_data_df,
+        quantities: np.ndarray,
+        prices: np.ndarray,
+        target_quantity: Optional[float],
+        *args,
+    ) -> reconcile.Reconciliation:
+        if target_quantity is not None:
+            completed_symbols.append(symbol)
+        return original_plan_reconciliation(
+            symbol, quantities, prices, target_quantity, *args
         )
 
     monkeypatch.setattr(
-        SchwabConverter,
-        "_complete_history_data",
-        spy_complete_history_data,
+        reconcile,
+        "plan_reconciliation",
+        spy_plan_reconciliation,
     )
     converter = SchwabConverter(
         positions_data_path=str(POSITIONS_PATH),
@@ -277,3 +288,27 @@ def test_cathay_converter_exports_sell_rows_with_positive_quantity_positive_pric
     assert (sell_rows["Purchase Price"] > 0).all()
     assert set(result["Action"]) == {"BUY", "SELL"}
     assert list(result.columns) == EXPECTED_YF_COLUMNS
+
+
+def test_converters_ingest_only_required_columns_with_categorical_text(
+    tmp_path: Path,
+) -> None:
+    history_path, positions_path = write_schwab_inputs(tmp_path, 200, n_symbols=10)
+    statement_path = write_cathay_statement(tmp_path, 200, n_symbols=10)
+
+    schwab = SchwabConverter(
+        positions_data_path=str(positions_path),
+        history_data_path=str(history_path),
+        fix_exceed_range=True,
+    )
+    cathay = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(statement_path)
+    )
+
+    assert sorted(schwab.history_data_df.columns) == sorted(schwab_columns)
+    assert sorted(schwab.positions_data_df.columns) == sorted(schwab_position_columns)
+    assert sorted(cathay.df.columns) == sorted(cathay_required_columns)
+    for column in ["Symbol", "Action"]:
+        assert isinstance(schwab.history_data_df[column].dtype, pd.CategoricalDtype)
+    for column in ["商品代碼", "交易種類"]:
+        assert isinstance(cathay.df[column].dtype, pd.CategoricalDtype)
@@ -0,0 +1,45 @@
+from src.benchmark.synthetic import write_cathay_statement
+from src.converter.cache import StageCache
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.symbols import load_symbol_map
+
+
+def test_cathay_symbols_resolve_through_mapping_and_report_unmapped(
+    tmp_path, monkeypatch
+):
+    statement_path = write_cathay_statement(tmp_path, 300, n_symbols=4)
+    mapping_path = tmp_path / "symbols.csv"
+    mapping_path.write_text(
+        "\n".join(
+            [
+                "交易市場,商品代碼,Symbol",
+                "US,SA,SA.US",
+                "US,SB,SB.US",
+                "HK,SC,SC.HK",
+                "",
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    stage_cache = StageCache()
+    converter = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(statement_path),
+        symbol_map_path=str(mapping_path),
+        stage_cache=stage_cache,
+    )
+    result = converter.convert()
+
+    assert set(result["Symbol"]) == {"SA.US", "SB.US", "SC", "SD"}
+    assert sorted(converter.unmapped_symbols) == [("US", "SC"), ("US", "SD")]
+    assert load_symbol_map(str(mapping_path)) is converter.symbol_map
+
+    # A cached normalize stage still reports the unmapped codes.
+    monkeypatch.setattr(CathaySubBrokerageConverter, "normalize", None)
+    cached = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(statement_path),
+        symbol_map_path=str(mapping_path),
+        stage_cache=stage_cache,
+    )
+    cached.convert()
+    assert cached.unmapped_symbols == converter.unmapped_symbols
@@ -0,0 +1,19 @@
+import logging
+
+from src.converter import converter_mapping
+from src.web.metrics import track_conversion
+from src.web.warmup import warm_up
+
+
+def test_warmup_runs_every_registered_converter():
+    assert set(warm_up()) == set(converter_mapping)
+
+
+def test_first_request_latency_is_logged_once(caplog):
+    with caplog.at_level(logging.INFO):
+        for _ in range(2):
+            with track_conversion("warmup-test"):
+                pass
+
+    first = [r for r in caplog.records if r.getMessage().startswith("First warmup")]
+    assert len(first) == 1
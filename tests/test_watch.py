@@ -0,0 +1,50 @@
+import os
+import time
+
+from src.benchmark.synthetic import write_cathay_statement, write_schwab_inputs
+from src.cli.watch import FolderWatcher
+from src.converter.pairing import SCHWAB_HISTORY, SCHWAB_POSITIONS, account_name
+
+
+def _age(path, seconds=60):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_account_name_pairs_schwab_export_names():
+    assert (
+        account_name("Roth_IRA_XXX123_Transactions_20250128-103502.csv", SCHWAB_HISTORY)
+        == "Roth_IRA"
+    )
+    assert (
+        account_name("Roth_IRA-Positions-2025-01-28-103502.csv", SCHWAB_POSITIONS)
+        == "Roth_IRA"
+    )
+
+
+def test_watcher_converts_only_settled_new_or_changed_exports(tmp_path):
+    history_path, positions_path = write_schwab_inputs(tmp_path, 500, n_symbols=10)
+    statement_path = write_cathay_statement(tmp_path, 200, n_symbols=10)
+    for path in (history_path, positions_path):
+        _age(path)
+
+    watcher = FolderWatcher(
+        str(tmp_path),
+        debounce=30,
+        converter_options={"schwab": {"fix_exceed_range": True}},
+    )
+
+    # The statement was just written, so it is not converted yet.
+    schwab_output = str(positions_path).replace(".csv", "_yahoo_finance.csv")
+    assert watcher.poll() == [schwab_output]
+
+    _age(statement_path)
+    assert watcher.poll() == [str(statement_path).replace(".csv", "_yahoo_finance.csv")]
+    assert watcher.poll() == []
+
+    # Only the positions export changes; the parsed history is reused.
+    hits = watcher.input_cache.hits
+    positions_path.write_text(positions_path.read_text())
+    _age(positions_path, 30)
+    assert watcher.poll() == [schwab_output]
+    assert watcher.input_cache.hits == hits + 1
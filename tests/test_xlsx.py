@@ -0,0 +1,102 @@
+import csv
+import datetime
+import re
+
+import pandas as pd
+import pytest
+
+from src.benchmark.synthetic import write_cathay_statement
+from src.converter.cathay_sub_brokerage import CathaySubBrokerageConverter
+from src.converter.pairing import (
+    CATHAY_STATEMENT,
+    SCHWAB_HISTORY,
+    SCHWAB_POSITIONS,
+    classify_export,
+)
+from src.converter.readers import read_sheet
+from src.converter.schwab import SchwabConverter, find_position_header_index
+from test_schwab_converter import HISTORY_PATH, POSITIONS_PATH
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _cell(text):
+    """
+    Cell value Excel would store for a CSV field.
+    """
+    if text == "":
+        return None
+    for date_format in ("%m/%d/%Y", "%Y/%m/%d"):
+        try:
+            return datetime.datetime.strptime(text, date_format)
+        except ValueError:
+            pass
+    if re.fullmatch(r"-?\$?[\d,]+(\.\d+)?", text):
+        number = float(text.replace("$", "").replace(",", ""))
+        return int(number) if number.is_integer() else number
+    return text
+
+
+def write_workbook(csv_path, xlsx_path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            sheet.append([_cell(field) for field in row])
+    workbook.save(xlsx_path)
+    return str(xlsx_path)
+
+
+def test_schwab_workbooks_convert_like_csv_exports(tmp_path):
+    history = write_workbook(HISTORY_PATH, tmp_path / "history.xlsx")
+    positions = write_workbook(POSITIONS_PATH, tmp_path / "positions.xlsx")
+
+    expected = SchwabConverter(
+        history_data_path=str(HISTORY_PATH),
+        positions_data_path=str(POSITIONS_PATH),
+        fix_exceed_range=True,
+    ).convert()
+    result = SchwabConverter(
+        history_data_path=history,
+        positions_data_path=positions,
+        fix_exceed_range=True,
+    ).convert()
+
+    assert find_position_header_index(positions) == find_position_header_index(
+        str(POSITIONS_PATH)
+    )
+    assert classify_export(history) == SCHWAB_HISTORY
+    assert classify_export(positions) == SCHWAB_POSITIONS
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_cathay_workbook_converts_like_csv_statement(tmp_path):
+    statement = write_cathay_statement(tmp_path, 300, n_symbols=5)
+    workbook = write_workbook(statement, tmp_path / "statement.xlsx")
+
+    expected = CathaySubBrokerageConverter(
+        statement_of_account_file_path=str(statement)
+    ).convert()
+    result = CathaySubBrokerageConverter(
+        statement_of_account_file_path=workbook
+    ).convert()
+
+    assert classify_export(workbook) == CATHAY_STATEMENT
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_sheet_text_columns_read_like_csv(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Code", "Shares", "Note", None])
+    workbook.active.append([2330, 1000, None])
+    workbook.active.append([])
+    workbook.active.append(["0050", 2.5, "ok"])
+    path = tmp_path / "codes.xlsx"
+    workbook.save(path)
+
+    df = read_sheet(str(path), dtype={"Code": str, "Note": str})
+
+    assert df.columns.tolist() == ["Code", "Shares", "Note"]
+    assert df["Code"].tolist() == ["2330", "0050"]
+    assert df["Shares"].tolist() == [1000.0, 2.5]
+    assert df["Note"].isna().tolist() == [True, False]